@@ -30,13 +30,24 @@ from Macrobat import Macrobat
 from ExtraPrefs import ExtraPrefs
 from ClyphXTrackActions import ClyphXTrackActions
 from ClyphXSnapActions import ClyphXSnapActions
+from ClyphXSnapStore import SNAP_STORE_FILE_NAME
 from ClyphXGlobalActions import ClyphXGlobalActions
 from ClyphXDeviceActions import ClyphXDeviceActions
 from ClyphXClipActions import ClyphXClipActions
 from ClyphXControlSurfaceActions import ClyphXControlSurfaceActions
-from ClyphXTriggers import ClyphXTrackComponent, ClyphXControlComponent, ClyphXCueComponent
+from ClyphXTriggers import ClyphXTrackComponent, ClyphXControlComponent, ClyphXCueComponent, ClyphXTriggerScheduler
 from ClyphXUserActions import ClyphXUserActions
 from ActionList import ActionList
+from ClyphXActionCache import ClyphXActionCache
+from ClyphXTrackRegistry import ClyphXTrackRegistry
+from ClyphXSceneIndex import ClyphXSceneIndex
+from ClyphXDevicePaths import ClyphXDevicePathResolver
+from ClyphXVariables import ClyphXVariableTemplates
+from ClyphXExpressions import ClyphXExpressions
+from ClyphXParameterAdjustments import ClyphXParameterAdjustments
+from ClyphXSongClock import ClyphXSongClock
+from ClyphXWriteScheduler import ClyphXWriteScheduler, WRITE_PRIORITY_NORMAL
+from ClyphXDispatchTable import ClyphXDispatchTable, bind_handlers
 from consts import *
 
 FOLDER = '/ClyphX/'
@@ -52,8 +63,14 @@ class ClyphX(ControlSurface):
         self.set_suppress_rebuild_requests(True) 
 	self._is_debugging = False 
 	self._process_xclips_if_track_muted = True
+	self._scene_index = ClyphXSceneIndex(self)
 	self._macrobat = Macrobat(self)
 	self._extra_prefs = ExtraPrefs(self)
+	self._track_registry = ClyphXTrackRegistry(self)
+	self._device_paths = ClyphXDevicePathResolver(self)
+	self._trigger_scheduler = ClyphXTriggerScheduler(self)
+	self._write_scheduler = ClyphXWriteScheduler(self)
+	self._song_clock = ClyphXSongClock(self)
 	self._track_actions = ClyphXTrackActions(self)
 	self._snap_actions = ClyphXSnapActions(self)
 	self._global_actions = ClyphXGlobalActions(self)
@@ -65,9 +82,14 @@ class ClyphX(ControlSurface):
 	ClyphXCueComponent(self)
 	self._startup_actions_complete = False
 	self._user_variables = {}
+	self._variable_templates = ClyphXVariableTemplates()
+	self._expressions = ClyphXExpressions()
+	self._parameter_adjustments = ClyphXParameterAdjustments(self)
+	self._action_cache = ClyphXActionCache(self)
 	self._play_seq_clips = {}
 	self._loop_seq_clips = {}
-	self._current_tracks = []
+	self._current_tracks = {}
+	self._dispatch_table = self.build_dispatch_table()
 	live = Live.Application.get_application()
 	self._can_have_nested_devices = False
 	if live.get_major_version() == 9 or (live.get_major_version() == 8 and (live.get_minor_version() > 2 or (live.get_minor_version() == 2 and live.get_bugfix_version() >= 2))):
@@ -79,8 +101,14 @@ class ClyphX(ControlSurface):
 	
 	
     def disconnect(self):
+	self._scene_index = None
 	self._macrobat = None
 	self._extra_prefs = None
+	self._track_registry = None
+	self._device_paths = None
+	self._trigger_scheduler = None
+	self._write_scheduler = None
+	self._song_clock = None
 	self._track_actions = None
 	self._snap_actions = None
 	self._global_actions = None
@@ -89,66 +117,139 @@ class ClyphX(ControlSurface):
 	self._control_surface_actions = None
 	self._user_actions = None
 	self._control_component = None
+	self._action_cache.disconnect()
+	self._action_cache = None
+	self._variable_templates.disconnect()
+	self._variable_templates = None
+	self._expressions.disconnect()
+	self._expressions = None
+	self._parameter_adjustments.disconnect()
+	self._parameter_adjustments = None
+	self._dispatch_table.disconnect()
+	self._dispatch_table = None
 	self._user_variables = {}
 	self._play_seq_clips = {}
 	self._loop_seq_clips = {}
-	self._current_tracks = []
+	self._current_tracks = {}
 	ControlSurface.disconnect(self)
     	
 	
     def action_dispatch(self, tracks, xclip, action_name, args, ident):
 	""" Main dispatch for calling appropriate class of actions, passes all necessary arguments to class method """
 	if tracks:
-	    if action_name.startswith('SNAP'):
-		self._snap_actions.store_track_snapshot(tracks, xclip, ident, action_name, args) 
-	    elif action_name.startswith('SURFACE') or action_name.startswith('CS'):
-		self._control_surface_actions.dispatch_cs_action(tracks[0], xclip, ident, action_name, args)
-	    elif action_name in GLOBAL_ACTIONS:
-		getattr(self._global_actions, GLOBAL_ACTIONS[action_name])(tracks[0], xclip, ident, args)
-	    elif action_name == 'PSEQ' and args== 'RESET':
-		for key, value in self._play_seq_clips.items(): 
-		    value[1] = -1
-	    elif action_name == 'DEBUG':
-		if type(xclip) is Live.Clip.Clip:
-		    xclip.name = str(xclip.name).upper().replace('DEBUG', 'Debugging Activated')
-		self.start_debugging()
-	    else:
-		for t in tracks:		
-		    if action_name in TRACK_ACTIONS:
-			getattr(self._track_actions, TRACK_ACTIONS[action_name])(t, xclip, ident, args)
-		    elif action_name == 'LOOPER': 
-			if args and args.split()[0] in LOOPER_ACTIONS: 
-			    getattr(self._device_actions, LOOPER_ACTIONS[args.split()[0]])(t, xclip, ident, args)
-			elif action_name in LOOPER_ACTIONS:
-			    getattr(self._device_actions, LOOPER_ACTIONS[action_name])(t, xclip, ident, args)
-		    elif action_name.startswith('DEV'): 
-			device_action = self.get_device_to_operate_on(t, action_name, args)
-			device_args = None
-			if device_action[0]:
-			    if len(device_action) > 1:
-				device_args = device_action[1]
-			    if device_args and device_args.split()[0] in DEVICE_ACTIONS: 
-				getattr(self._device_actions, DEVICE_ACTIONS[device_args.split()[0]])(device_action[0], t, xclip, ident, device_args)
-			    elif device_args and 'CHAIN' in device_args: 
-				self._device_actions.dispatch_chain_action(device_action[0], t, xclip, ident, device_args)
-			    elif action_name.startswith('DEV'):
-				self._device_actions.set_device_on_off(device_action[0], t, xclip, ident, device_args)					
-		    elif action_name.startswith('CLIP') and t in self.song().tracks:
-			clip_action = self.get_clip_to_operate_on(t, action_name, args)
-			clip_args = None
-			if clip_action[0]:
-			    if len(clip_action) > 1:
-				clip_args = clip_action[1]
-			    if clip_args and clip_args.split()[0] in CLIP_ACTIONS: 
-				getattr(self._clip_actions, CLIP_ACTIONS[clip_args.split()[0]])(clip_action[0], t, xclip, ident, clip_args.replace(clip_args.split()[0], ''))
-			    elif clip_args and clip_args.split()[0].startswith('NOTES'):
-				self._clip_actions.do_clip_note_action(clip_action[0], t, xclip, ident, args)
-			    elif action_name.startswith('CLIP'):
-				self._clip_actions.set_clip_on_off(clip_action[0], t, xclip, ident, args)	
-		    elif action_name in self._user_actions._action_dict:
-			getattr(self._user_actions, self._user_actions._action_dict[action_name])(t, args)
+	    route = self._dispatch_table.get_route(action_name)
+	    if route:
+		route[0](route[1], tracks, xclip, action_name, args, ident)
 	if self._is_debugging:
 	    self.log_message('action_dispatch triggered, ident=' + str(ident) + ' and track(s)=' + str(self.track_list_to_string(tracks)) + ' and action=' + str(action_name) + ' and args=' + str(args))
+            
+            
+    def build_dispatch_table(self):
+	""" Builds the table action_dispatch uses to resolve action names to their handlers. Priorities mirror the order in which 
+	action names used to be checked, so global-level prefixes and names take precedence over track-level ones. """
+	table = ClyphXDispatchTable()
+	table.add_prefix('SNAP', 0, self._dispatch_snap_action, self._snap_actions.store_track_snapshot)
+	table.add_exact('SNAPMORPH', 0, self._dispatch_snap_action, self._snap_actions.morph_snapshots)
+	table.add_prefix('SURFACE', 1, self._dispatch_cs_action, self._control_surface_actions.dispatch_cs_action)
+	table.add_prefix('CS', 1, self._dispatch_cs_action, self._control_surface_actions.dispatch_cs_action)
+	for name, handler in bind_handlers(GLOBAL_ACTIONS, self._global_actions).items():
+	    table.add_exact(name, 5, self._dispatch_global_action, handler)
+	table.add_exact('PSEQ', 6, self._dispatch_pseq_action)
+	table.add_exact('DEBUG', 7, self._dispatch_debug_action)
+	for name, handler in bind_handlers(TRACK_ACTIONS, self._track_actions).items():
+	    table.add_exact(name, 8, self._dispatch_track_action, handler)
+	table.add_exact('LOOPER', 9, self._dispatch_looper_action)
+	table.add_prefix('DEV', 10, self._dispatch_device_action)
+	table.add_prefix('CLIP', 11, self._dispatch_clip_action)
+	for name, handler in bind_handlers(self._user_actions._action_dict, self._user_actions).items():
+	    table.add_exact(name, 13, self._dispatch_user_action, handler)
+	self._looper_handlers = bind_handlers(LOOPER_ACTIONS, self._device_actions)
+	self._device_handlers = bind_handlers(DEVICE_ACTIONS, self._device_actions)
+	self._clip_handlers = bind_handlers(CLIP_ACTIONS, self._clip_actions)
+	return table
+    
+    
+    def _dispatch_snap_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches snapshot storing, which operates on all of the given tracks at once """
+	handler(tracks, xclip, ident, action_name, args)
+        
+        
+    def _dispatch_cs_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches control surface actions, which need the action name to determine the surface to operate on """
+	handler(tracks[0], xclip, ident, action_name, args)
+        
+        
+    def _dispatch_global_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches global actions, which operate on the first of the given tracks """
+	handler(tracks[0], xclip, ident, args)
+        
+        
+    def _dispatch_pseq_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Resets all PSEQ X-Triggers """
+	if args == 'RESET':
+	    for key, value in self._play_seq_clips.items(): 
+		value[1] = -1
+                
+                
+    def _dispatch_debug_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Activates debugging """
+	if type(xclip) is Live.Clip.Clip:
+	    xclip.name = str(xclip.name).upper().replace('DEBUG', 'Debugging Activated')
+	self.start_debugging()
+        
+        
+    def _dispatch_track_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches track actions to each of the given tracks """
+	for t in tracks:
+	    handler(t, xclip, ident, args)
+            
+            
+    def _dispatch_looper_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches looper actions to each of the given tracks """
+	for t in tracks:
+	    if args and args.split()[0] in self._looper_handlers: 
+		self._looper_handlers[args.split()[0]](t, xclip, ident, args)
+	    elif action_name in self._looper_handlers:
+		self._looper_handlers[action_name](t, xclip, ident, args)
+                
+                
+    def _dispatch_device_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches device actions to the device specified for each of the given tracks """
+	for t in tracks:
+	    device_action = self.get_device_to_operate_on(t, action_name, args)
+	    device_args = None
+	    if device_action[0]:
+		if len(device_action) > 1:
+		    device_args = device_action[1]
+		if device_args and device_args.split()[0] in self._device_handlers: 
+		    self._device_handlers[device_args.split()[0]](device_action[0], t, xclip, ident, device_args)
+		elif device_args and 'CHAIN' in device_args: 
+		    self._device_actions.dispatch_chain_action(device_action[0], t, xclip, ident, device_args)
+		else:
+		    self._device_actions.set_device_on_off(device_action[0], t, xclip, ident, device_args)
+                    
+                    
+    def _dispatch_clip_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches clip actions to the clip specified for each of the given tracks (only regular tracks have clips) """
+	for t in tracks:
+	    if t in self.song().tracks:
+		clip_action = self.get_clip_to_operate_on(t, action_name, args)
+		clip_args = None
+		if clip_action[0]:
+		    if len(clip_action) > 1:
+			clip_args = clip_action[1]
+		    if clip_args and clip_args.split()[0] in self._clip_handlers: 
+			self._clip_handlers[clip_args.split()[0]](clip_action[0], t, xclip, ident, clip_args.replace(clip_args.split()[0], ''))
+		    elif clip_args and clip_args.split()[0].startswith('NOTES'):
+			self._clip_actions.do_clip_note_action(clip_action[0], t, xclip, ident, args)
+		    else:
+			self._clip_actions.set_clip_on_off(clip_action[0], t, xclip, ident, args)
+                        
+                        
+    def _dispatch_user_action(self, handler, tracks, xclip, action_name, args, ident):
+	""" Dispatches user actions to each of the given tracks """
+	for t in tracks:
+	    handler(t, args)
 			    
 			    
     def handle_xclip_name(self, track, xclip): 
@@ -162,95 +263,75 @@ class ClyphX(ControlSurface):
 			    
 		
     def handle_action_list_trigger(self, track, xtrigger): 
-	""" Directly dispatches snapshot recall, X-Control overrides and Seq X-Clips.  Otherwise, seperates ident from action names, splits up lists of action names and calls action dispatch. """
+	""" Directly dispatches snapshot recall, X-Control overrides and Seq X-Clips.  Otherwise, gets the compiled action list for the trigger's name, formats it and calls action dispatch. """
 	if self._is_debugging:
 	    self.log_message('---')
-	name = self.get_name(xtrigger.name).strip()	
-	if name and name[0] == '[' and ']' in name:	    
-	    # Snap action, so pass directly to snap component
-	    if ' || (' in name and type(xtrigger) is Live.Clip.Clip and xtrigger.is_playing:
-		self._snap_actions.recall_track_snapshot(name, xtrigger)
-	    # Control reassignment, so pass directly to control component
-	    elif '[[' in name and ']]' in name:
-		self._control_component.assign_new_actions(name) 
-	    # Standard trigger
-	    else:
-		ident = name[name.index('['):name.index(']')+1].strip() 
-		raw_action_list = name.replace(ident, '', 1).strip()
-		if raw_action_list == '':
+	is_xclip = type(xtrigger) is Live.Clip.Clip
+	entry = self._action_cache.get_entry(xtrigger.name, is_xclip)
+	# Snap action, so pass directly to snap component
+	if entry['is_snap'] and is_xclip and xtrigger.is_playing:
+	    self._snap_actions.recall_track_snapshot(entry['name'], xtrigger)
+	# Control reassignment, so pass directly to control component
+	elif entry['is_control']:
+	    self._control_component.assign_new_actions(entry['name']) 
+	# Standard trigger
+	elif entry['ident']:
+	    ident = entry['ident']
+	    compiled_list = entry['on']
+            
+	    # X-Clips can have on and off action lists, the following handles this
+	    if is_xclip:
+		compiled_list = self.get_xclip_action_list(xtrigger, entry)
+		if compiled_list == None:
 		    return()
-		is_play_seq = False
-		is_loop_seq = False
-		
-		# X-Clips can have on and off action lists, the following handles this
-		if type(xtrigger) is Live.Clip.Clip:
-		    raw_action_list = self.get_xclip_action_list(xtrigger, raw_action_list)
-		    if raw_action_list == None:
-			return()
-		
-		# Check if the trigger is a PSEQ (accessible to any type of X-Trigger)
-		if raw_action_list[0] == '(' and '(PSEQ)' in raw_action_list: 
-		    is_play_seq = True
-		    raw_action_list = raw_action_list.replace('(PSEQ)', '').strip()
-		    
-		# Check if the trigger is a LSEQ (accessible only to X-Clips)
-		elif type(xtrigger) is Live.Clip.Clip and raw_action_list[0] == '(' and '(LSEQ)' in raw_action_list: 
-		    is_loop_seq = True
-		    raw_action_list = raw_action_list.replace('(LSEQ)', '').strip()
-		
-		# Build formatted action list    
-		formatted_action_list = []
-		for action in raw_action_list.split(';'): 
-		    action_data = self.format_action_name(track, action.strip())
-		    if action_data:
-			formatted_action_list.append(action_data)
-			
-		# If seq, pass to appropriate function, else call action dispatch for each action in the formatted action list
-		if formatted_action_list:
-		    if is_play_seq: 
-			self.handle_play_seq_action_list(formatted_action_list, xtrigger, ident)
-		    elif is_loop_seq:
-			self._loop_seq_clips[xtrigger.name] = [ident, formatted_action_list]
-			self.handle_loop_seq_action_list(xtrigger, 0)
-		    else:
-			for action in formatted_action_list:
-			    self.action_dispatch(action['track'], xtrigger, action['action'], action['args'], ident)
-			    if self._is_debugging:
-				self.log_message('handle_action_list_trigger triggered, ident=' + str(ident) + ' and track(s)=' + str(self.track_list_to_string(action['track'])) + ' and action=' + str(action['action']) + ' and args=' + str(action['args']))
+                
+	    # Build formatted action list    
+	    formatted_action_list = self.get_formatted_action_list(track, entry, compiled_list)
+                
+	    # If seq, pass to appropriate function, else call action dispatch for each action in the formatted action list
+	    if formatted_action_list:
+		if compiled_list['is_play_seq']: 
+		    self.handle_play_seq_action_list(formatted_action_list, xtrigger, ident)
+		elif compiled_list['is_loop_seq']:
+		    self._loop_seq_clips[xtrigger.name] = [ident, formatted_action_list]
+		    self.handle_loop_seq_action_list(xtrigger, 0)
+		else:
+		    for action in formatted_action_list:
+			self.action_dispatch(action['track'], xtrigger, action['action'], action['args'], ident)
+			if self._is_debugging:
+			    self.log_message('handle_action_list_trigger triggered, ident=' + str(ident) + ' and track(s)=' + str(self.track_list_to_string(action['track'])) + ' and action=' + str(action['action']) + ' and args=' + str(action['args']))
 		
 			    
-    def get_xclip_action_list(self, xclip, full_action_list):
-	""" Get the action list to perform. X-Clips can have an on and off action list seperated by a comma. This will return which action list to perform 
+    def get_xclip_action_list(self, xclip, entry):
+	""" Get the compiled action list to perform. X-Clips can have an on and off action list seperated by a comma. This will return which action list to perform 
 	based on whether the clip is playing. If the clip is not playing and there is no off action, this returns None. """
-	result = None	
-	split_list = full_action_list.split(',')
+	result = entry['off']
 	if xclip.is_playing:
-	    result = split_list[0]
-	else:
-	    if len(split_list) == 2:
-		if split_list[1].strip() == '*':
-		    result = split_list[0]
-		else:
-		    result = split_list[1]
+	    result = entry['on']
 	if self._is_debugging:
 	    self.log_message('get_xclip_action_list returning ' + str(result))
 	return result
     
+    
+    def get_formatted_action_list(self, track, entry, compiled_list):
+	""" Formats the actions of the given compiled action list and performs any variable assignments it contains. If an assignment 
+	invalidates the compiled entry, the remaining actions are formatted from their raw names. """
+	formatted_action_list = []
+	entry_is_cached = True
+	for record in compiled_list['actions']:
+	    if record['is_assignment'] or record['is_dynamic'] or not entry_is_cached:
+		action_data = self.format_action_name(track, record['raw'])
+		entry_is_cached = entry_is_cached and self._action_cache.is_cached(entry)
+	    else:
+		action_data = self.get_action_data(track, record)
+	    if action_data:
+		formatted_action_list.append(action_data)
+	return formatted_action_list
+    
 				
     def replace_user_variables(self, string_with_vars):
 	""" Replace any user variables in the given string with the value the variable represents. """
-	while '%' in string_with_vars:
-	    var_name = string_with_vars[string_with_vars.index('%')+1:]
-	    if '%' in var_name:
-		var_name = var_name[0:var_name.index('%')]
-		string_with_vars = string_with_vars.replace('%' + var_name + '%', self.get_user_variable_value(var_name), 1)  
-	    else:
-		string_with_vars = string_with_vars.replace('%', '', 1)
-	if '$' in string_with_vars: # For compat with old-style variables
-	    for string in string_with_vars.split():
-		if '$' in string and not '=' in string:
-		    var_name = string.replace('$', '')
-		    string_with_vars = string_with_vars.replace('$' + var_name, self.get_user_variable_value(var_name), 1)  
+	string_with_vars = self._variable_templates.render(string_with_vars, self._user_variables)
 	if self._is_debugging:
 	    self.log_message('replace_user_variables returning ' + str(string_with_vars))
 	return string_with_vars
@@ -267,38 +348,66 @@ class ClyphX(ControlSurface):
     
     
     def handle_user_variable_assignment(self, string_with_assign):
-	""" Handle assigning new value to variable with either assignment or expression enclosed in parens. """
-	string_with_assign = string_with_assign.replace('$', '')# For compat with old-style variables
-	var_data = string_with_assign.split('=')
-	if len(var_data) >= 2 and not ';' in var_data[1] and not '%' in var_data[1] and not '=' in var_data[1]:
-	    if '(' in var_data[1] and ')' in var_data[1]:
-		try: self._user_variables[var_data[0].strip()] = str(eval(var_data[1].strip()))
+	""" Handle assigning new value to variable with either assignment or expression enclosed in parens. Expressions are evaluated by 
+	the expression engine, which reads the variables they reference (%name%) directly, so their results are stored as numbers. 
+	Only the first = separates the variable name from the value, so expressions can use the ==, <=, >= and != operators. """
+	if '$' in string_with_assign: # For compat with old-style variables
+	    string_with_assign = self.replace_user_variables(string_with_assign).replace('$', '')
+	var_data = string_with_assign.split('=', 1)
+	if len(var_data) == 2 and not ';' in var_data[1]:
+	    var_name = self.replace_user_variables(var_data[0]).strip()
+	    value = var_data[1].strip()
+	    if '(' in value and ')' in value:
+		try: self.set_user_variable(var_name, self._expressions.evaluate(value, self._user_variables))
 		except: pass
-	    else:
-		self._user_variables[var_data[0].strip()] = var_data[1].strip()
+	    elif not '=' in value:
+		self.set_user_variable(var_name, self.replace_user_variables(value))
 	    if self._is_debugging:
-		self.log_message('handle_user_variable_assignment, ' + str(var_data[0].strip()) + '=' + str(var_data[1].strip()))
+		self.log_message('handle_user_variable_assignment, ' + str(var_name) + '=' + str(self.get_user_variable_value(var_name)))
+                
+                
+    def set_user_variable(self, var_name, value):
+	""" Set the value of the given variable name and drop compiled action lists that reference it. """
+	self._user_variables[var_name] = value
+	self._action_cache.invalidate_variable(var_name)
 			
   
     def format_action_name(self, origin_track, origin_name): 
 	""" Replaces vars (if any) then splits up track, action name and arguments (if any) and returns dict """
-	result_name = self.replace_user_variables(origin_name)
-	if '=' in result_name:
-	    self.handle_user_variable_assignment(result_name)
+	if '=' in origin_name:
+	    self.handle_user_variable_assignment(origin_name)
 	    return
-	result_track = [origin_track]
+	result_name = self.replace_user_variables(origin_name)
+	track_spec, action_name, args = self.parse_action_name(result_name)
+	return self.get_action_data(origin_track, {'track_spec' : track_spec, 'action' : action_name, 'args' : args})
+    
+    
+    def parse_action_name(self, result_name):
+	""" Splits up track spec, action name and arguments (if any) of an action name that has already had its vars replaced. The track spec 
+	will be None if the action should operate on the origin track. """
+	track_spec = None
 	if len(result_name) >= 4 and (('/' in result_name[:4]) or ('-' in result_name[:4] and '/' in result_name[4:]) or (result_name[0] == '"' and '"' in result_name[1:])):
-	    track_data = self.get_track_to_operate_on(result_name)
-	    result_track = track_data[0]
-	    result_name = track_data[1]
+	    track_spec = ''
+	    if '/' in result_name:
+		if result_name.index('/') > 0:
+		    track_spec = result_name.split('/')[0].strip()
+		result_name = result_name[result_name.index('/')+1:].strip()
 	args = ''
 	name = result_name.split()
 	if len(name) > 1:
 	    args = result_name.replace(name[0], '', 1)
 	    result_name = result_name.replace(args, '')
+	return (track_spec, result_name.strip(), args.strip())
+    
+    
+    def get_action_data(self, origin_track, record):
+	""" Resolves the track spec of the given parsed action and returns dict of track(s), action name and arguments """
+	result_track = [origin_track]
+	if record['track_spec'] != None:
+	    result_track = self.get_tracks_from_spec(record['track_spec'])
 	if self._is_debugging:
-		self.log_message('format_action_name returning, track(s)=' + str(self.track_list_to_string(result_track)) + ' and action=' + str(result_name.strip()) + ' and args=' + str(args.strip()))
-	return {'track' : result_track, 'action' : result_name.strip(), 'args' : args.strip()}	
+	    self.log_message('format_action_name returning, track(s)=' + str(self.track_list_to_string(result_track)) + ' and action=' + str(record['action']) + ' and args=' + str(record['args']))
+	return {'track' : result_track, 'action' : record['action'], 'args' : record['args']}
     
     
     def handle_loop_seq_action_list(self, xclip, count):
@@ -329,46 +438,19 @@ class ClyphX(ControlSurface):
 	
     def do_parameter_adjustment(self, param, value):
 	"""" Adjust (</>, reset, random, set val) continuous params, also handles quantized param adjustment (should just use +1/-1 for those) """
-	if not param.is_enabled:
-	    return()
-	step = (param.max - param.min) / 127
-	new_value = param.value
-	if value.startswith(('<', '>')):
-	    factor = self.get_adjustment_factor(value)
-	    if not param.is_quantized:
-		new_value += step * factor
-	    else:
-		new_value += factor
-	elif value == 'RESET' and not param.is_quantized:
-	    new_value = param.default_value
-	elif 'RND' in value and not param.is_quantized:
-	    rnd_min = 0
-	    rnd_max = 128
-	    if value != 'RND' and '-' in value:
-		rnd_range_data = value.replace('RND', '').split('-')
-		if len(rnd_range_data) == 2:
-		    new_min = 0
-		    new_max = 128
-		    try: new_min = int(rnd_range_data[0])
-		    except: new_min = 0
-		    try: new_max = int(rnd_range_data[1]) + 1
-		    except: new_max = 128
-		    if new_min in range(0, 129) and new_max in range(0, 129) and new_min < new_max:
-			rnd_min = new_min
-			rnd_max = new_max
-	    rnd_value = (Live.Application.get_random_int(0, 128) * (rnd_max - rnd_min) / 127) + rnd_min
-	    new_value = (rnd_value * step) + param.min
+	new_value = self.get_parameter_adjustment(value).apply(param)
+	if new_value is not None and self._is_debugging:
+	    self.log_message('do_parameter_adjustment called on ' + str(param.name) + ', set value to ' + str(new_value))
 	    
-	else:
-	    try:
-		if int(value) in range (128):
-		    try: new_value = (int(value) * step) + param.min
-		    except: new_value = param.value
-	    except: pass
-	if new_value >= param.min and new_value <= param.max:
-	    param.value = new_value
-	    if self._is_debugging:
-		self.log_message('do_parameter_adjustment called on ' + str(param.name) + ', set value to ' + str(new_value))
+	    
+    def get_parameter_adjustment(self, value):
+	""" Returns the compiled adjustment for the given value string, which can be applied to any number of params. """
+	return self._parameter_adjustments.get_adjustment(value)
+    
+    
+    def write_parameter(self, param, value, priority=WRITE_PRIORITY_NORMAL):
+	""" Writes the value to the param via the write scheduler, which limits the number of bulk writes per timer tick. """
+	self._write_scheduler.write(param, value, priority)
 	    
 	    
     def get_adjustment_factor(self, string, as_float = False):
@@ -393,62 +475,64 @@ class ClyphX(ControlSurface):
 	result_tracks = []
 	result_name = origin_name
 	if '/' in origin_name:
-	    tracks = list(tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,))
-	    sel_track_index = tracks.index(self.song().view.selected_track)
 	    if(origin_name.index('/') > 0):
-		track_spec = origin_name.split('/')[0].strip()
-		if '"' in track_spec:
-		    track_spec = self.get_track_index_by_name(track_spec, tracks)
-		if 'SEL' in track_spec:
-		    track_spec = track_spec.replace('SEL', str(sel_track_index + 1), 1) 
-		if 'MST' in track_spec:
-		    track_spec = track_spec.replace('MST', str(len(tracks)), 1) 
-		if track_spec == 'ALL':
-		    result_tracks = tracks
-		else:
-		    track_range_spec = track_spec.split('-')
-		    if len(track_range_spec) <= 2:
-			track_range = []
-			try:
-			    for spec in track_range_spec:
-				track_index = -1
-				if spec.startswith(('<', '>')):
-				    try: track_index = self.get_adjustment_factor(spec) + sel_track_index
-				    except: pass
-				else:
-				    try: track_index = int(spec) - 1
-				    except: track_index = (ord(spec) - 65) + len(self.song().tracks)
-				if track_index in range(len(tracks)):
-				    track_range.append(track_index)
-			except: track_range = []
-			if track_range:
-			    if len(track_range) == 2:
-				if (track_range[0] < track_range[1]):
-				    for index in range(track_range[0], track_range[1] + 1):
-					result_tracks.append(tracks[index])
-			    else:
-				result_tracks = [tracks[track_range[0]]]
+		result_tracks = self.get_tracks_from_spec(origin_name.split('/')[0].strip())
 	    result_name = origin_name[origin_name.index('/')+1:].strip()
 	if self._is_debugging:
 	    self.log_message('get_track_to_operate_on returning result_tracks=' + str(self.track_list_to_string(result_tracks)) + ' and result_name=' + str(result_name))
 	return (result_tracks, result_name)
         
     
-    def get_track_index_by_name(self, name, tracks):
+    def get_tracks_from_spec(self, track_spec):
+	""" Gets track or tracks associated with the given track spec (the part of an action name preceding the '/') """
+	result_tracks = []
+	if track_spec:
+	    tracks = self._track_registry.get_tracks()
+	    sel_track_index = self._track_registry.get_index(self.song().view.selected_track)
+	    if '"' in track_spec:
+		track_spec = self.get_track_index_by_name(track_spec)
+	    if 'SEL' in track_spec:
+		track_spec = track_spec.replace('SEL', str(sel_track_index + 1), 1) 
+	    if 'MST' in track_spec:
+		track_spec = track_spec.replace('MST', str(len(tracks)), 1) 
+	    if track_spec == 'ALL':
+		result_tracks = list(tracks)
+	    else:
+		track_range_spec = track_spec.split('-')
+		if len(track_range_spec) <= 2:
+		    track_range = []
+		    try:
+			for spec in track_range_spec:
+			    track_index = -1
+			    if spec.startswith(('<', '>')):
+				try: track_index = self.get_adjustment_factor(spec) + sel_track_index
+				except: pass
+			    else:
+				try: track_index = int(spec) - 1
+				except: track_index = (ord(spec) - 65) + self._track_registry.get_num_regular_tracks()
+			    if 0 <= track_index < len(tracks):
+				track_range.append(track_index)
+		    except: track_range = []
+		    if track_range:
+			if len(track_range) == 2:
+			    if (track_range[0] < track_range[1]):
+				result_tracks = list(tracks[track_range[0]:track_range[1] + 1])
+			else:
+			    result_tracks = [tracks[track_range[0]]]
+	return result_tracks
+        
+    
+    def get_track_index_by_name(self, name):
 	""" Gets the index(es) associated with the track name(s) specified in name. """
 	while '"' in name:
 	    track_name = name[name.index('"')+1:]
 	    if '"' in track_name:
 		track_name = track_name[0:track_name.index('"')]
 		track_index = ''
-		def_name = ''
-		if ' AUDIO' or ' MIDI' in track_name:
-		    def_name = track_name.replace(' ', '-')# In Live GUI, default names are 'n Audio' or 'n MIDI', in API it's 'n-Audio' or 'n-MIDI' 
-		for track in tracks:
-		    current_track_name = self.get_name(track.name)
-		    if current_track_name == track_name or current_track_name == def_name:
-			track_index = str(tracks.index(track) + 1)
-			break
+		def_name = track_name.replace(' ', '-')# In Live GUI, default names are 'n Audio' or 'n MIDI', in API it's 'n-Audio' or 'n-MIDI' 
+		index = self._track_registry.get_index_by_name(track_name, def_name)
+		if index != -1:
+		    track_index = str(index + 1)
 		name = name.replace('"' + track_name + '"', track_index, 1)  
 		name = name.replace('"' + def_name + '"', track_index, 1) 
 	    else:
@@ -467,10 +551,7 @@ class ClyphX(ControlSurface):
 		device_args = args[args.index('"')+1:].strip()
 	    if '"' in dev_name:
 		dev_name = dev_name[0:dev_name.index('"')]
-	    for dev in track.devices:
-		if dev.name.upper() == dev_name:
-		    device = dev
-		    break
+	    device = self._device_paths.get_device_by_name(track, dev_name)
 	else:
 	    if action_name == 'DEV':
 		device = track.view.selected_device
@@ -478,18 +559,7 @@ class ClyphX(ControlSurface):
 		    if track.devices:
 			device = track.devices[0]
 	    else:
-		try:
-		    dev_num = action_name.replace('DEV', '')
-		    if '.' in dev_num and self._can_have_nested_devices:
-			dev_split = dev_num.split('.')
-			top_level = track.devices[int(dev_split[0]) - 1]
-			if top_level and top_level.can_have_chains:
-			    device = top_level.chains[int(dev_split[1]) - 1].devices[0]
-			    if len(dev_split) > 2:
-				device = top_level.chains[int(dev_split[1]) - 1].devices[int(dev_split[2]) - 1]
-		    else:
-			device = track.devices[int(dev_num) - 1]
-		except: pass
+		device = self._device_paths.get_device_by_path(track, action_name)
 	if self._is_debugging:
 	    debug_string = 'None'
 	    if device:
@@ -509,12 +579,11 @@ class ClyphX(ControlSurface):
 		clip_args = args[args.index('"')+1:].strip()
 	    if '"' in clip_name:
 		clip_name = clip_name[0:clip_name.index('"')]
-	    for slot in track.clip_slots:
-		if slot.has_clip and slot.clip.name.upper() == clip_name:
-		    clip = slot.clip
-		    break
+	    slot_idx = self.get_clip_slot_index_by_name(track, clip_name)
+	    if slot_idx != -1:
+		clip = track.clip_slots[slot_idx].clip
 	else:
-	    sel_slot_idx = list(self.song().scenes).index(self.song().view.selected_scene)
+	    sel_slot_idx = self._scene_index.get_selected_index()
 	    slot_idx = sel_slot_idx
 	    if action_name == 'CLIP':
 		if track.playing_slot_index >= 0:
@@ -533,6 +602,18 @@ class ClyphX(ControlSurface):
 		debug_string = clip.name
 	    self.log_message('get_clip_to_operate_on returning clip=' + str(debug_string) + ' and clip args=' + str(clip_args))
 	return (clip, clip_args)
+    
+    
+    def get_clip_slot_index_by_name(self, track, clip_name):
+	""" Returns the index of the first slot on the given track containing a clip with the given upper-case name or -1 if 
+	there is none.  Uses the track component's index for regular tracks. """
+	if track in self._current_tracks:
+	    return self._current_tracks[track].get_clip_slot_index_by_name(clip_name)
+	for index in range(len(track.clip_slots)):
+	    slot = track.clip_slots[index]
+	    if slot.has_clip and slot.clip.name.upper() == clip_name:
+		return index
+	return -1
 		    	
     
     def get_user_settings(self, midi_map_handle):
@@ -547,6 +628,7 @@ class ClyphX(ControlSurface):
 		    mrs_path = path
 		    break
 	    user_file = mrs_path + FOLDER + 'UserSettings.txt'
+	    self._snap_actions.set_snap_store_path(mrs_path + FOLDER + SNAP_STORE_FILE_NAME)
 	    if not self._user_settings_logged:
 		self.log_message(' ------- Attempting to read UserSettings file: ' + user_file + '------- ')
 	    for line in open(user_file): 
@@ -554,7 +636,7 @@ class ClyphX(ControlSurface):
 		if not line.startswith(('#', '"', '*')) and not line.strip() == '':
 		    if not self._user_settings_logged:
 			self.log_message(str(line))
-		if not line.startswith(('#', '"', 'STARTUP_ACTIONS =', 'INCLUDE_NESTED_DEVICES_IN_SNAPSHOTS =', 'SNAPSHOT_PARAMETER_LIMIT =', 'PROCESS_XCLIPS_',)) and not line == '':
+		if not line.startswith(('#', '"', 'STARTUP_ACTIONS =', 'INCLUDE_NESTED_DEVICES_IN_SNAPSHOTS =', 'SNAPSHOT_', 'PROCESS_XCLIPS_', 'XCONTROL_CC_', 'PARAMETER_WRITE_')) and not line == '':
 		    if '[USER CONTROLS]' in line:
 			list_to_build = 'controls'
 		    elif '[USER VARIABLES]' in line:
@@ -563,7 +645,6 @@ class ClyphX(ControlSurface):
 			list_to_build = 'prefs'
 		    else:
 			if list_to_build == 'vars' and '=' in line:
-			    line = self.replace_user_variables(line)
 			    self.handle_user_variable_assignment(line)
 			elif list_to_build == 'controls' and '=' in line:
 			    ctrl_data.append(line)
@@ -579,8 +660,25 @@ class ClyphX(ControlSurface):
 		    try: limit = int(line[26:].strip())
 		    except: limit = 500
 		    self._snap_actions._parameter_limit = limit
+		elif line.startswith('SNAPSHOT_STORE ='):
+		    self._snap_actions._store_snapshots_in_file = line.split('=')[1].strip() == 'FILE'
+		elif line.startswith('SNAPSHOT_SMOOTHING_CURVE ='):
+		    self._snap_actions.set_smoothing_curve(line.split('=')[1].strip())
 		elif line.startswith('PROCESS_XCLIPS_IF_TRACK_MUTED ='):
 		    self._process_xclips_if_track_muted = line.split('=')[1].strip() == 'TRUE'
+		elif line.startswith('XCONTROL_CC_COALESCING_LIMIT ='):
+		    try: limit = max(0, int(line.split('=')[1].strip()))
+		    except: limit = 0
+		    self._control_component.set_cc_coalescing_limit(limit)
+		elif line.startswith('PARAMETER_WRITE_BUDGET ='):
+		    budget = line.split('=')[1].split(',')
+		    try: max_writes = max(0, int(budget[0].strip()))
+		    except: max_writes = 0
+		    max_time = 0
+		    if len(budget) > 1:
+			try: max_time = max(0, int(budget[1].strip()))
+			except: max_time = 0
+		    self._write_scheduler.set_budget(max_writes, max_time)
 		elif line.startswith('STARTUP_ACTIONS =') and not self._startup_actions_complete:
 		    actions = line[17:].strip()
 		    if actions != 'OFF':
@@ -604,6 +702,9 @@ class ClyphX(ControlSurface):
 	    self.log_message('------- ClyphX Log: Logging User Controls -------')
 	    for key, value in self._control_component._control_list.items():
 		self.log_message(str(key) + ' on_action=' + str(value['on_action']) + ' and off_action=' + str(value['off_action']))
+	    self.log_message('X-Control CC coalescing: ' + self._control_component.get_cc_coalescing_stats())
+	    self.log_message('Snapshot cache: ' + self._snap_actions.get_snap_cache_stats())
+	    self.log_message('Parameter write scheduler: ' + self._write_scheduler.get_stats())
 	    self.log_message('------- ClyphX Log: Logging User Actions -------')
 	    for key, value in self._user_actions._action_dict.items():
 		self.log_message(str(key) + '=' + str(value))	 
@@ -630,11 +731,8 @@ class ClyphX(ControlSurface):
 	""" Setup component tracks on ini and track list changes.  Also call Macrobat's get rack """
 	for t in self.song().tracks:
 	    self._macrobat.setup_tracks(t)
-	    if (self._current_tracks and t in self._current_tracks):
-		pass
-	    else:
-		self._current_tracks.append(t)
-		ClyphXTrackComponent(self, t)
+	    if not t in self._current_tracks:
+		self._current_tracks[t] = ClyphXTrackComponent(self, t)
 	for r in tuple(self.song().return_tracks) + (self.song().master_track,):
 	    self._macrobat.setup_tracks(r)
 	self._snap_actions.setup_tracks()
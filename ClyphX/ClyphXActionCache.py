@@ -0,0 +1,139 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+from ClyphXSnapStore import SNAP_STORE_REF_PREFIX
+
+MAX_CACHED_ACTION_LISTS = 2048
+
+class ClyphXActionCache(object):
+    """ Caches compiled action lists keyed by the raw name of the X-Trigger they belong to. An entry is only
+    rebuilt when the name changes or when a variable that the action list references is reassigned. """
+    
+    def __init__(self, parent):
+        self._parent = parent
+        self._entries = {}
+        self._entries_by_variable = {}
+        
+        
+    def disconnect(self):
+        self.clear()
+        self._parent = None
+        
+        
+    def clear(self):
+        """ Removes all compiled action lists. """
+        self._entries = {}
+        self._entries_by_variable = {}
+        
+        
+    def get_entry(self, name, is_xclip):
+        """ Returns the compiled entry for the given X-Trigger name, compiling it if necessary. """
+        key = (name, is_xclip)
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) >= MAX_CACHED_ACTION_LISTS:
+                self.clear()
+            entry = self._compile_entry(name, is_xclip)
+            entry['key'] = key
+            self._entries[key] = entry
+            for var_name in entry['variables']:
+                self._entries_by_variable.setdefault(var_name, set()).add(key)
+        return entry
+    
+    
+    def is_cached(self, entry):
+        """ Returns whether the given entry is still valid. """
+        return self._entries.get(entry['key']) is entry
+    
+    
+    def invalidate_variable(self, var_name):
+        """ Removes all entries that reference the given variable name. """
+        keys = self._entries_by_variable.pop(var_name, None)
+        if keys:
+            for key in keys:
+                self._entries.pop(key, None)
+                
+                
+    def _compile_entry(self, name, is_xclip):
+        """ Separates ident from the action lists and compiles the on and off action lists. """
+        upper_name = self._parent.get_name(name).strip()
+        entry = {'name' : upper_name, 'is_snap' : False, 'is_control' : False, 'ident' : None, 'on' : None, 'off' : None, 'variables' : set()}
+        if upper_name and upper_name[0] == '[' and ']' in upper_name:
+            # Snapshots are only recalled by playing X-Clips, so these are compiled as standard triggers as well
+            entry['is_snap'] = ' || (' in upper_name or ' || ' + SNAP_STORE_REF_PREFIX.upper() in upper_name
+            if '[[' in upper_name and ']]' in upper_name:
+                entry['is_control'] = True
+            else:
+                ident = upper_name[upper_name.index('['):upper_name.index(']')+1].strip()
+                raw_action_list = upper_name.replace(ident, '', 1).strip()
+                if raw_action_list:
+                    entry['ident'] = ident
+                    if is_xclip:
+                        # X-Clips can have on and off action lists seperated by a comma
+                        split_list = raw_action_list.split(',')
+                        entry['on'] = self._compile_action_list(split_list[0], is_xclip, entry['variables'])
+                        if len(split_list) == 2:
+                            if split_list[1].strip() == '*':
+                                entry['off'] = entry['on']
+                            else:
+                                entry['off'] = self._compile_action_list(split_list[1], is_xclip, entry['variables'])
+                    else:
+                        entry['on'] = self._compile_action_list(raw_action_list, is_xclip, entry['variables'])
+        return entry
+    
+    
+    def _compile_action_list(self, raw_action_list, is_xclip, variables):
+        """ Compiles a single action list into its PSEQ/LSEQ flags and a list of action records. """
+        is_play_seq = False
+        is_loop_seq = False
+        if raw_action_list and raw_action_list[0] == '(' and '(PSEQ)' in raw_action_list: 
+            is_play_seq = True
+            raw_action_list = raw_action_list.replace('(PSEQ)', '').strip()
+        elif is_xclip and raw_action_list and raw_action_list[0] == '(' and '(LSEQ)' in raw_action_list: 
+            is_loop_seq = True
+            raw_action_list = raw_action_list.replace('(LSEQ)', '').strip()
+        records = []
+        for action in raw_action_list.split(';'):
+            records.append(self._compile_action(action.strip(), variables))
+        return {'is_play_seq' : is_play_seq, 'is_loop_seq' : is_loop_seq, 'actions' : records}
+    
+    
+    def _compile_action(self, raw_action, variables):
+        """ Compiles a single action into a record holding the track spec, action name and args. Assignments and 
+        actions whose variables can't be determined up front are only flagged as they need to be formatted each 
+        time the action list is triggered. """
+        record = {'raw' : raw_action, 'is_assignment' : False, 'is_dynamic' : False, 'track_spec' : None, 'action' : '', 'args' : ''}
+        action_name = self._parent.replace_user_variables(raw_action)
+        if not '=' in raw_action:
+            variables.update(self._parent._variable_templates.get_variable_names(raw_action))
+            record['is_dynamic'] = self._parent._variable_templates.is_dynamic(raw_action)
+        if '=' in action_name:
+            record['is_assignment'] = True
+        else:
+            record['track_spec'], record['action'], record['args'] = self._parent.parse_action_name(action_name)
+        return record
+    
+    
+# local variables:
+# tab-width: 4
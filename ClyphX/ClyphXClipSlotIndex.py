@@ -0,0 +1,164 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import Live
+
+class ClyphXClipSlotIndex(object):
+    """ Lazily built index of a track's clip slots by upper-case clip name along with the set of slots that hold X-Clips. 
+    Once built, the index is updated for individual slots from has_clip and clip name listeners and is only rebuilt when 
+    the track's clip slots change. """
+    __module__ = __name__
+    
+    def __init__(self, track):
+        self._track = track
+        self._slots = []
+        self._clips = []
+        self._names = []
+        self._indices_by_name = {}
+        self._xclip_slots = set()
+        self._slot_listeners = []
+        self._clip_listeners = []
+        self._is_built = False
+        self._track.add_clip_slots_listener(self.invalidate)
+        
+        
+    def disconnect(self):
+        self.invalidate()
+        try:
+            if self._track.clip_slots_has_listener(self.invalidate):
+                self._track.remove_clip_slots_listener(self.invalidate)
+        except: pass
+        self._track = None
+        
+        
+    def get_slot_index_by_name(self, name):
+        """ Returns the index of the first slot containing a clip with the given upper-case name or -1 if there is none. """
+        if not self._is_built:
+            self._build()
+        indices = self._indices_by_name.get(name)
+        if indices:
+            return indices[0]
+        return -1
+    
+    
+    def is_xclip_slot(self, index):
+        """ Returns whether the slot at the given index holds a clip whose name is in X-Clip format. """
+        if not self._is_built:
+            self._build()
+        return index in self._xclip_slots
+    
+    
+    def invalidate(self):
+        """ Removes all listeners and clears the index so that it will be rebuilt on the next lookup. """
+        if self._is_built:
+            for index in range(len(self._slots)):
+                self._remove_clip_listener(index)
+                try:
+                    if self._slots[index].has_clip_has_listener(self._slot_listeners[index]):
+                        self._slots[index].remove_has_clip_listener(self._slot_listeners[index])
+                except: pass
+        self._slots = []
+        self._clips = []
+        self._names = []
+        self._indices_by_name = {}
+        self._xclip_slots = set()
+        self._slot_listeners = []
+        self._clip_listeners = []
+        self._is_built = False
+        
+        
+    def _build(self):
+        self._slots = list(self._track.clip_slots)
+        num_slots = len(self._slots)
+        self._clips = [None] * num_slots
+        self._names = [None] * num_slots
+        self._clip_listeners = [None] * num_slots
+        self._slot_listeners = [self._get_listener(self._on_has_clip_changed, index) for index in range(num_slots)]
+        self._is_built = True
+        for index in range(num_slots):
+            self._slots[index].add_has_clip_listener(self._slot_listeners[index])
+            self._update_slot(index)
+            
+            
+    def _update_slot(self, index):
+        """ Updates the clip listener and name entry of the slot at the given index. """
+        self._remove_clip_listener(index)
+        self._remove_name_index(index)
+        slot = self._slots[index]
+        if slot.has_clip:
+            self._clips[index] = slot.clip
+            self._clip_listeners[index] = self._get_listener(self._on_clip_name_changed, index)
+            self._clips[index].add_name_listener(self._clip_listeners[index])
+            self._on_clip_name_changed(index)
+            
+            
+    def _on_has_clip_changed(self, index):
+        if self._is_built:
+            self._update_slot(index)
+            
+            
+    def _on_clip_name_changed(self, index):
+        if self._is_built:
+            self._remove_name_index(index)
+            clip_name = self._clips[index].name
+            self._names[index] = clip_name.upper()
+            if len(clip_name) > 2 and clip_name[0] == '[' and ']' in clip_name:
+                self._xclip_slots.add(index)
+            indices = self._indices_by_name.setdefault(self._names[index], [])
+            indices.append(index)
+            indices.sort()
+            
+            
+    def _remove_name_index(self, index):
+        name = self._names[index]
+        if name is not None:
+            indices = self._indices_by_name.get(name)
+            if indices and index in indices:
+                indices.remove(index)
+                if not indices:
+                    del self._indices_by_name[name]
+            self._names[index] = None
+            self._xclip_slots.discard(index)
+            
+            
+    def _remove_clip_listener(self, index):
+        clip = self._clips[index]
+        if clip is not None:
+            try:
+                if clip.name_has_listener(self._clip_listeners[index]):
+                    clip.remove_name_listener(self._clip_listeners[index])
+            except: pass
+        self._clips[index] = None
+        self._clip_listeners[index] = None
+        
+        
+    def _get_listener(self, method, index):
+        """ Returns a listener that calls the given method with the given slot index. """
+        def listener():
+            method(index)
+        return listener
+    
+    
+# local variables:
+# tab-width: 4
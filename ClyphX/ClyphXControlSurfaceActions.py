@@ -28,6 +28,7 @@ from _Framework.ControlSurface import ControlSurface
 from _Framework.SessionComponent import SessionComponent 
 from _Framework.MixerComponent import MixerComponent
 from _Framework.DeviceComponent import DeviceComponent
+from ClyphXSongClock import CLOCK_BEAT, CLOCK_PLAYING
 from consts import *
 if IS_LIVE_9:
     from ClyphXPushActions import ClyphXPushActions
@@ -355,7 +356,7 @@ class ClyphXControlSurfaceActions(ControlSurfaceComponent):
     
     def on_selected_scene_changed(self):
 	""" Moves the scene offset of all scene linked surfaces to the selected scene with centering if specified. """
-	scn_id = list(self.song().scenes).index(self.song().view.selected_scene)
+	scn_id = self._parent._scene_index.get_selected_index()
 	for k, v in self._scripts.items():
 	    if v['scene_link']:
 		new_scn_id = scn_id
@@ -385,17 +386,18 @@ class VisualMetro(ControlSurfaceComponent):
 	self._parent = parent
         self._controls = controls
 	self._override = override
-	self._last_beat = -1
-	self.song().add_current_song_time_listener(self.on_time_changed)
-	self.song().add_is_playing_listener(self.on_time_changed)
+	self._clock = parent._song_clock
+	self._clock.add_listener(CLOCK_BEAT, self.on_beat)
+	self._clock.add_listener(CLOCK_PLAYING, self.on_is_playing_changed)
 	
 	
     def disconnect(self):
 	if self._controls:
 	    self.clear()
 	self._controls = None
-	self.song().remove_current_song_time_listener(self.on_time_changed)	
-	self.song().remove_is_playing_listener(self.on_time_changed)
+	self._clock.remove_listener(CLOCK_BEAT, self.on_beat)
+	self._clock.remove_listener(CLOCK_PLAYING, self.on_is_playing_changed)
+	self._clock = None
 	self._override = None
 	self._parent = None
 	if IS_LIVE_9:
@@ -410,18 +412,19 @@ class VisualMetro(ControlSurfaceComponent):
         pass    
 	
 	
-    def on_time_changed(self):
+    def on_beat(self):
 	""" Show visual metronome via control LEDs upon beat changes (will not be shown if in Launchpad User 1) """
-	if self.song().is_playing and (not self._override or (self._override and self._override._mode_index != 1)):
-	    time = str(self.song().get_current_beats_song_time()).split('.')
-	    if self._last_beat != int(time[1])-1:
-		self._last_beat = int(time[1])-1
-		self.clear()
-		if self._last_beat < len(self._controls):
-		    self._controls[self._last_beat].turn_on()
-		else:
-		    self._controls[len(self._controls)-1].turn_on()
-	else:
+	self.clear()
+	if not self._override or (self._override and self._override._mode_index != 1):
+	    beat = self._clock.get_beat()
+	    if beat < len(self._controls):
+		self._controls[beat].turn_on()
+	    else:
+		self._controls[len(self._controls)-1].turn_on()
+		
+		
+    def on_is_playing_changed(self):
+	if not self._clock.is_playing():
 	    self.clear()
 		
 		
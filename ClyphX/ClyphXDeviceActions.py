@@ -114,21 +114,26 @@ class ClyphXDeviceActions(ControlSurfaceComponent):
 	
 	
     def randomize_params(self, device, track, xclip, ident, args):
-	""" Randomize device parameters """
+	""" Randomize device parameters.  RND0-126 maps each random int in 0 - 127 to the same step of each param's range as before """
 	name = self._parent.get_name(device.name)
 	if not name.startswith(('NK RND', 'NK RST', 'NK CHAIN MIX', 'NK DR', 'NK LEARN', 'NK RECEIVER', 'NK TRACK', 'NK SIDECHAIN')):
-	    for p in device.parameters:
-		if p and p.is_enabled and not p.is_quantized and p.name != 'Chain Selector':
-		    p.value = (((p.max - p.min) / 127) * Live.Application.get_random_int(0, 128)) + p.min   
+	    self.write_adjusted_params(device, self._parent.get_parameter_adjustment('RND0-126'))
 		
 		
     def reset_params(self, device, track, xclip, ident, args):
 	""" Reset device parameters """
 	name = self._parent.get_name(device.name)
 	if not name.startswith(('NK RND', 'NK RST', 'NK CHAIN MIX', 'NK DR', 'NK LEARN', 'NK RECEIVER', 'NK TRACK', 'NK SIDECHAIN')):
-	    for p in device.parameters:
-		if p and p.is_enabled and not p.is_quantized and p.name != 'Chain Selector':
-		    p.value = p.default_value
+	    self.write_adjusted_params(device, self._parent.get_parameter_adjustment('RESET'))
+    
+    
+    def write_adjusted_params(self, device, adjustment):
+	""" Writes the values of the adjustment for the device's continuous params via the write scheduler """
+	for p in device.parameters:
+	    if p and p.is_enabled and not p.is_quantized and p.name != 'Chain Selector':
+		new_value = adjustment.get_value(p)
+		if new_value is not None:
+		    self._parent.write_parameter(p, new_value)
 		
 		
     def select_device(self, device, track, xclip, ident, args):
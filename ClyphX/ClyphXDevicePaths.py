@@ -0,0 +1,202 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import Live
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from consts import *
+
+MAX_COMPILED_PATHS = 1024
+
+class ClyphXDevicePathResolver(ControlSurfaceComponent):
+    """ Resolves DEV, DEV"name" and DEVx.y.z specs to devices. Index specs are compiled once into index paths and the 
+    devices they resolve to are cached per track along with the track's top-level devices by name. A track's cache is 
+    invalidated from the track's devices listener, the chains listeners of racks and the devices listeners of chains 
+    that paths resolved through and the name listeners of top-level devices. """
+    __module__ = __name__
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._compiled_paths = {}
+        self._track_caches = {}
+        
+        
+    def disconnect(self):
+        self.clear()
+        self._compiled_paths = {}
+        self._parent = None
+        if IS_LIVE_9:
+            ControlSurfaceComponent.disconnect(self)
+            
+            
+    def on_enabled_changed(self):
+        pass
+    
+    
+    def update(self):
+        pass
+    
+    
+    def on_track_list_changed(self):
+        self.clear()
+        
+        
+    def clear(self):
+        """ Removes the caches (and listeners) of all tracks. """
+        for cache in self._track_caches.values():
+            cache.disconnect()
+        self._track_caches = {}
+        
+        
+    def get_device_by_name(self, track, name):
+        """ Returns the first top-level device on the track with the given upper-case name or None. """
+        return self._get_track_cache(track).get_device_by_name(name)
+    
+    
+    def get_device_by_path(self, track, dev_spec):
+        """ Returns the device on the track that the given DEVx or DEVx.y.z spec refers to or None. """
+        if not self._compiled_paths.has_key(dev_spec):
+            if len(self._compiled_paths) >= MAX_COMPILED_PATHS:
+                self._compiled_paths = {}
+            self._compiled_paths[dev_spec] = self._compile_path(dev_spec)
+        path = self._compiled_paths[dev_spec]
+        if path is None:
+            return None
+        return self._get_track_cache(track).get_device_by_path(path)
+    
+    
+    def _compile_path(self, dev_spec):
+        """ Compiles a DEVx or DEVx.y.z spec into a tuple of device index, chain index and chain device index (zero-based) 
+        or None if the spec is invalid. Only the device index and chain index are required for nested specs. """
+        dev_num = dev_spec.replace('DEV', '')
+        try:
+            if '.' in dev_num:
+                if not self._parent._can_have_nested_devices:
+                    return None
+                dev_split = dev_num.split('.')
+                if len(dev_split) > 2:
+                    return (int(dev_split[0]) - 1, int(dev_split[1]) - 1, int(dev_split[2]) - 1)
+                return (int(dev_split[0]) - 1, int(dev_split[1]) - 1)
+            return (int(dev_num) - 1,)
+        except: return None
+        
+        
+    def _get_track_cache(self, track):
+        cache = self._track_caches.get(track)
+        if cache is None:
+            cache = TrackDeviceCache(track)
+            self._track_caches[track] = cache
+        elif not cache.is_valid():
+            cache.reset()
+        return cache
+    
+    
+class TrackDeviceCache(object):
+    """ Cache of a single track's devices by top-level name and by index path. Listener notifications only mark the 
+    cache as invalid, it's reset on next access. """
+    __module__ = __name__
+    
+    def __init__(self, track):
+        self._track = track
+        self._by_name = None
+        self._by_path = {}
+        self._listeners = {}
+        self._is_valid = True
+        self._add_listener(track, 'devices')
+        
+        
+    def disconnect(self):
+        self._remove_listeners()
+        self._track = None
+        
+        
+    def is_valid(self):
+        return self._is_valid
+    
+    
+    def invalidate(self):
+        self._is_valid = False
+        
+        
+    def reset(self):
+        """ Clears the cache and sets up the listeners needed for it to be valid again. """
+        self._remove_listeners()
+        self._by_name = None
+        self._by_path = {}
+        self._is_valid = True
+        self._add_listener(self._track, 'devices')
+        
+        
+    def get_device_by_name(self, name):
+        if self._by_name is None:
+            self._by_name = {}
+            for device in self._track.devices:
+                self._add_listener(device, 'name')
+                dev_name = device.name.upper()
+                if not self._by_name.has_key(dev_name):
+                    self._by_name[dev_name] = device
+        return self._by_name.get(name)
+    
+    
+    def get_device_by_path(self, path):
+        if not self._by_path.has_key(path):
+            self._by_path[path] = self._resolve_path(path)
+        return self._by_path[path]
+    
+    
+    def _resolve_path(self, path):
+        """ Resolves the path through the LOM, adding listeners to the racks and chains it passes through. """
+        try:
+            device = self._track.devices[path[0]]
+            if len(path) > 1:
+                if not (device and device.can_have_chains):
+                    return None
+                self._add_listener(device, 'chains')
+                chain = device.chains[path[1]]
+                self._add_listener(chain, 'devices')
+                if len(path) > 2:
+                    return chain.devices[path[2]]
+                return chain.devices[0]
+            return device
+        except: return None
+        
+        
+    def _add_listener(self, lom_object, property_name):
+        key = (lom_object, property_name)
+        if not self._listeners.has_key(key):
+            self._listeners[key] = self.invalidate
+            getattr(lom_object, 'add_' + property_name + '_listener')(self.invalidate)
+            
+            
+    def _remove_listeners(self):
+        for lom_object, property_name in self._listeners.keys():
+            try:
+                if getattr(lom_object, property_name + '_has_listener')(self.invalidate):
+                    getattr(lom_object, 'remove_' + property_name + '_listener')(self.invalidate)
+            except: pass
+        self._listeners = {}
+        
+        
+# local variables:
+# tab-width: 4
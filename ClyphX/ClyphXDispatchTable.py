@@ -0,0 +1,97 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+MAX_RESOLVED_ROUTES = 4096
+
+def bind_handlers(action_dict, component):
+    """ Returns dict of action names to the bound methods of the given component that the action dict names. """
+    handlers = {}
+    for name, method_name in action_dict.items():
+        handlers[name] = getattr(component, method_name)
+    return handlers
+
+
+class ClyphXDispatchTable(object):
+    """ Resolves action names to the route (dispatcher and bound handler) that should perform them. Exact names are 
+    held in a dict and prefixes in a trie. Each route has a priority that mirrors the order in which action names were 
+    originally checked, so the lowest priority matching route wins. Resolved names are memoized so that repeat 
+    dispatches of the same action name cost a single lookup. """
+    
+    def __init__(self):
+        self._exact_routes = {}
+        self._prefix_trie = {}
+        self._resolved_routes = {}
+        
+        
+    def disconnect(self):
+        self._exact_routes = {}
+        self._prefix_trie = {}
+        self._resolved_routes = {}
+        
+        
+    def add_exact(self, name, priority, dispatcher, handler=None):
+        """ Adds a route for the given action name. Existing routes with a lower priority are kept. """
+        current = self._exact_routes.get(name)
+        if current is None or priority < current[0]:
+            self._exact_routes[name] = (priority, (dispatcher, handler))
+            self._resolved_routes = {}
+            
+            
+    def add_prefix(self, prefix, priority, dispatcher, handler=None):
+        """ Adds a route for all action names starting with the given prefix. """
+        node = self._prefix_trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        current = node.get(None)
+        if current is None or priority < current[0]:
+            node[None] = (priority, (dispatcher, handler))
+            self._resolved_routes = {}
+            
+            
+    def get_route(self, name):
+        """ Returns the (dispatcher, handler) route for the given action name or None if no route matches. """
+        try:
+            return self._resolved_routes[name]
+        except KeyError:
+            pass
+        best = self._exact_routes.get(name)
+        node = self._prefix_trie
+        for char in name:
+            node = node.get(char)
+            if node is None:
+                break
+            rule = node.get(None)
+            if rule is not None and (best is None or rule[0] < best[0]):
+                best = rule
+        route = None
+        if best is not None:
+            route = best[1]
+        if len(self._resolved_routes) >= MAX_RESOLVED_ROUTES:
+            self._resolved_routes = {}
+        self._resolved_routes[name] = route
+        return route
+    
+    
+# local variables:
+# tab-width: 4
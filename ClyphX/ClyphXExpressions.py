@@ -0,0 +1,319 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import math
+import random
+
+MAX_CACHED_EXPRESSIONS = 1024
+
+""" Limits of exponents and of the size of results, so that an expression like (9**9**9) or ("x"*10**9) can't hang Live 
+or exhaust its memory. """
+MAX_EXPONENT = 1024
+MAX_INT_BITS = 1024
+MAX_STRING_LENGTH = 4096
+NAME_TERMINATORS = ' \t%()+-*/,<>=!"\''
+COMPARISON_OPERATORS = {
+    '<' : lambda a, b: a < b,
+    '<=' : lambda a, b: a <= b,
+    '>' : lambda a, b: a > b,
+    '>=' : lambda a, b: a >= b,
+    '==' : lambda a, b: a == b,
+    '!=' : lambda a, b: a != b}
+SUM_OPERATORS = {
+    '+' : lambda a, b: _check_size(a + b),
+    '-' : lambda a, b: _check_size(a - b)}
+TERM_OPERATORS = {
+    '*' : lambda a, b: _multiply(a, b),
+    '/' : lambda a, b: a / b,
+    '//' : lambda a, b: a // b,
+    '%' : lambda a, b: a % b}
+OPERATORS = ('**', '//', '<=', '>=', '==', '!=', '<', '>', '+', '-', '*', '/', '%', '(', ')', ',')
+
+class ExpressionError(Exception):
+    pass
+
+
+class ClyphXExpressions(object):
+    """ Evaluates the expressions used in variable assignments, such as x = (%x% + 1). Expressions support arithmetic, 
+    comparison, numbers, quoted strings, %name% variables and the functions MIN, MAX, ABS, INT, ROUND and RND (random 
+    int in the given inclusive range). Each expression is parsed once into a tree of closures that's cached by its 
+    source text, so nothing is compiled or executed through eval. """
+    
+    def __init__(self):
+        self._evaluators = {}
+        self._random = random.Random()
+        self._functions = {
+            'MIN' : min,
+            'MAX' : max,
+            'ABS' : abs,
+            'INT' : int,
+            'ROUND' : round,
+            'RND' : self._random.randint}
+        
+        
+    def disconnect(self):
+        self._evaluators = {}
+        self._functions = {}
+        
+        
+    def evaluate(self, expression, variables):
+        """ Evaluates the given expression against the given dict of variables. Raises an exception if the expression 
+        is invalid or can't be evaluated. """
+        evaluator = self._evaluators.get(expression)
+        if evaluator is None:
+            if len(self._evaluators) >= MAX_CACHED_EXPRESSIONS:
+                self._evaluators = {}
+            evaluator = self.compile(expression)
+            self._evaluators[expression] = evaluator
+        return evaluator(variables)
+    
+    
+    def compile(self, expression):
+        """ Parses the given expression into an evaluator that receives a dict of variables. """
+        parser = _Parser(self._tokenize(expression), self._functions)
+        evaluator = parser.parse_comparison()
+        if not parser.is_done():
+            raise ExpressionError('Unexpected token in expression: ' + str(expression))
+        return evaluator
+    
+    
+    def _tokenize(self, expression):
+        """ Splits the given expression into a list of (type, value) tokens. A % followed by a name and another % is 
+        a variable, otherwise it's the modulo operator. """
+        tokens = []
+        index = 0
+        length = len(expression)
+        while index < length:
+            char = expression[index]
+            if char in ' \t':
+                index += 1
+            elif char.isdigit() or (char == '.' and expression[index+1:index+2].isdigit()):
+                end = index
+                while end < length and (expression[end].isdigit() or expression[end] == '.'):
+                    end += 1
+                number = expression[index:end]
+                if '.' in number:
+                    tokens.append(('value', float(number)))
+                else:
+                    tokens.append(('value', int(number)))
+                index = end
+            elif char in '"\'':
+                end = expression.find(char, index + 1)
+                if end == -1:
+                    raise ExpressionError('Unterminated string in expression: ' + str(expression))
+                tokens.append(('value', expression[index+1:end]))
+                index = end + 1
+            elif char == '%' and self._get_variable_end(expression, index) != -1:
+                end = self._get_variable_end(expression, index)
+                tokens.append(('variable', expression[index+1:end]))
+                index = end + 1
+            elif char.isalpha() or char == '_':
+                end = index
+                while end < length and (expression[end].isalnum() or expression[end] == '_'):
+                    end += 1
+                tokens.append(('name', expression[index:end].upper()))
+                index = end
+            else:
+                for op in OPERATORS:
+                    if expression.startswith(op, index):
+                        tokens.append(('op', op))
+                        index += len(op)
+                        break
+                else:
+                    raise ExpressionError('Invalid character in expression: ' + str(expression))
+        return tokens
+    
+    
+    def _get_variable_end(self, expression, index):
+        """ Returns the index of the % closing the variable name that starts at the given index or -1 if there is none. """
+        end = index + 1
+        while end < len(expression) and expression[end] not in NAME_TERMINATORS:
+            end += 1
+        if end > index + 1 and end < len(expression) and expression[end] == '%':
+            return end
+        return -1
+    
+    
+class _Parser(object):
+    """ Recursive descent parser that turns tokens into closures, following Python's operator precedence. """
+    
+    def __init__(self, tokens, functions):
+        self._tokens = tokens
+        self._functions = functions
+        self._index = 0
+        
+        
+    def is_done(self):
+        return self._index == len(self._tokens)
+    
+    
+    def _peek_op(self):
+        if self._index < len(self._tokens) and self._tokens[self._index][0] == 'op':
+            return self._tokens[self._index][1]
+        return None
+    
+    
+    def _next(self):
+        if self._index >= len(self._tokens):
+            raise ExpressionError('Unexpected end of expression')
+        token = self._tokens[self._index]
+        self._index += 1
+        return token
+    
+    
+    def _expect(self, op):
+        if self._next() != ('op', op):
+            raise ExpressionError('Expected ' + op)
+        
+        
+    def parse_comparison(self):
+        first = self.parse_sum()
+        comparisons = []
+        while self._peek_op() in COMPARISON_OPERATORS:
+            op = COMPARISON_OPERATORS[self._next()[1]]
+            comparisons.append((op, self.parse_sum()))
+        if not comparisons:
+            return first
+        def compare(variables):
+            left = first(variables)
+            for op, operand in comparisons:
+                right = operand(variables)
+                if not op(left, right):
+                    return False
+                left = right
+            return True
+        return compare
+    
+    
+    def parse_sum(self):
+        return self._parse_binary(self.parse_term, SUM_OPERATORS)
+    
+    
+    def parse_term(self):
+        return self._parse_binary(self.parse_unary, TERM_OPERATORS)
+    
+    
+    def _parse_binary(self, parse_operand, operators):
+        left = parse_operand()
+        while self._peek_op() in operators:
+            left = self._make_binary(operators[self._next()[1]], left, parse_operand())
+        return left
+    
+    
+    def _make_binary(self, op, left, right):
+        return lambda variables: op(left(variables), right(variables))
+    
+    
+    def parse_unary(self):
+        op = self._peek_op()
+        if op in ('-', '+'):
+            self._next()
+            operand = self.parse_unary()
+            if op == '-':
+                return lambda variables: -operand(variables)
+            return lambda variables: +operand(variables)
+        return self.parse_power()
+    
+    
+    def parse_power(self):
+        base = self.parse_atom()
+        if self._peek_op() == '**':
+            self._next()
+            return self._make_binary(_power, base, self.parse_unary())
+        return base
+    
+    
+    def parse_atom(self):
+        token_type, value = self._next()
+        if token_type == 'value':
+            return lambda variables: value
+        elif token_type == 'variable':
+            return lambda variables: _to_number(variables.get(value, 0))
+        elif token_type == 'name':
+            if not value in self._functions:
+                raise ExpressionError('Unknown function: ' + value)
+            return self._parse_call(self._functions[value])
+        elif value == '(':
+            inner = self.parse_comparison()
+            self._expect(')')
+            return inner
+        raise ExpressionError('Unexpected token: ' + str(value))
+    
+    
+    def _parse_call(self, function):
+        self._expect('(')
+        args = []
+        if self._peek_op() != ')':
+            args.append(self.parse_comparison())
+            while self._peek_op() == ',':
+                self._next()
+                args.append(self.parse_comparison())
+        self._expect(')')
+        return lambda variables: function(*[arg(variables) for arg in args])
+    
+    
+def _check_size(value):
+    """ Returns the given result or raises an exception if it's an int or string that's too large. """
+    if isinstance(value, (int, long)):
+        if abs(value) >> MAX_INT_BITS:
+            raise ExpressionError('Number too large')
+    elif isinstance(value, basestring) and len(value) > MAX_STRING_LENGTH:
+        raise ExpressionError('String too long')
+    return value
+
+
+def _multiply(a, b):
+    """ Multiplies the given values, checking the size of repeated strings before creating them. """
+    if isinstance(a, basestring) or isinstance(b, basestring):
+        if isinstance(a, basestring):
+            string, count = a, b
+        else:
+            string, count = b, a
+        if isinstance(count, (int, long)) and len(string) * count > MAX_STRING_LENGTH:
+            raise ExpressionError('String too long')
+    return _check_size(a * b)
+
+
+def _power(a, b):
+    """ Raises a to the power of b, checking the size of the result before computing it. """
+    if abs(b) > MAX_EXPONENT:
+        raise ExpressionError('Exponent too large')
+    if isinstance(a, (int, long)) and isinstance(b, (int, long)) and b > 0 and abs(a) > 1:
+        if math.log(abs(a), 2) * b > MAX_INT_BITS:
+            raise ExpressionError('Number too large')
+    return _check_size(a ** b)
+
+
+def _to_number(value):
+    """ Converts variable values stored as strings to numbers where possible. """
+    if isinstance(value, basestring):
+        try: return int(value)
+        except ValueError:
+            try: return float(value)
+            except ValueError: return value
+    return value
+    
+    
+# local variables:
+# tab-width: 4
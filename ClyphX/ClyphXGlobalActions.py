@@ -26,6 +26,7 @@ import os
 import re
 import Live 
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from ClyphXSongClock import CLOCK_SIXTEENTH
 from consts import *
 if IS_LIVE_9:
     from functools import partial
@@ -43,22 +44,21 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 	self._repeat_enabled = False
 	self._tempo_ramp_active = False
 	self._tempo_ramp_settings = []
-	self._last_beat = -1
-	self.song().add_current_song_time_listener(self.on_time_changed)
-	self.song().add_is_playing_listener(self.on_time_changed)
+	self._clock = parent._song_clock
+	self._clock.add_listener(CLOCK_SIXTEENTH, self.on_sixteenth)
 	if self.song().clip_trigger_quantization != 0:
 	    self._last_gqntz = int(self.song().clip_trigger_quantization)
 	if self.song().midi_recording_quantization != 0:
 	    self._last_rqntz = int(self.song().midi_recording_quantization)
-	self._last_scene_index = list(self.song().scenes).index(self.song().view.selected_scene)
+	self._last_scene_index = self._parent._scene_index.get_selected_index()
 	self._scenes_to_monitor = []
 	self.setup_scene_listeners()
 	
 	
     def disconnect(self):
 	self.remove_scene_listeners()
-	self.song().remove_current_song_time_listener(self.on_time_changed)
-	self.song().remove_is_playing_listener(self.on_time_changed)
+	self._clock.remove_listener(CLOCK_SIXTEENTH, self.on_sixteenth)
+	self._clock = None
 	self._tempo_ramp_settings = []
 	self._scenes_to_monitor = None
 	self._parent = None
@@ -131,7 +131,7 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 		start = int(arg_array[1])
 		length = int(arg_array[2])
 		for index in range(length):
-		    self._parent._user_variables[arg_array[0] + str(index + 1)] = str(index + start)
+		    self._parent.set_user_variable(arg_array[0] + str(index + 1), str(index + start))
 	    except: pass
 	    
 	    
@@ -644,13 +644,10 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 	    except: pass
 	    
 	    
-    def on_time_changed(self):
+    def on_sixteenth(self):
 	""" Smooth BPM changes synced to tempo """
-	if self._tempo_ramp_active and self._tempo_ramp_settings and self.song().is_playing:
-	    time = int(str(self.song().get_current_beats_song_time()).split('.')[2])
-	    if self._last_beat != time:
-		self._last_beat = time
-		self._tasks.add(self.apply_tempo_ramp)
+	if self._tempo_ramp_active and self._tempo_ramp_settings:
+	    self._tasks.add(self.apply_tempo_ramp)
 		
 		
     def apply_tempo_ramp(self, arg=None):
@@ -837,7 +834,7 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 		
 		
     def get_scene_to_operate_on(self, xclip, args):
-	scene = list(self.song().scenes).index(self.song().view.selected_scene)
+	scene = self._parent._scene_index.get_selected_index()
 	if type(xclip) is Live.Clip.Clip:
 	    scene = xclip.canonical_parent.canonical_parent.playing_slot_index
 	if args != '':
@@ -845,16 +842,19 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 		scene_name = args[args.index('"')+1:]
 		if '"' in scene_name:
 		    scene_name = scene_name[0:scene_name.index('"')]
-		    for index in range(len(self.song().scenes)):
-			if scene_name == self.song().scenes[index].name.upper():
-			    scene = index
-			    break
-			found=re.match(scene_name,self.song().scenes[index].name.upper(),re.M|re.I)
+		    scene_names = self._parent._scene_index.get_names()
+		    match_index = self._parent._scene_index.get_index_by_name(scene_name)
+		    if match_index == -1:
+			match_index = len(scene_names)
+		    for index in range(match_index):#--Scenes before an exact match can still be matched as a pattern
+			found=re.match(scene_name,scene_names[index],re.M|re.I)
 			if found:
-			    scene = index
+			    match_index = index
 			    break
+		    if match_index < len(scene_names):
+			scene = match_index
 	    elif args == 'SEL':
-		scene = list(self.song().scenes).index(self.song().view.selected_scene)
+		scene = self._parent._scene_index.get_selected_index()
 	    else:
 		try:
 		    if int(args) in range(len(self.song().scenes)):
@@ -948,7 +948,7 @@ class ClyphXGlobalActions(ControlSurfaceComponent):
 	self.remove_scene_listeners()
 	scenes = self.song().scenes
 	if not self._last_scene_index in range(len(scenes)):
-	    self._last_scene_index = list(self.song().scenes).index(self.song().view.selected_scene)
+	    self._last_scene_index = self._parent._scene_index.get_selected_index()
 	for index in range(len(scenes)):
 	    self._scenes_to_monitor.append(scenes[index])
 	    listener = lambda index = index:self.on_scene_triggered(index)
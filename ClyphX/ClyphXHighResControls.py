@@ -0,0 +1,161 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+HIGH_RES_MAX_VALUE = 16383
+NRPN_PARAM_MSB = 99
+NRPN_PARAM_LSB = 98
+RPN_PARAM_MSB = 101
+RPN_PARAM_LSB = 100
+DATA_ENTRY_MSB = 6
+DATA_ENTRY_LSB = 38
+NRPN_CC_NUMS = (NRPN_PARAM_MSB, NRPN_PARAM_LSB, RPN_PARAM_MSB, RPN_PARAM_LSB, DATA_ENTRY_MSB, DATA_ENTRY_LSB)
+
+class HighResDecoder(object):
+    """ Stateful decoder for the CC messages of a single MIDI channel that assembles 14-bit CC pairs (MSB on CC 0-31 
+    followed by LSB on CC 32-63) and NRPN sequences (parameter number on CC 99/98 followed by data entry on CC 6/38) 
+    into 14-bit values.  Values are complete when their LSB is received. """
+    
+    def __init__(self):
+        self.handled_ccs = [False] * 128
+        self._cc14_controls = [None] * 32
+        self._nrpn_controls = {}
+        self._msbs = [0] * 32
+        self._nrpn_msb = 127
+        self._nrpn_lsb = 127
+        self._nrpn_param = -1
+        self._data_msb = 0
+        
+        
+    def add_cc14_control(self, msb_num, ctrl_data):
+        """ Adds a control for the 14-bit CC pair whose MSB is sent on the given CC number (0-31). """
+        self._cc14_controls[msb_num] = ctrl_data
+        self.handled_ccs[msb_num] = True
+        self.handled_ccs[msb_num + 32] = True
+        
+        
+    def add_nrpn_control(self, param_num, ctrl_data):
+        """ Adds a control for the given NRPN parameter number (0-16383). """
+        self._nrpn_controls[param_num] = ctrl_data
+        for num in NRPN_CC_NUMS:
+            self.handled_ccs[num] = True
+            
+            
+    def decode(self, num, value):
+        """ Decodes the given CC message.  Returns the control whose 14-bit value was completed by the message (with its 
+        value stored under 'value') or None. NRPN data entry takes precedence over 14-bit CC pairs on CC 6/38 while an 
+        NRPN parameter is selected. """
+        if self._nrpn_controls:
+            if num == NRPN_PARAM_MSB or num == NRPN_PARAM_LSB:
+                if num == NRPN_PARAM_MSB:
+                    self._nrpn_msb = value
+                else:
+                    self._nrpn_lsb = value
+                self._nrpn_param = (self._nrpn_msb << 7) + self._nrpn_lsb
+                return None
+            if num == RPN_PARAM_MSB or num == RPN_PARAM_LSB:
+                self._nrpn_param = -1
+                return None
+            if self._nrpn_param != -1:
+                if num == DATA_ENTRY_MSB:
+                    self._data_msb = value
+                    return None
+                if num == DATA_ENTRY_LSB:
+                    ctrl_data = self._nrpn_controls.get(self._nrpn_param)
+                    if ctrl_data:
+                        ctrl_data['value'] = (self._data_msb << 7) + value
+                    return ctrl_data
+        if num < 32:
+            self._msbs[num] = value
+        elif num < 64:
+            ctrl_data = self._cc14_controls[num - 32]
+            if ctrl_data:
+                ctrl_data['value'] = (self._msbs[num - 32] << 7) + value
+                return ctrl_data
+        return None
+    
+    
+class HighResTarget(object):
+    """ Parameter target of a high-resolution X-Control compiled from an action (such as VOL, 2/SEND A, SEL/DEV2 P3 or 
+    DEV"Synth" B2 P1) that sets the params it resolves to directly from 14-bit values. """
+    
+    def __init__(self, parent, action):
+        self._parent = parent
+        self._track_spec, self._action_name, self._args = parent.parse_action_name(action.strip())
+        self._send_index = -1
+        self._param_spec = []
+        self.is_valid = self._action_name in ('VOL', 'PAN')
+        if self._action_name == 'SEND':
+            if len(self._args) == 1:
+                self._send_index = ord(self._args) - 65
+                self.is_valid = 0 <= self._send_index < 12
+        elif self._action_name.startswith('DEV'):
+            device_args = self._args
+            if 'DEV"' in self._action_name and '"' in self._args:
+                device_args = self._args[self._args.index('"')+1:].strip()
+            self._param_spec = device_args.split()
+            self.is_valid = len(self._param_spec) in (1, 2)
+            
+            
+    def disconnect(self):
+        self._parent = None
+        
+        
+    def set_value(self, value):
+        """ Sets the params this resolves to from the given 14-bit value. """
+        if self._track_spec == None:
+            tracks = [self._parent.song().view.selected_track]
+        else:
+            tracks = self._parent.get_tracks_from_spec(self._track_spec)
+        for t in tracks:
+            param = self._get_param(t)
+            if param and param.is_enabled:
+                new_value = param.min + ((param.max - param.min) * value / float(HIGH_RES_MAX_VALUE))
+                if param.is_quantized:
+                    new_value = round(new_value)
+                if new_value != param.value:
+                    param.value = new_value
+                    
+                    
+    def _get_param(self, track):
+        if self._action_name == 'VOL':
+            return track.mixer_device.volume
+        if self._action_name == 'PAN':
+            return track.mixer_device.panning
+        if self._action_name == 'SEND':
+            if self._send_index < len(track.mixer_device.sends):
+                return track.mixer_device.sends[self._send_index]
+            return None
+        device = self._parent.get_device_to_operate_on(track, self._action_name, self._args)[0]
+        if device:
+            device_actions = self._parent._device_actions
+            if len(self._param_spec) == 2:
+                return device_actions.get_banked_parameter(device, self._param_spec[0], self._param_spec[1])
+            if self._param_spec[0] == 'CS':
+                return device_actions.get_chain_selector(device)
+            return device_actions.get_bob_parameter(device, self._param_spec[0])
+        return None
+    
+    
+# local variables:
+# tab-width: 4
@@ -196,9 +196,9 @@ class ClyphXPXTActions(ControlSurfaceComponent):
 		    p = enc.mapped_parameter()
 		    if p and p.is_enabled and not p.is_quantized:
 			if randomize:
-			    p.value = (((p.max - p.min) / 127) * Live.Application.get_random_int(0, 128)) + p.min
+			    self._parent.write_parameter(p, (((p.max - p.min) / 127) * Live.Application.get_random_int(0, 128)) + p.min)
 			else:
-			    p.value = p.default_value
+			    self._parent.write_parameter(p, p.default_value)
 	
 	
     def _display_message(self, args, xclip):
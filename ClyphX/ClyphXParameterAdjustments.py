@@ -0,0 +1,137 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import random
+
+MAX_CACHED_ADJUSTMENTS = 1024
+ADJUST_NONE = 0
+ADJUST_RELATIVE = 1
+ADJUST_RESET = 2
+ADJUST_RANDOM = 3
+ADJUST_ABSOLUTE = 4
+
+class ParameterAdjustment(object):
+    """ Compiled form of a parameter adjustment value string (such as <5, >, RESET, RND10-50 or 64) that can be applied to 
+    any number of parameters. """
+    
+    def __init__(self, kind, amount=0, rnd_min=0, rnd_max=128, rnd_int=None):
+        self.kind = kind
+        self.amount = amount
+        self.rnd_min = rnd_min
+        self.rnd_max = rnd_max
+        self._rnd_int = rnd_int
+        
+        
+    def apply(self, param):
+        """ Applies the adjustment to the given param. Returns the value that was set or None if the param was 
+        disabled or the new value was out of range. """
+        new_value = self.get_value(param)
+        if new_value is not None:
+            param.value = new_value
+        return new_value
+    
+    
+    def get_value(self, param):
+        """ Returns the value that applying the adjustment would set the given param to or None if the param is disabled 
+        or the new value would be out of range. """
+        if not param.is_enabled:
+            return None
+        p_min = param.min
+        p_max = param.max
+        new_value = param.value
+        kind = self.kind
+        if kind == ADJUST_RELATIVE:
+            if param.is_quantized:
+                new_value += self.amount
+            else:
+                new_value += ((p_max - p_min) / 127) * self.amount
+        elif kind == ADJUST_ABSOLUTE:
+            new_value = (self.amount * ((p_max - p_min) / 127)) + p_min
+        elif not param.is_quantized:
+            if kind == ADJUST_RESET:
+                new_value = param.default_value
+            elif kind == ADJUST_RANDOM:
+                rnd_value = (self._rnd_int(0, 128) * (self.rnd_max - self.rnd_min) / 127) + self.rnd_min
+                new_value = (rnd_value * ((p_max - p_min) / 127)) + p_min
+        if new_value >= p_min and new_value <= p_max:
+            return new_value
+        return None
+    
+    
+class ClyphXParameterAdjustments(object):
+    """ Compiles parameter adjustment value strings into ParameterAdjustments that are cached by the value string. Random 
+    adjustments use a local random number generator rather than calling into the API for each value. """
+    
+    def __init__(self, parent):
+        self._parent = parent
+        self._adjustments = {}
+        self._random = random.Random()
+        
+        
+    def disconnect(self):
+        self._adjustments = {}
+        self._parent = None
+        
+        
+    def get_adjustment(self, value):
+        """ Returns the compiled adjustment for the given value string, compiling it if necessary. """
+        adjustment = self._adjustments.get(value)
+        if adjustment is None:
+            if len(self._adjustments) >= MAX_CACHED_ADJUSTMENTS:
+                self._adjustments = {}
+            adjustment = self._compile(value)
+            self._adjustments[value] = adjustment
+        return adjustment
+    
+    
+    def _compile(self, value):
+        if value.startswith(('<', '>')):
+            return ParameterAdjustment(ADJUST_RELATIVE, self._parent.get_adjustment_factor(value))
+        if value == 'RESET':
+            return ParameterAdjustment(ADJUST_RESET)
+        if 'RND' in value:
+            rnd_min = 0
+            rnd_max = 128
+            if value != 'RND' and '-' in value:
+                rnd_range_data = value.replace('RND', '').split('-')
+                if len(rnd_range_data) == 2:
+                    new_min = 0
+                    new_max = 128
+                    try: new_min = int(rnd_range_data[0])
+                    except: new_min = 0
+                    try: new_max = int(rnd_range_data[1]) + 1
+                    except: new_max = 128
+                    if new_min in range(0, 129) and new_max in range(0, 129) and new_min < new_max:
+                        rnd_min = new_min
+                        rnd_max = new_max
+            return ParameterAdjustment(ADJUST_RANDOM, rnd_min=rnd_min, rnd_max=rnd_max, rnd_int=self._random.randrange)
+        try:
+            if int(value) in range(128):
+                return ParameterAdjustment(ADJUST_ABSOLUTE, int(value))
+        except: pass
+        return ParameterAdjustment(ADJUST_NONE)
+    
+    
+# local variables:
+# tab-width: 4
@@ -0,0 +1,176 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import Live
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from consts import *
+
+class ClyphXSceneIndex(ControlSurfaceComponent):
+    """ Keeps the list of scenes along with maps of scene to index and upper-case name to indices as well as the index 
+    of the selected scene. The list is rebuilt lazily after the scene list changes, while selecting or renaming a scene 
+    only updates the affected entries. This should be created before other components so that it's notified of scene 
+    changes before they are. """
+    __module__ = __name__
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._scenes = ()
+        self._index_by_scene = {}
+        self._indices_by_name = {}
+        self._names = []
+        self._name_listeners = {}
+        self._selected_index = -1
+        self._is_dirty = True
+        
+        
+    def disconnect(self):
+        self._remove_name_listeners(self._name_listeners.keys())
+        self._scenes = ()
+        self._index_by_scene = {}
+        self._indices_by_name = {}
+        self._names = []
+        self._parent = None
+        if IS_LIVE_9:
+            ControlSurfaceComponent.disconnect(self)
+            
+            
+    def on_enabled_changed(self):
+        pass
+    
+    
+    def update(self):
+        pass
+    
+    
+    def on_scene_list_changed(self):
+        self._is_dirty = True
+        
+        
+    def on_selected_scene_changed(self):
+        if not self._is_dirty:
+            self._selected_index = self._index_by_scene.get(self.song().view.selected_scene, -1)
+            
+            
+    def get_scenes(self):
+        """ Returns tuple of all scenes. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._scenes
+    
+    
+    def get_names(self):
+        """ Returns list of the upper-case names of all scenes. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._names
+    
+    
+    def get_index(self, scene):
+        """ Returns the index of the given scene or -1 if it's not in the set. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._index_by_scene.get(scene, -1)
+    
+    
+    def get_selected_index(self):
+        """ Returns the index of the selected scene. """
+        if self._is_dirty:
+            self._rebuild()
+        if self._selected_index == -1:
+            self.on_selected_scene_changed()
+        return self._selected_index
+    
+    
+    def get_index_by_name(self, name):
+        """ Returns the index of the first scene with the given upper-case name or -1 if there is none. """
+        if self._is_dirty:
+            self._rebuild()
+        indices = self._indices_by_name.get(name)
+        if indices:
+            return indices[0]
+        return -1
+    
+    
+    def _on_scene_name_changed(self, scene):
+        """ Moves the renamed scene's index from its old name to its new name. """
+        if not self._is_dirty:
+            index = self._index_by_scene.get(scene, -1)
+            if index != -1:
+                self._remove_name_index(self._names[index], index)
+                self._names[index] = scene.name.upper()
+                self._add_name_index(self._names[index], index)
+                
+                
+    def _rebuild(self):
+        """ Rebuilds the scene list and maps, only adding/removing name listeners for scenes that were added/removed. """
+        self._scenes = tuple(self.song().scenes)
+        self._index_by_scene = {}
+        self._indices_by_name = {}
+        self._names = []
+        for index, scene in enumerate(self._scenes):
+            self._index_by_scene[scene] = index
+            self._names.append(scene.name.upper())
+            self._add_name_index(self._names[index], index)
+        self._remove_name_listeners([s for s in self._name_listeners.keys() if not s in self._index_by_scene])
+        for scene in self._scenes:
+            if not scene in self._name_listeners:
+                self._name_listeners[scene] = self._get_name_listener(scene)
+                scene.add_name_listener(self._name_listeners[scene])
+        self._is_dirty = False
+        self.on_selected_scene_changed()
+        
+        
+    def _get_name_listener(self, scene):
+        """ Returns a listener that notifies of name changes of the given scene. """
+        def on_name_changed():
+            self._on_scene_name_changed(scene)
+        return on_name_changed
+    
+    
+    def _add_name_index(self, name, index):
+        indices = self._indices_by_name.setdefault(name, [])
+        indices.append(index)
+        indices.sort()
+        
+        
+    def _remove_name_index(self, name, index):
+        indices = self._indices_by_name.get(name)
+        if indices and index in indices:
+            indices.remove(index)
+            if not indices:
+                del self._indices_by_name[name]
+                
+                
+    def _remove_name_listeners(self, scenes):
+        for scene in scenes:
+            listener = self._name_listeners.pop(scene)
+            try:
+                if scene.name_has_listener(listener):
+                    scene.remove_name_listener(listener)
+            except: pass
+            
+            
+# local variables:
+# tab-width: 4
@@ -25,6 +25,15 @@
 import Live 
 import math
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from ClyphXSnapCodec import encode_snap_data, decode_snap_data
+from ClyphXSnapStore import ClyphXSnapStore, SNAP_STORE_REF_PREFIX
+from ClyphXSnapTrackMap import ClyphXSnapTrackMap
+from ClyphXSnapCache import ClyphXSnapCache, ResolvedSnapshot, get_snap_cache_key, SNAP_PARAM, SNAP_MIX_EXT
+from ClyphXSnapSmoothing import ClyphXSnapSmoothing
+from ClyphXWriteScheduler import WRITE_PRIORITY_HIGH
+from ClyphXSongClock import CLOCK_SIXTEENTH
+from ClyphXSnapMorph import ClyphXSnapMorph
+from ClyphXSnapDelta import get_param_delta, get_param_delta_items, get_reference_values, is_param_delta, DELTA_INDEXES_KEY
 from consts import *
 if IS_LIVE_9:
     from functools import partial
@@ -36,38 +45,46 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     def __init__(self, parent):
         ControlSurfaceComponent.__init__(self)
         self._parent = parent
-	self._current_tracks = {}
-	self._parameters_to_smooth = {}
+	self._parameters_to_smooth = ClyphXSnapSmoothing(self.write_parameter)
+	self._snap_morph = ClyphXSnapMorph(self.write_parameter)
 	self._rack_parameters_to_smooth = {}
 	self._smoothing_active = False
 	self._synced_smoothing_active = False
 	self._rack_smoothing_active = False
 	self._smoothing_speed = 7 
 	self._smoothing_count = 0
-	self._last_beat = -1
 	self._control_rack = None
 	self._snap_id = None
 	self._is_control_track = False
 	self._include_nested_devices = False
 	self._parameter_limit = 500	
+	self._snap_store = None
+	self._store_snapshots_in_file = False
+	self._snap_cache = ClyphXSnapCache()
+	self._track_map = ClyphXSnapTrackMap(parent, self._snap_cache.clear)
+	self._is_delta_snapshot = False
+	self._delta_baseline = None
 	self._register_timer_callback(self.on_timer)
 	self._has_timer = True
-	self.song().add_current_song_time_listener(self.on_time_changed)
-	self.song().add_is_playing_listener(self.on_time_changed)
+	self._clock = parent._song_clock
+	self._clock.add_listener(CLOCK_SIXTEENTH, self.on_sixteenth)
 	
 	
     def disconnect(self): 
 	if self._has_timer:
 	    self._unregister_timer_callback(self.on_timer)
 	self.remove_control_rack()
-	self.remove_track_listeners()
-	self.song().remove_current_song_time_listener(self.on_time_changed)
-	self.song().remove_is_playing_listener(self.on_time_changed)
-	self._current_tracks = {}
-	self._parameters_to_smooth = {}
+	self._track_map.disconnect()
+	self._clock.remove_listener(CLOCK_SIXTEENTH, self.on_sixteenth)
+	self._clock = None
+	self._parameters_to_smooth.clear()
 	self._rack_parameters_to_smooth = {}
 	self._control_rack = None
 	self._snap_id = None
+	if self._snap_store:
+	    self._snap_store.disconnect()
+	self._snap_store = None
+	self._snap_cache.disconnect()
 	self._parent = None
 	if IS_LIVE_9:
 	    ControlSurfaceComponent.disconnect(self)
@@ -82,15 +99,19 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 	
     
     def store_track_snapshot(self, track_list, xclip, ident, action, args):
-	""" Store snapshot of track params """
+	""" Store snapshot of track params.  If DELTA is included in args, only the device params that differ from their 
+	default values are stored.  If DELTA:NAME is included, only those that differ from the snapshot stored in the X-Clip 
+	whose name starts with [NAME] are stored. """
 	param_count = 0
 	if not type(xclip) is Live.Clip.Clip:
 	    return()
 	snap_data = {}
+	args = self.init_delta_snapshot(args)
 	if track_list:
 	    for track in track_list:
 		track_name = self._parent.get_name(track.name)
-		if not track_name.startswith('CLYPHX SNAP') and not snap_data.has_key(track.name):
+		track_key = self._track_map.get_key(track)
+		if not track_name.startswith('CLYPHX SNAP') and not snap_data.has_key(track_key):
 		    track_data = [[], [], None, {}]
 		    if args == '' or 'MIX' in args: 
 			if not 'MIXS' in args:
@@ -111,23 +132,29 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 			dev_range = self.get_snap_device_range(args, track)
 			if dev_range:
 			    track_devices = {}
+			    baseline_devices = self.get_baseline_devices(track)
 			    for dev_index in range (dev_range[0], dev_range[1]):
 				if dev_index < (len(track.devices)):
 				    current_device = track.devices[dev_index]
 				    if not track_devices.has_key(current_device.name):
-					track_devices[current_device.name] = [[p.value for p in current_device.parameters], []]
-					param_count += len(current_device.parameters)
+					baseline_device = baseline_devices.get(current_device.name)
+					params, num_values = self.get_device_params_to_store(current_device, baseline_device)
+					track_devices[current_device.name] = [params, []]
+					param_count += num_values
 					if self._include_nested_devices and self._parent._can_have_nested_devices and current_device.can_have_chains:
-					    nested_devices = self.get_nested_devices(current_device, [], 0)
+					    baseline_nested_list = None
+					    if baseline_device:
+						baseline_nested_list = baseline_device[1]
+					    nested_devices = self.get_nested_devices(current_device, [], 0, baseline_nested_list)
 					    if nested_devices:
 						track_devices[current_device.name][1] = nested_devices[0]
 						param_count += nested_devices[1]
 			    if track_devices:
 				track_data[3] = track_devices
-		    snap_data[track.name] = track_data
+		    snap_data[track_key] = track_data
 	    if snap_data:
 		if param_count <= self._parameter_limit:
-		    xclip.name = str(ident) + ' || ' + repr(snap_data)
+		    xclip.name = str(ident) + ' || ' + self.get_snap_data_string(snap_data, xclip)
 		else:
 		    current_name = xclip.name
 		    xclip.name = 'Too many parameters to store!'
@@ -142,13 +169,17 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 	xclip_data[0].name = xclip_data[1]
 		    
 						
-    def get_nested_devices(self, rack, nested_list, parameter_count):
+    def get_nested_devices(self, rack, nested_list, parameter_count, baseline_nested_list=None):
 	""" Get list of nested devices and count of parameters """
 	if rack.chains:
 	    for c in rack.chains:
 		for d in c.devices:
-		    new_device_entry = [[p.value for p in d.parameters], []]
-		    parameter_count += len(d.parameters)
+		    baseline_device = None
+		    if baseline_nested_list and len(nested_list) < len(baseline_nested_list):
+			baseline_device = baseline_nested_list[len(nested_list)]
+		    params, num_values = self.get_device_params_to_store(d, baseline_device)
+		    new_device_entry = [params, []]
+		    parameter_count += num_values
 		    if not rack.class_name.startswith('Midi') and list(c.devices).index(d) == 0:
 			new_device_entry[1] = [c.mixer_device.volume.value, c.mixer_device.panning.value, c.mixer_device.chain_activator.value]
 			parameter_count += 3
@@ -159,20 +190,85 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 			    parameter_count += len(sends)
 		    nested_list.append(new_device_entry)
 		    if d.can_have_chains and d.chains:
-			self.get_nested_devices(d, nested_list, parameter_count)
+			self.get_nested_devices(d, nested_list, parameter_count, baseline_nested_list)
 	    return [nested_list, parameter_count]
+	    
+	    
+    def get_device_params_to_store(self, device, baseline_device):
+	""" Get params of device to store and number of values stored.  These are the values of all params or, for delta 
+	snapshots, the delta relative to the params of the baseline device data (if any) """
+	if not self._is_delta_snapshot:
+	    return ([p.value for p in device.parameters], len(device.parameters))
+	reference_values = None
+	if baseline_device:
+	    reference_values = get_reference_values(baseline_device[0], device.parameters)
+	param_delta = get_param_delta(device.parameters, reference_values)
+	return (param_delta, len(param_delta[DELTA_INDEXES_KEY]))
+	
+	
+    def init_delta_snapshot(self, args):
+	""" Set up whether to store delta snapshot (and baseline snap data to store it relative to) from args and return args 
+	without DELTA arg """
+	self._is_delta_snapshot = False
+	self._delta_baseline = None
+	if not 'DELTA' in args:
+	    return args
+	other_args = []
+	for arg in args.split():
+	    if arg.startswith('DELTA'):
+		self._is_delta_snapshot = True
+		if ':' in arg:
+		    self._delta_baseline = self.get_baseline_snap_data(arg[arg.index(':')+1:])
+	    else:
+		other_args.append(arg)
+	return ' '.join(other_args)
+	
+	
+    def get_baseline_snap_data(self, name):
+	""" Get snap data stored in first X-Clip whose name starts with name in brackets or None if there is no such X-Clip """
+	clip_name = self.get_snap_clip_name(name)
+	if clip_name:
+	    return self.get_snap_data(str(clip_name)[clip_name.index(' || ') + 4:])
+	return None
+	
+	
+    def get_snap_clip_name(self, name):
+	""" Get name of first X-Clip whose name starts with name in brackets and that holds a snapshot or None if there is no 
+	such X-Clip """
+	ident = '[' + name.strip() + ']'
+	for track in self.song().tracks:
+	    for slot in track.clip_slots:
+		if slot.has_clip:
+		    clip_name = slot.clip.name
+		    if self._parent.get_name(clip_name).startswith(ident) and ' || ' in clip_name:
+			return clip_name
+	return None
+	
+	
+    def get_baseline_devices(self, track):
+	""" Get dict of device data stored for track in baseline snapshot of delta snapshot """
+	track_key = self._track_map.get_key(track)
+	if self._delta_baseline and self._delta_baseline.has_key(track_key) and self._delta_baseline[track_key][3]:
+	    return self._delta_baseline[track_key][3]
+	return {}
 			
 			
     def recall_track_snapshot(self, name, xclip):
-	""" Recall snapshot of track params """
+	""" Recall snapshot of track params.  Snapshots are resolved against the current tracks, devices and params and cached, 
+	so repeated recalls of the same snapshot only need to apply the resolved settings. """
 	self._smoothing_count = 0
-	self._snap_id = xclip.name[xclip.name.index('['):xclip.name.index(']')+1].strip().upper() 
+	resolved = self.get_resolved_snapshot(xclip.name)
+	if resolved is None:
+	    return()
+	self.clear_snap_morph()
+	if self._parent._is_debugging:
+	    self._parent.log_message('recall_track_snapshot snapshot cache: ' + self._snap_cache.get_stats())
+	self._snap_id = resolved.snap_id
 	track_name = self._parent.get_name(xclip.canonical_parent.canonical_parent.name)
-	snap_data = eval(str(xclip.name)[len(self._snap_id) + 3:])
 	self._smoothing_active = False
 	self._rack_smoothing_active = False
 	self._synced_smoothing_active = False
-	self._parameters_to_smooth = {}
+	self._parameters_to_smooth.clear()
 	self._rack_parameters_to_smooth = {}
 	self._is_control_track = track_name.startswith('CLYPHX SNAP')
 	is_synced = False
@@ -195,74 +291,161 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 		new_speed *= self.song().signature_numerator
 	    if new_speed in range(501):
 		self._smoothing_speed = new_speed
-	for track, param_data in snap_data.items():
-	    if self._current_tracks.has_key(track):
-		track = self._current_tracks[track]
+	self.apply_resolved_snapshot(resolved, xclip)
+	if self._is_control_track and self._parameters_to_smooth:
+	    if not self._control_rack or (self._control_rack and not self._control_rack.parameters[0].value == 1.0):
+		self._smoothing_active = not is_synced
+		self._synced_smoothing_active = is_synced
+	    else:
+		self._parent.schedule_message(1, self.refresh_control_rack)
+    
+    
+    def get_resolved_snapshot(self, clip_name):
+	""" Get resolved snapshot stored in X-Clip with name from cache (resolve and add it if necessary) or None if snap 
+	data is missing """
+	cache_key = get_snap_cache_key(clip_name)
+	resolved = self._snap_cache.get(cache_key)
+	if resolved is None:
+	    snap_id = clip_name[clip_name.index('['):clip_name.index(']')+1].strip().upper() 
+	    snap_data = self.get_snap_data(str(clip_name)[len(snap_id) + 3:])
+	    if snap_data is None:
+		return None
+	    resolved = self.resolve_snapshot(snap_id, snap_data)
+	    self._snap_cache.add(cache_key, resolved)
+	return resolved
+    
+    
+    def morph_snapshots(self, track_list, xclip, ident, action, args):
+	""" Load snapshots stored in 2 - 8 X-Clips named in args (without brackets) for morphing with ClyphX Snap control 
+	rack.  Macro 1 morphs through snapshots in order.  If args start with XY, Macro 1 and Macro 2 morph on XY plane with 
+	snapshots at its corners and then midpoints of its edges """
+	snap_names = args.split()
+	is_xy = bool(snap_names) and snap_names[0] == 'XY'
+	if is_xy:
+	    snap_names = snap_names[1:]
+	control_track = self.get_control_track()
+	if not control_track:
+	    return()
+	self.setup_control_rack(control_track)
+	resolved_snapshots = []
+	for name in snap_names:
+	    clip_name = self.get_snap_clip_name(name)
+	    if clip_name:
+		resolved = self.get_resolved_snapshot(clip_name)
+		if resolved:
+		    resolved_snapshots.append(resolved)
+	self._snap_morph.load(resolved_snapshots, is_xy)
+	if self._control_rack and self._snap_morph.is_loaded():
+	    self._parameters_to_smooth.clear()
+	    self._smoothing_active = False
+	    self._synced_smoothing_active = False
+	    self._rack_smoothing_active = False
+	    self._control_rack.parameters[1].add_value_listener(self.morph_macro_changed)
+	    if is_xy:
+		self._control_rack.parameters[2].add_value_listener(self.morph_macro_changed)
+	    self.morph_macro_changed()
+            
+            
+    def morph_macro_changed(self):
+	""" Set morph position from control rack macros, which is applied on next timer tick """
+	if self._control_rack.parameters[0].value == 1.0:
+	    y = None
+	    if self._snap_morph.is_xy:
+		y = self._control_rack.parameters[2].value / 127.0
+	    self._snap_morph.set_position(self._control_rack.parameters[1].value / 127.0, y)
+            
+            
+    def get_control_track(self):
+	""" Get first ClyphX Snap control track or None if there is none """
+	for track in self.song().tracks:
+	    if self._parent.get_name(track.name).startswith('CLYPHX SNAP'):
+		return track
+	return None
+	    
+	    
+    def apply_resolved_snapshot(self, resolved, xclip):
+	""" Apply the settings of a resolved snapshot """
+	for kind, target, value in resolved.settings:
+	    if kind == SNAP_PARAM:
+		if target.is_enabled:
+		    self.get_parameter_data_to_smooth(target, value)
+	    elif kind == SNAP_MIX_EXT:
+		target.mute = value[0]
+		target.solo = value[1]
+		target.mixer_device.crossfade_assign = value[2]
+	    elif value < 0:
+		target.stop_all_clips()
+	    elif target.clip_slots[value].has_clip and target.clip_slots[value].clip != xclip:
+		target.clip_slots[value].fire()
+                
+                
+    def resolve_snapshot(self, snap_id, snap_data):
+	""" Resolve snap data against the current tracks, devices and params """
+	resolved = ResolvedSnapshot(snap_id)
+	for track_key, param_data in snap_data.items():
+	    track = self._track_map.get_track(track_key)
+	    if track:
 		if param_data[0]:
-		    if track.mixer_device.volume.is_enabled and param_data[0][0] != -1:
-			self.get_parameter_data_to_smooth(track.mixer_device.volume, param_data[0][0])
-		    if track.mixer_device.panning.is_enabled and param_data[0][1] != -1:
-			self.get_parameter_data_to_smooth(track.mixer_device.panning, param_data[0][1])
+		    if param_data[0][0] != -1:
+			resolved.add_param(track.mixer_device.volume, param_data[0][0])
+		    if param_data[0][1] != -1:
+			resolved.add_param(track.mixer_device.panning, param_data[0][1])
 		    if track is not self.song().master_track:
+			resolved.watch(track.mixer_device, 'sends')
 			for index in range (len(param_data[0])-2):
-			    if index <= len(track.mixer_device.sends)-1 and track.mixer_device.sends[index].is_enabled:
-				self.get_parameter_data_to_smooth(track.mixer_device.sends[index], param_data[0][2+index])
+			    if index <= len(track.mixer_device.sends)-1:
+				resolved.add_param(track.mixer_device.sends[index], param_data[0][2+index])
 		if param_data[1] and track is not self.song().master_track:
-		    track.mute = param_data[1][0]
-		    track.solo = param_data[1][1]
-		    track.mixer_device.crossfade_assign =  param_data[1][2]
+		    resolved.add_mix_ext_settings(track, param_data[1])
 		if param_data[2] != None and not track.is_foldable and track is not self.song().master_track:
-		    if param_data[2] < 0:
-			track.stop_all_clips()
-		    else:
-			if track.clip_slots[param_data[2]].has_clip and track.clip_slots[param_data[2]].clip != xclip:
-			    track.clip_slots[param_data[2]].fire()
+		    resolved.add_play_setting(track, param_data[2])
 		if param_data[3]:
+		    resolved.watch(track, 'devices')
 		    for device in track.devices:
+			resolved.watch(device, 'name')
 			if param_data[3].has_key(device.name):
-			    self.recall_device_snap(device, param_data[3][device.name][0])
+			    self.resolve_device_snap(resolved, device, param_data[3][device.name][0])
 			    if self._include_nested_devices and self._parent._can_have_nested_devices and device.can_have_chains and param_data[3][device.name][1]:
-				self.recall_nested_device_snap(device, param_data[3][device.name][1])
+				self.resolve_nested_device_snap(resolved, device, param_data[3][device.name][1])
 			    del param_data[3][device.name]
-	if self._is_control_track and self._parameters_to_smooth:
-	    if not self._control_rack or (self._control_rack and not self._control_rack.parameters[0].value == 1.0):
-		self._smoothing_active = not is_synced
-		self._synced_smoothing_active = is_synced
-	    else:
-		self._parent.schedule_message(1, self.refresh_control_rack)
-	    
-	    
-    def recall_device_snap(self, device, device_data):
-	""" Recall device snap """
-	if device and len(device.parameters) == len(device_data):
-	    for index in range (len(device.parameters)):
-		if device.parameters[index].is_enabled:
-		    self.get_parameter_data_to_smooth(device.parameters[index], device_data[index])
+	return resolved
+    
+    
+    def resolve_device_snap(self, resolved, device, device_data):
+	""" Resolve device snap """
+	if device:
+	    resolved.watch(device, 'parameters')
+	    if is_param_delta(device_data):
+		for index, value in get_param_delta_items(device_data, len(device.parameters)):
+		    resolved.add_param(device.parameters[index], value)
+	    elif len(device.parameters) == len(device_data):
+		for index in range (len(device.parameters)):
+		    resolved.add_param(device.parameters[index], device_data[index])
 			
 			
-    def recall_nested_device_snap(self, rack, device_data):
-	""" Recall snaps of nested devices """
+    def resolve_nested_device_snap(self, resolved, rack, device_data):
+	""" Resolve snaps of nested devices """
+	resolved.watch(rack, 'chains')
 	if rack.chains and device_data: 
 	    for c in rack.chains:
+		resolved.watch(c, 'devices')
 		combined_data = zip(c.devices, device_data)
 		if combined_data:
 		    for cd in combined_data:
 			device_data.remove(cd[1])
-			self.recall_device_snap(cd[0], cd[1][0])
+			self.resolve_device_snap(resolved, cd[0], cd[1][0])
 			if not cd[0].class_name.startswith('Midi') and cd[1][1]:
-			    if c.mixer_device.volume.is_enabled:
-				self.get_parameter_data_to_smooth(c.mixer_device.volume, cd[1][1][0])
-			    if c.mixer_device.panning.is_enabled:
-				self.get_parameter_data_to_smooth(c.mixer_device.panning, cd[1][1][1])
-			    if c.mixer_device.chain_activator.is_enabled:
-				self.get_parameter_data_to_smooth(c.mixer_device.chain_activator, cd[1][1][2])
+			    resolved.add_param(c.mixer_device.volume, cd[1][1][0])
+			    resolved.add_param(c.mixer_device.panning, cd[1][1][1])
+			    resolved.add_param(c.mixer_device.chain_activator, cd[1][1][2])
+			    resolved.watch(c.mixer_device, 'sends')
 			    sends = c.mixer_device.sends
 			    if sends:
 				for i in range(len(cd[1][1]) - 3):
-				    if i < len(sends) and sends[i].is_enabled:
-					self.get_parameter_data_to_smooth(sends[i], cd[1][1][3 + i])
+				    if i < len(sends):
+					resolved.add_param(sends[i], cd[1][1][3 + i])
 		    if cd[0].can_have_chains:
-			self.recall_nested_device_snap(cd[0], device_data)
+			self.resolve_nested_device_snap(resolved, cd[0], device_data)
 		    
 		    
     def setup_control_rack(self, track):
@@ -291,75 +474,118 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     def control_rack_macro_changed(self): 
 	""" Get param values to set based on macro value and build dict """
 	if self._rack_smoothing_active and self._parameters_to_smooth and self._control_rack.parameters[0].value == 1.0:
-	    self._rack_parameters_to_smooth = {}
-	    macro_value = self._control_rack.parameters[1].value
-	    new_dict = {}
-	    for p, v in self._parameters_to_smooth.items():
-		param_value = v[2] + (macro_value * v[0])
-		if p.is_quantized:
-		    if macro_value < 63 and p.value != v[2]:
-			param_value = v[2]
-		    elif macro_value > 63 and p.value != v[1]:
-			param_value = v[1]
-		    else:
-			param_value = None
-		if param_value != None:
-		    new_dict[p] = param_value
-	    self._rack_parameters_to_smooth = new_dict
+	    self._rack_parameters_to_smooth = self._parameters_to_smooth.get_morph_values(self._control_rack.parameters[1].value / 127.0)
 	    
 		    
+    def set_snap_store_path(self, path):
+	""" Sets the path of the file that snapshots are stored in (if enabled) and recalled from. """
+	if self._snap_store:
+	    self._snap_store.disconnect()
+	self._snap_store = ClyphXSnapStore(path)
+	
+	
+    def get_snap_data_string(self, snap_data, xclip):
+	""" Returns the string to store the given snap data as in the given X-Clip's name.  This is a reference to the snapshot 
+	in the snapshot store if storing snapshots in a file is enabled (and the store could be written to), otherwise it's 
+	the snap data in the compact format.  A stored snapshot the X-Clip already references is superseded so that the store 
+	can reclaim it. """
+	if self._store_snapshots_in_file and self._snap_store:
+	    try: store_id = self._snap_store.store(snap_data, self.get_snap_store_id(xclip))
+	    except: pass
+	    else:
+		self._snap_cache.remove(get_snap_cache_key(xclip.name))
+		return SNAP_STORE_REF_PREFIX + str(store_id)
+	return encode_snap_data(snap_data)
+    
+    
+    def get_snap_store_id(self, xclip):
+	""" Returns the id of the stored snapshot the given X-Clip references or None if it doesn't reference one or another 
+	X-Clip references the same snapshot (such as a duplicate of the X-Clip). """
+	name = xclip.name
+	if not ' || ' in name:
+	    return None
+	ref = name[name.index(' || ') + 4:].strip().lower()
+	if not ref.startswith(SNAP_STORE_REF_PREFIX):
+	    return None
+	for track in self.song().tracks:
+	    for slot in track.clip_slots:
+		if slot.has_clip and slot.clip != xclip and slot.clip.name.strip().lower().endswith(' || ' + ref):
+		    return None
+	try: return int(ref[len(SNAP_STORE_REF_PREFIX):])
+	except: return None
+    
+    
+    def get_snap_data(self, stored_data):
+	""" Returns the snap data stored in an X-Clip name, which can be a reference to a snapshot in the snapshot store, 
+	snap data in the compact format or (for snapshots stored with earlier versions) snap data in the legacy format. 
+	Returns None if a referenced snapshot can't be found. """
+	stored_data = stored_data.strip()
+	if stored_data.lower().startswith(SNAP_STORE_REF_PREFIX):
+	    snap_data = None
+	    if self._snap_store:
+		try: snap_data = self._snap_store.recall(int(stored_data[len(SNAP_STORE_REF_PREFIX):]))
+		except: pass
+	    return snap_data
+	snap_data = decode_snap_data(stored_data)
+	if snap_data is None:
+	    snap_data = eval(stored_data)
+	return snap_data
+    
+    
+    def get_snap_cache_stats(self):
+	""" Returns string of the snapshot cache's size, hits and misses for diagnostics. """
+	return self._snap_cache.get_stats()
+    
+    
+    def set_smoothing_curve(self, curve_name):
+	""" Set curve (LINEAR, EXPONENTIAL or S-CURVE) that smoothing and morphing follow """
+	self._parameters_to_smooth.set_curve(curve_name)
+		    
+		    
     def on_timer(self):
 	""" Smooth parameter value changes via timer """
 	if self._smoothing_active and self._parameters_to_smooth:
 	    self.apply_timed_smoothing()
+	self._snap_morph.update()
 	if self._rack_smoothing_active and self._rack_parameters_to_smooth:
 	    for p, v in self._rack_parameters_to_smooth.items():
-		p.value = v
+		self.write_parameter(p, v)
 		del self._rack_parameters_to_smooth[p] 
+	if self._snap_store:
+	    try: self._snap_store.update()
+	    except: pass
 	    		    
 		
-    def on_time_changed(self):
+    def on_sixteenth(self):
 	""" Smooth parameter value changes synced to playback """
-	if self._synced_smoothing_active and self._parameters_to_smooth and self.song().is_playing:
-	    time = int(str(self.song().get_current_beats_song_time()).split('.')[2])
-	    if self._last_beat != time:
-		self._last_beat = time
-		self._tasks.add(self.apply_timed_smoothing)
+	if self._synced_smoothing_active and self._parameters_to_smooth:
+	    self._tasks.add(self.apply_timed_smoothing)
 		
 		
     def apply_timed_smoothing(self, arg=None):
 	""" Apply smoothing for either timer or sync """
 	self._smoothing_count += 1
-	for p, v in self._parameters_to_smooth.items():
-	    param_value = v[2] + (self._smoothing_count * v[0])
-	    if p.is_quantized:
-		p.value = v[1]
-		del self._parameters_to_smooth[p]
-	    elif param_value == v[1] or self._smoothing_count >= self._smoothing_speed:
-		del self._parameters_to_smooth[p]
-		p.value = v[1]
-	    else:
-		p.value = param_value
+	self._parameters_to_smooth.apply_step(self._smoothing_count, self._smoothing_speed)
 	
 	
     def get_parameter_data_to_smooth(self, parameter, new_value): 
-	""" Get parameter data to smooth and return list of smoothing value, target value and current value """ 
+	""" Add parameter to smooth to new value or set it directly if it shouldn't be smoothed """ 
 	factor = self._smoothing_speed
 	if self._is_control_track and self._control_rack and self._control_rack.parameters[0].value == 1.0:
 	    factor = 127
 	if factor and self._is_control_track:
 	    difference = new_value - parameter.value
 	    if difference and (factor == 127 or (factor != 127 and abs(difference) > 0.01)):
-		if parameter.is_quantized:
-		    factor = 1
-		param_data = [(new_value - parameter.value) / factor, new_value, parameter.value]  
-		if difference < 0.0:
-		    param_data = [((parameter.value - new_value) / factor) * -1, new_value, parameter.value]  
-		self._parameters_to_smooth[parameter] = param_data
+		self._parameters_to_smooth.add(parameter, new_value)
 	    else:
-		parameter.value = new_value
+		self.write_parameter(parameter, new_value)
 	else:
-	    parameter.value = new_value
+	    self.write_parameter(parameter, new_value)
+    
+    
+    def write_parameter(self, parameter, value):
+	""" Write value to parameter via parent's write scheduler with high priority as snapshots are timed """
+	self._parent.write_parameter(parameter, value, WRITE_PRIORITY_HIGH)
     			
 		    		
     def get_snap_device_range(self, args, track):
@@ -391,31 +617,27 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     
     
     def setup_tracks(self):  
-	""" Store dictionary of tracks by name """
-	self._current_tracks = {}
-	self.remove_track_listeners()
-	for track in (tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)):
-	    if not track.name_has_listener(self.setup_tracks):
-		track.add_name_listener(self.setup_tracks)
-	    name = self._parent.get_name(track.name)
-	    if not self._current_tracks.has_key(track.name) and not name.startswith('CLYPHX SNAP'):
-		self._current_tracks[track.name] = track
-	    
-    
+	""" Update map of tracks by name on init and track list changes """
+	self._track_map.update(tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,))
+	
+	
     def remove_control_rack(self):
 	""" Remove control rack listeners """
 	if self._control_rack:
 	    self._control_rack.name = 'ClyphX Snap'
 	    if self._control_rack.parameters[1].value_has_listener(self.control_rack_macro_changed):
 		self._control_rack.parameters[1].remove_value_listener(self.control_rack_macro_changed)
+	self.clear_snap_morph()
 	self._control_rack = None
 	
 	
-    def remove_track_listeners(self): 
-	""" Remove track name listeners """
-	for track in (tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)):
-	    if track.name_has_listener(self.setup_tracks):
-		track.remove_name_listener(self.setup_tracks)
+    def clear_snap_morph(self):
+	""" Unload the snapshots that are morphed between and remove the control rack's morph listeners """
+	if self._control_rack:
+	    for index in range(1, 3):
+		if self._control_rack.parameters[index].value_has_listener(self.morph_macro_changed):
+		    self._control_rack.parameters[index].remove_value_listener(self.morph_macro_changed)
+	self._snap_morph.clear()
 		       					
     
 # local variables:
@@ -26,6 +26,15 @@ import Live
 import math
 import pickle
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from ClyphXSnapCodec import encode_snap_data, decode_snap_data
+from ClyphXSnapStore import ClyphXSnapStore, SNAP_STORE_REF_PREFIX
+from ClyphXSnapTrackMap import ClyphXSnapTrackMap
+from ClyphXSnapCache import ClyphXSnapCache, ResolvedSnapshot, get_snap_cache_key, SNAP_PARAM, SNAP_MIX_EXT
+from ClyphXSnapSmoothing import ClyphXSnapSmoothing
+from ClyphXWriteScheduler import WRITE_PRIORITY_HIGH
+from ClyphXSongClock import CLOCK_SIXTEENTH
+from ClyphXSnapMorph import ClyphXSnapMorph
+from ClyphXSnapDelta import get_param_delta, get_param_delta_items, get_reference_values, is_param_delta, DELTA_INDEXES_KEY
 from consts import *
 if IS_LIVE_9:
     from functools import partial
@@ -59,38 +68,46 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     def __init__(self, parent):
         ControlSurfaceComponent.__init__(self)
         self._parent = parent
-	self._current_tracks = {}
-	self._parameters_to_smooth = {}
+	self._parameters_to_smooth = ClyphXSnapSmoothing(self._write_parameter)
+	self._snap_morph = ClyphXSnapMorph(self._write_parameter)
 	self._rack_parameters_to_smooth = {}
 	self._smoothing_active = False
 	self._synced_smoothing_active = False
 	self._rack_smoothing_active = False
 	self._smoothing_speed = 7 
 	self._smoothing_count = 0
-	self._last_beat = -1
 	self._control_rack = None
 	self._snap_id = None
 	self._is_control_track = False
 	self._include_nested_devices = False
 	self._parameter_limit = 500	
+	self._snap_store = None
+	self._store_snapshots_in_file = False
+	self._snap_cache = ClyphXSnapCache()
+	self._track_map = ClyphXSnapTrackMap(parent, self._snap_cache.clear)
+	self._is_delta_snapshot = False
+	self._delta_baseline = None
 	self._register_timer_callback(self._on_timer)
 	self._has_timer = True
-	self.song().add_current_song_time_listener(self._on_time_changed)
-	self.song().add_is_playing_listener(self._on_time_changed)
+	self._clock = parent._song_clock
+	self._clock.add_listener(CLOCK_SIXTEENTH, self._on_sixteenth)
 	
 	
     def disconnect(self): 
 	if self._has_timer:
 	    self._unregister_timer_callback(self._on_timer)
 	self._remove_control_rack()
-	self._remove_track_listeners()
-	self.song().remove_current_song_time_listener(self._on_time_changed)
-	self.song().remove_is_playing_listener(self._on_time_changed)
-	self._current_tracks = {}
-	self._parameters_to_smooth = {}
+	self._track_map.disconnect()
+	self._clock.remove_listener(CLOCK_SIXTEENTH, self._on_sixteenth)
+	self._clock = None
+	self._parameters_to_smooth.clear()
 	self._rack_parameters_to_smooth = {}
 	self._control_rack = None
 	self._snap_id = None
+	if self._snap_store:
+	    self._snap_store.disconnect()
+	self._snap_store = None
+	self._snap_cache.disconnect()
 	self._parent = None
 	if IS_LIVE_9:
 	    ControlSurfaceComponent.disconnect(self)
@@ -105,15 +122,19 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 	
     
     def store_track_snapshot(self, track_list, xclip, ident, action, args):
-	""" Stores snapshot of track params """
+	""" Stores snapshot of track params.  If DELTA is included in args, only the device params that differ from their 
+	default values are stored.  If DELTA:NAME is included, only those that differ from the snapshot stored in the X-Clip 
+	whose name starts with [NAME] are stored. """
 	param_count = 0
 	if not type(xclip) is Live.Clip.Clip:
 	    return()
 	snap_data = {}
+	args = self._init_delta_snapshot(args)
 	if track_list:
 	    for track in track_list:
 		track_name = self._parent.get_name(track.name)
-		if not track_name.startswith('CLYPHX SNAP') and not snap_data.has_key(track.name):
+		track_key = self._track_map.get_key(track)
+		if not track_name.startswith('CLYPHX SNAP') and not snap_data.has_key(track_key):
 		    self._current_track_data = [[], [], None, {}]
 		    if args == '' or 'MIX' in args:
 			param_count += self._store_mix_settings(track, args)
@@ -122,10 +143,10 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 			param_count += 1
 		    if (args == '' or 'DEV' in args) and track.devices:
 			param_count = self._store_device_settings(track, args)
-		    snap_data[track.name] = self._current_track_data
+		    snap_data[track_key] = self._current_track_data
 	    if snap_data:
 		if param_count <= self._parameter_limit:
-		    xclip.name = str(ident) + ' || ' + pickle.dumps(snap_data)
+		    xclip.name = str(ident) + ' || ' + self._get_snap_data_string(snap_data, xclip)
 		else:
 		    current_name = xclip.name
 		    xclip.name = 'Too many parameters to store!'
@@ -158,28 +179,39 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 	dev_range = self._get_snap_device_range(args, track)
 	if dev_range:
 	    track_devices = {}
+	    baseline_devices = self._get_baseline_devices(track)
 	    for dev_index in range (dev_range[0], dev_range[1]):
 		if dev_index < (len(track.devices)):
 		    current_device = track.devices[dev_index]
 		    if not track_devices.has_key(current_device.name):
-			track_devices[current_device.name] = {'params' : [p.value for p in current_device.parameters]}
-			param_count += len(current_device.parameters)
+			baseline_device = baseline_devices.get(current_device.name)
+			params, num_values = self._get_device_params_to_store(current_device, baseline_device)
+			track_devices[current_device.name] = {'params' : params}
+			param_count += num_values
 			if self._include_nested_devices and self._parent._can_have_nested_devices and current_device.can_have_chains:
-			    param_count += self._get_nested_devices(current_device, track_devices[current_device.name], 0)
+			    param_count += self._get_nested_devices(current_device, track_devices[current_device.name], 0, baseline_device)
 	    if track_devices:
 		self._current_track_data[DEVICE_SETTINGS_POS] = track_devices
 	return param_count
 		
 		
-    def _get_nested_devices(self, rack, nested_devs, parameter_count):
+    def _get_nested_devices(self, rack, nested_devs, parameter_count, baseline_devs=None):
 	""" Creates recursive dict of nested devices and returns count of parameters """
 	if rack.chains:
 	    nested_devs['chains'] = {}
+	    baseline_chains = {}
+	    if baseline_devs and baseline_devs.has_key('chains'):
+		baseline_chains = baseline_devs['chains']
 	    for chain_index, c in enumerate(rack.chains):
 		nested_devs['chains'][chain_index] = {'devices' : {}}
+		baseline_chain_devices = {}
+		if baseline_chains.has_key(chain_index):
+		    baseline_chain_devices = baseline_chains[chain_index]['devices']
 		for device_index, d in enumerate(c.devices):
-		    nested_devs['chains'][chain_index]['devices'][device_index] = {'params' : [p.value for p in d.parameters]}
-		    parameter_count += len(d.parameters)
+		    baseline_device = baseline_chain_devices.get(device_index)
+		    params, num_values = self._get_device_params_to_store(d, baseline_device)
+		    nested_devs['chains'][chain_index]['devices'][device_index] = {'params' : params}
+		    parameter_count += num_values
 		    if not rack.class_name.startswith('Midi'):
 			mix_settings = [c.mixer_device.volume.value, c.mixer_device.panning.value, c.mixer_device.chain_activator.value]
 			parameter_count += 3
@@ -190,102 +222,257 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 			    parameter_count += len(sends)
 			nested_devs['chains'][chain_index]['mixer'] = mix_settings
 		    if d.can_have_chains and d.chains:
-			self._get_nested_devices(d, nested_devs['chains'][chain_index]['devices'][device_index], parameter_count)
+			self._get_nested_devices(d, nested_devs['chains'][chain_index]['devices'][device_index], parameter_count, baseline_device)
 	return parameter_count
+	
+	
+    def _get_device_params_to_store(self, device, baseline_device):
+	""" Returns the params of the given device to store and the number of values that will be stored.  These are the 
+	values of all of the params or, for delta snapshots, the delta relative to the params of the given baseline device data 
+	(if any). """
+	if not self._is_delta_snapshot:
+	    return ([p.value for p in device.parameters], len(device.parameters))
+	reference_values = None
+	if baseline_device:
+	    reference_values = get_reference_values(baseline_device['params'], device.parameters)
+	param_delta = get_param_delta(device.parameters, reference_values)
+	return (param_delta, len(param_delta[DELTA_INDEXES_KEY]))
+	
+	
+    def _init_delta_snapshot(self, args):
+	""" Sets up whether a delta snapshot should be stored (and the baseline snap data to store it relative to) from the 
+	given args and returns the args without the DELTA arg. """
+	self._is_delta_snapshot = False
+	self._delta_baseline = None
+	if not 'DELTA' in args:
+	    return args
+	other_args = []
+	for arg in args.split():
+	    if arg.startswith('DELTA'):
+		self._is_delta_snapshot = True
+		if ':' in arg:
+		    self._delta_baseline = self._get_baseline_snap_data(arg[arg.index(':')+1:])
+	    else:
+		other_args.append(arg)
+	return ' '.join(other_args)
+	
+	
+    def _get_baseline_snap_data(self, name):
+	""" Returns the snap data stored in the first X-Clip whose name starts with the given name in brackets or None if there 
+	is no such X-Clip. """
+	clip_name = self._get_snap_clip_name(name)
+	if clip_name:
+	    return self._get_snap_data(str(clip_name)[clip_name.index(' || ') + 4:])
+	return None
+	
+	
+    def _get_snap_clip_name(self, name):
+	""" Returns the name of the first X-Clip whose name starts with the given name in brackets and that holds a snapshot 
+	or None if there is no such X-Clip. """
+	ident = '[' + name.strip() + ']'
+	for track in self.song().tracks:
+	    for slot in track.clip_slots:
+		if slot.has_clip:
+		    clip_name = slot.clip.name
+		    if self._parent.get_name(clip_name).startswith(ident) and ' || ' in clip_name:
+			return clip_name
+	return None
+	
+	
+    def _get_baseline_devices(self, track):
+	""" Returns the dict of device data stored for the given track in the baseline snapshot of a delta snapshot. """
+	track_key = self._track_map.get_key(track)
+	if self._delta_baseline and self._delta_baseline.has_key(track_key) and self._delta_baseline[track_key][DEVICE_SETTINGS_POS]:
+	    return self._delta_baseline[track_key][DEVICE_SETTINGS_POS]
+	return {}
 		
 			
     def recall_track_snapshot(self, name, xclip):
-	""" Recalls snapshot of track params """
-	self._snap_id = xclip.name[xclip.name.index('['):xclip.name.index(']')+1].strip().upper() 
-	snap_data = pickle.loads(str(xclip.name)[len(self._snap_id) + 4:])
-	self._parameters_to_smooth = {}
+	""" Recalls snapshot of track params.  Snapshots are resolved against the current tracks, devices and params and 
+	cached, so repeated recalls of the same snapshot only need to apply the resolved settings. """
+	resolved = self._get_resolved_snapshot(xclip.name)
+	if resolved is None:
+	    return()
+	self._clear_snap_morph()
+	if self._parent._is_debugging:
+	    self._parent.log_message('recall_track_snapshot snapshot cache: ' + self._snap_cache.get_stats())
+	self._snap_id = resolved.snap_id
+	self._parameters_to_smooth.clear()
 	self._rack_parameters_to_smooth = {}
 	is_synced = self._init_smoothing(xclip)
-	for track, param_data in snap_data.items():
-	    if self._current_tracks.has_key(track):
-		track = self._current_tracks[track]
-		self._recall_mix_settings(track, param_data)
-		if param_data[PLAY_SETTINGS_POS] != None and not track.is_foldable and track is not self.song().master_track:
-		    if param_data[PLAY_SETTINGS_POS] < 0:
-			track.stop_all_clips()
-		    else:
-			if track.clip_slots[param_data[PLAY_SETTINGS_POS]].has_clip and track.clip_slots[param_data[PLAY_SETTINGS_POS]].clip != xclip:
-			    track.clip_slots[param_data[PLAY_SETTINGS_POS]].fire()
-		if param_data[DEVICE_SETTINGS_POS]:
-		    self._recall_device_settings(track, param_data)
+	self._apply_resolved_snapshot(resolved, xclip)
 	if self._is_control_track and self._parameters_to_smooth:
 	    if not self._control_rack or (self._control_rack and not self._control_rack.parameters[0].value == 1.0):
 		self._smoothing_active = not is_synced
 		self._synced_smoothing_active = is_synced
 	    else:
 		self._parent.schedule_message(1, self._refresh_control_rack)
+    
+    
+    def _get_resolved_snapshot(self, clip_name):
+	""" Returns the resolved snapshot stored in the X-Clip with the given name from the cache (resolving and adding it 
+	if necessary) or None if its snap data is missing. """
+	cache_key = get_snap_cache_key(clip_name)
+	resolved = self._snap_cache.get(cache_key)
+	if resolved is None:
+	    snap_id = clip_name[clip_name.index('['):clip_name.index(']')+1].strip().upper() 
+	    snap_data = self._get_snap_data(str(clip_name)[len(snap_id) + 4:])
+	    if snap_data is None:
+		return None
+	    resolved = self._resolve_snapshot(snap_id, snap_data)
+	    self._snap_cache.add(cache_key, resolved)
+	return resolved
+    
+    
+    def morph_snapshots(self, track_list, xclip, ident, action, args):
+	""" Loads the snapshots stored in the 2 - 8 X-Clips named in args (without brackets) for morphing with the ClyphX 
+	Snap control rack.  Macro 1 morphs through the snapshots in order.  If args start with XY, Macro 1 and Macro 2 
+	morph on an XY plane with the snapshots at its corners and then the midpoints of its edges. """
+	snap_names = args.split()
+	is_xy = bool(snap_names) and snap_names[0] == 'XY'
+	if is_xy:
+	    snap_names = snap_names[1:]
+	control_track = self._get_control_track()
+	if not control_track:
+	    return()
+	self._setup_control_rack(control_track)
+	resolved_snapshots = []
+	for name in snap_names:
+	    clip_name = self._get_snap_clip_name(name)
+	    if clip_name:
+		resolved = self._get_resolved_snapshot(clip_name)
+		if resolved:
+		    resolved_snapshots.append(resolved)
+	self._snap_morph.load(resolved_snapshots, is_xy)
+	if self._control_rack and self._snap_morph.is_loaded():
+	    self._parameters_to_smooth.clear()
+	    self._smoothing_active = False
+	    self._synced_smoothing_active = False
+	    self._rack_smoothing_active = False
+	    self._control_rack.parameters[1].add_value_listener(self._morph_macro_changed)
+	    if is_xy:
+		self._control_rack.parameters[2].add_value_listener(self._morph_macro_changed)
+	    self._morph_macro_changed()
+            
+            
+    def _morph_macro_changed(self):
+	""" Sets the morph position from the control rack's macros, which is applied on the next timer tick. """
+	if self._control_rack.parameters[0].value == 1.0:
+	    y = None
+	    if self._snap_morph.is_xy:
+		y = self._control_rack.parameters[2].value / 127.0
+	    self._snap_morph.set_position(self._control_rack.parameters[1].value / 127.0, y)
+            
+            
+    def _get_control_track(self):
+	""" Returns the first ClyphX Snap control track or None if there is none. """
+	for track in self.song().tracks:
+	    if self._parent.get_name(track.name).startswith('CLYPHX SNAP'):
+		return track
+	return None
+                
+                
+    def _apply_resolved_snapshot(self, resolved, xclip):
+	""" Applies the settings of the given resolved snapshot. """
+	for kind, target, value in resolved.settings:
+	    if kind == SNAP_PARAM:
+		if target.is_enabled:
+		    self._get_parameter_data_to_smooth(target, value)
+	    elif kind == SNAP_MIX_EXT:
+		target.mute = value[MIX_MUTE_POS]
+		target.solo = value[MIX_SOLO_POS]
+		target.mixer_device.crossfade_assign = value[MIX_CF_POS]
+	    elif value < 0:
+		target.stop_all_clips()
+	    elif target.clip_slots[value].has_clip and target.clip_slots[value].clip != xclip:
+		target.clip_slots[value].fire()
+                
+                
+    def _resolve_snapshot(self, snap_id, snap_data):
+	""" Resolves the given snap data against the current tracks, devices and params. """
+	resolved = ResolvedSnapshot(snap_id)
+	for track_key, param_data in snap_data.items():
+	    track = self._track_map.get_track(track_key)
+	    if track:
+		self._resolve_mix_settings(resolved, track, param_data)
+		if param_data[PLAY_SETTINGS_POS] != None and not track.is_foldable and track is not self.song().master_track:
+		    resolved.add_play_setting(track, param_data[PLAY_SETTINGS_POS])
+		if param_data[DEVICE_SETTINGS_POS]:
+		    self._resolve_device_settings(resolved, track, param_data)
+	return resolved
 		
 		
-    def _recall_mix_settings(self, track, param_data):
-	""" Recalls mixer related settings. """
+    def _resolve_mix_settings(self, resolved, track, param_data):
+	""" Resolves mixer related settings. """
 	if param_data[MIX_STD_SETTINGS_POS]:
 	    pan_value = param_data[MIX_STD_SETTINGS_POS][MIX_PAN_POS]
-	    if track.mixer_device.volume.is_enabled and param_data[MIX_STD_SETTINGS_POS][MIX_VOL_POS] != -1:
-		self._get_parameter_data_to_smooth(track.mixer_device.volume, param_data[MIX_STD_SETTINGS_POS][MIX_VOL_POS])
-	    if track.mixer_device.panning.is_enabled and not isinstance(pan_value, int):
-		self._get_parameter_data_to_smooth(track.mixer_device.panning, param_data[MIX_STD_SETTINGS_POS][MIX_PAN_POS])
+	    if param_data[MIX_STD_SETTINGS_POS][MIX_VOL_POS] != -1:
+		resolved.add_param(track.mixer_device.volume, param_data[MIX_STD_SETTINGS_POS][MIX_VOL_POS])
+	    if not isinstance(pan_value, int):
+		resolved.add_param(track.mixer_device.panning, param_data[MIX_STD_SETTINGS_POS][MIX_PAN_POS])
 	    if track is not self.song().master_track:
+		resolved.watch(track.mixer_device, 'sends')
 		for index in range (len(param_data[MIX_STD_SETTINGS_POS])-MIX_SEND_START_POS):
-		    if index <= len(track.mixer_device.sends)-1 and track.mixer_device.sends[index].is_enabled:
-			self._get_parameter_data_to_smooth(track.mixer_device.sends[index], param_data[MIX_STD_SETTINGS_POS][MIX_SEND_START_POS+index])
+		    if index <= len(track.mixer_device.sends)-1:
+			resolved.add_param(track.mixer_device.sends[index], param_data[MIX_STD_SETTINGS_POS][MIX_SEND_START_POS+index])
 	if param_data[1] and track is not self.song().master_track:
-	    track.mute = param_data[MIX_EXT_SETTINGS_POS][MIX_MUTE_POS]
-	    track.solo = param_data[MIX_EXT_SETTINGS_POS][MIX_SOLO_POS]
-	    track.mixer_device.crossfade_assign =  param_data[MIX_EXT_SETTINGS_POS][MIX_CF_POS]
+	    resolved.add_mix_ext_settings(track, param_data[MIX_EXT_SETTINGS_POS])
 	    
 	    
-    def _recall_device_settings(self, track, param_data):
-	""" Recalls device related settings. """
+    def _resolve_device_settings(self, resolved, track, param_data):
+	""" Resolves device related settings. """
+	resolved.watch(track, 'devices')
 	for device in track.devices:
+	    resolved.watch(device, 'name')
 	    if param_data[DEVICE_SETTINGS_POS].has_key(device.name):
-		self._recall_device_snap(device, param_data[DEVICE_SETTINGS_POS][device.name]['params'])
+		self._resolve_device_snap(resolved, device, param_data[DEVICE_SETTINGS_POS][device.name]['params'])
 		if self._include_nested_devices and self._parent._can_have_nested_devices and device.can_have_chains and param_data[DEVICE_SETTINGS_POS][device.name].has_key('chains'):
-		    self._recall_nested_device_snap(device, param_data[DEVICE_SETTINGS_POS][device.name]['chains'])
+		    self._resolve_nested_device_snap(resolved, device, param_data[DEVICE_SETTINGS_POS][device.name]['chains'])
 		del param_data[DEVICE_SETTINGS_POS][device.name]
 		
 		
-    def _recall_device_snap(self, device, stored_params):
-	""" Recalls the settings of a single device """
-	if device and len(device.parameters) == len(stored_params):
-	    for index, param in enumerate(device.parameters):
-		if param.is_enabled:
-		    self._get_parameter_data_to_smooth(param, stored_params[index])
+    def _resolve_device_snap(self, resolved, device, stored_params):
+	""" Resolves the settings of a single device """
+	if device:
+	    resolved.watch(device, 'parameters')
+	    if is_param_delta(stored_params):
+		params = device.parameters
+		for index, value in get_param_delta_items(stored_params, len(params)):
+		    resolved.add_param(params[index], value)
+	    elif len(device.parameters) == len(stored_params):
+		for index, param in enumerate(device.parameters):
+		    resolved.add_param(param, stored_params[index])
 
 		    
-    def _recall_nested_device_snap(self, rack, stored_params):
-	""" Recalls the settings and mixer settings of nested devices """
+    def _resolve_nested_device_snap(self, resolved, rack, stored_params):
+	""" Resolves the settings and mixer settings of nested devices """
+	resolved.watch(rack, 'chains')
 	if rack.chains and stored_params: 
 	    num_chains = len(rack.chains)
 	    for chain_key in stored_params.keys():
 		if chain_key < num_chains:  
 		    chain = rack.chains[chain_key]
+		    resolved.watch(chain, 'devices')
 		    chain_devices = chain.devices
 		    num_chain_devices = len(chain_devices)
 		    stored_chain = stored_params[chain_key]
 		    stored_devices = stored_chain['devices']
 		    for device_key in stored_devices.keys():
 			if device_key < num_chain_devices:
-			    self._recall_device_snap(chain_devices[device_key], stored_devices[device_key]['params'])
+			    self._resolve_device_snap(resolved, chain_devices[device_key], stored_devices[device_key]['params'])
 			    if chain_devices[device_key].can_have_chains and stored_devices[device_key].has_key('chains'):
-				self._recall_nested_device_snap(chain_devices[device_key], stored_devices[device_key]['chains'])
+				self._resolve_nested_device_snap(resolved, chain_devices[device_key], stored_devices[device_key]['chains'])
 		    if not rack.class_name.startswith('Midi') and stored_chain.has_key('mixer'):
-			if chain.mixer_device.volume.is_enabled:
-			    self._get_parameter_data_to_smooth(chain.mixer_device.volume, stored_chain['mixer'][CHAIN_VOL_POS])
-			if chain.mixer_device.panning.is_enabled:
-			    self._get_parameter_data_to_smooth(chain.mixer_device.panning, stored_chain['mixer'][CHAIN_PAN_POS])
-			if chain.mixer_device.chain_activator.is_enabled:
-			    self._get_parameter_data_to_smooth(chain.mixer_device.chain_activator, stored_chain['mixer'][CHAIN_MUTE_POS])
+			resolved.add_param(chain.mixer_device.volume, stored_chain['mixer'][CHAIN_VOL_POS])
+			resolved.add_param(chain.mixer_device.panning, stored_chain['mixer'][CHAIN_PAN_POS])
+			resolved.add_param(chain.mixer_device.chain_activator, stored_chain['mixer'][CHAIN_MUTE_POS])
+			resolved.watch(chain.mixer_device, 'sends')
 			sends = chain.mixer_device.sends
 			if sends:
 			    num_sends = len(sends)
 			    for i in range(len(stored_chain['mixer']) - CHAIN_SEND_START_POS):
-				if i < num_sends and sends[i].is_enabled:
-				    self._get_parameter_data_to_smooth(sends[i], stored_chain['mixer'][CHAIN_SEND_START_POS + i])
+				if i < num_sends:
+				    resolved.add_param(sends[i], stored_chain['mixer'][CHAIN_SEND_START_POS + i])
 				    
 			
     def _init_smoothing(self, xclip):
@@ -345,78 +532,121 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     def _control_rack_macro_changed(self): 
 	""" Returns param values to set based on macro value and build dict """
 	if self._rack_smoothing_active and self._parameters_to_smooth and self._control_rack.parameters[0].value == 1.0:
-	    self._rack_parameters_to_smooth = {}
-	    macro_value = self._control_rack.parameters[1].value
-	    new_dict = {}
-	    for p, v in self._parameters_to_smooth.items():
-		param_value = v[2] + (macro_value * v[0])
-		if p.is_quantized:
-		    if macro_value < 63 and p.value != v[2]:
-			param_value = v[2]
-		    elif macro_value > 63 and p.value != v[1]:
-			param_value = v[1]
-		    else:
-			param_value = None
-		if param_value != None:
-		    new_dict[p] = param_value
-	    self._rack_parameters_to_smooth = new_dict
+	    self._rack_parameters_to_smooth = self._parameters_to_smooth.get_morph_values(self._control_rack.parameters[1].value / 127.0)
 	    
 		    
+    def set_snap_store_path(self, path):
+	""" Sets the path of the file that snapshots are stored in (if enabled) and recalled from. """
+	if self._snap_store:
+	    self._snap_store.disconnect()
+	self._snap_store = ClyphXSnapStore(path)
+	
+	
+    def _get_snap_data_string(self, snap_data, xclip):
+	""" Returns the string to store the given snap data as in the given X-Clip's name.  This is a reference to the snapshot 
+	in the snapshot store if storing snapshots in a file is enabled (and the store could be written to), otherwise it's 
+	the snap data in the compact format.  A stored snapshot the X-Clip already references is superseded so that the store 
+	can reclaim it. """
+	if self._store_snapshots_in_file and self._snap_store:
+	    try: store_id = self._snap_store.store(snap_data, self._get_snap_store_id(xclip))
+	    except: pass
+	    else:
+		self._snap_cache.remove(get_snap_cache_key(xclip.name))
+		return SNAP_STORE_REF_PREFIX + str(store_id)
+	return encode_snap_data(snap_data)
+    
+    
+    def _get_snap_store_id(self, xclip):
+	""" Returns the id of the stored snapshot the given X-Clip references or None if it doesn't reference one or another 
+	X-Clip references the same snapshot (such as a duplicate of the X-Clip). """
+	name = xclip.name
+	if not ' || ' in name:
+	    return None
+	ref = name[name.index(' || ') + 4:].strip().lower()
+	if not ref.startswith(SNAP_STORE_REF_PREFIX):
+	    return None
+	for track in self.song().tracks:
+	    for slot in track.clip_slots:
+		if slot.has_clip and slot.clip != xclip and slot.clip.name.strip().lower().endswith(' || ' + ref):
+		    return None
+	try: return int(ref[len(SNAP_STORE_REF_PREFIX):])
+	except: return None
+    
+    
+    def _get_snap_data(self, stored_data):
+	""" Returns the snap data stored in an X-Clip name, which can be a reference to a snapshot in the snapshot store, 
+	snap data in the compact format or (for snapshots stored with earlier versions) snap data in the legacy format. 
+	Returns None if a referenced snapshot can't be found. """
+	stored_data = stored_data.strip()
+	if stored_data.lower().startswith(SNAP_STORE_REF_PREFIX):
+	    snap_data = None
+	    if self._snap_store:
+		try: snap_data = self._snap_store.recall(int(stored_data[len(SNAP_STORE_REF_PREFIX):]))
+		except: pass
+	    return snap_data
+	snap_data = decode_snap_data(stored_data)
+	if snap_data is None:
+	    snap_data = pickle.loads(stored_data)
+	return snap_data
+    
+    
+    def get_snap_cache_stats(self):
+	""" Returns string of the snapshot cache's size, hits and misses for diagnostics. """
+	return self._snap_cache.get_stats()
+    
+    
+    def set_smoothing_curve(self, curve_name):
+	""" Sets the curve (LINEAR, EXPONENTIAL or S-CURVE) that smoothing and morphing follow. """
+	self._parameters_to_smooth.set_curve(curve_name)
+		    
+		    
     def _on_timer(self):
 	""" Smoothes parameter value changes via timer """
 	if self._smoothing_active and self._parameters_to_smooth:
 	    self._apply_timed_smoothing()
+	self._snap_morph.update()
 	if self._rack_smoothing_active and self._rack_parameters_to_smooth:
 	    for p, v in self._rack_parameters_to_smooth.items():
-		p.value = v
+		self._write_parameter(p, v)
 		del self._rack_parameters_to_smooth[p] 
+	if self._snap_store:
+	    try: self._snap_store.update()
+	    except: pass
 	    		    
 		
-    def _on_time_changed(self):
-	""" Smoothes parameter value changes synced to playback """
-	if self._synced_smoothing_active and self._parameters_to_smooth and self.song().is_playing:
-	    time = int(str(self.song().get_current_beats_song_time()).split('.')[2])
-	    if self._last_beat != time:
-		self._last_beat = time
-		if IS_LIVE_9:
-		    self._tasks.add(self._apply_timed_smoothing)
-		else:
-		    self._parent.schedule_message(1, self._apply_timed_smoothing)
+    def _on_sixteenth(self):
+	""" Smoothes parameter value changes synced to playback, called by the song clock on each sixteenth """
+	if self._synced_smoothing_active and self._parameters_to_smooth:
+	    if IS_LIVE_9:
+		self._tasks.add(self._apply_timed_smoothing)
+	    else:
+		self._parent.schedule_message(1, self._apply_timed_smoothing)
 		    
 		
     def _apply_timed_smoothing(self, arg=None):
 	""" Applies smoothing for either timer or sync """
 	self._smoothing_count += 1
-	for p, v in self._parameters_to_smooth.items():
-	    param_value = v[2] + (self._smoothing_count * v[0])
-	    if p.is_quantized:
-		p.value = v[1]
-		del self._parameters_to_smooth[p]
-	    elif param_value == v[1] or self._smoothing_count >= self._smoothing_speed:
-		del self._parameters_to_smooth[p]
-		p.value = v[1]
-	    else:
-		p.value = param_value
+	self._parameters_to_smooth.apply_step(self._smoothing_count, self._smoothing_speed)
 	
 	
     def _get_parameter_data_to_smooth(self, parameter, new_value): 
-	""" Returns parameter data to smooth and return list of smoothing value, target value and current value """ 
+	""" Adds the parameter to smooth to the target value or sets the parameter directly if it shouldn't be smoothed. """ 
 	factor = self._smoothing_speed
 	if self._is_control_track and self._control_rack and self._control_rack.parameters[0].value == 1.0:
 	    factor = 127
 	if factor and self._is_control_track:
 	    difference = new_value - parameter.value
 	    if difference and (factor == 127 or (factor != 127 and abs(difference) > 0.01)):
-		if parameter.is_quantized:
-		    factor = 1
-		param_data = [(new_value - parameter.value) / factor, new_value, parameter.value]  
-		if difference < 0.0:
-		    param_data = [((parameter.value - new_value) / factor) * -1, new_value, parameter.value]  
-		self._parameters_to_smooth[parameter] = param_data
+		self._parameters_to_smooth.add(parameter, new_value)
 	    else:
-		parameter.value = new_value
+		self._write_parameter(parameter, new_value)
 	else:
-	    parameter.value = new_value
+	    self._write_parameter(parameter, new_value)
+    
+    
+    def _write_parameter(self, parameter, value):
+	""" Writes the value to the parameter via the parent's write scheduler with high priority as snapshots are timed. """
+	self._parent.write_parameter(parameter, value, WRITE_PRIORITY_HIGH)
     			
 		    		
     def _get_snap_device_range(self, args, track):
@@ -448,17 +678,10 @@ class ClyphXSnapActions(ControlSurfaceComponent):
     
     
     def setup_tracks(self):  
-	""" Stores dictionary of tracks by name """
-	self._current_tracks = {}
-	self._remove_track_listeners()
-	for track in (tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)):
-	    if not track.name_has_listener(self.setup_tracks):
-		track.add_name_listener(self.setup_tracks)
-	    name = self._parent.get_name(track.name)
-	    if not self._current_tracks.has_key(track.name) and not name.startswith('CLYPHX SNAP'):
-		self._current_tracks[track.name] = track
-		
-		
+	""" Updates the map of tracks by name on init and track list changes """
+	self._track_map.update(tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,))
+	
+	
     def _refresh_xclip_name(self, xclip_data):
 	""" Refreshes xclip's previous name in cases where a snap is asking to store too many params """
 	xclip_data[0].name = xclip_data[1]
@@ -470,14 +693,17 @@ class ClyphXSnapActions(ControlSurfaceComponent):
 	    self._control_rack.name = 'ClyphX Snap'
 	    if self._control_rack.parameters[1].value_has_listener(self._control_rack_macro_changed):
 		self._control_rack.parameters[1].remove_value_listener(self._control_rack_macro_changed)
+	self._clear_snap_morph()
 	self._control_rack = None
 	
 	
-    def _remove_track_listeners(self): 
-	""" Removes track name listeners """
-	for track in (tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)):
-	    if track.name_has_listener(self.setup_tracks):
-		track.remove_name_listener(self.setup_tracks)
+    def _clear_snap_morph(self):
+	""" Unloads the snapshots that are morphed between and removes the control rack's morph listeners """
+	if self._control_rack:
+	    for index in range(1, 3):
+		if self._control_rack.parameters[index].value_has_listener(self._morph_macro_changed):
+		    self._control_rack.parameters[index].remove_value_listener(self._morph_macro_changed)
+	self._snap_morph.clear()
 		       					
     
 # local variables:
@@ -0,0 +1,162 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import zlib
+
+MAX_CACHED_SNAPSHOTS = 32
+
+""" The kinds of settings in a resolved snapshot. """
+SNAP_PARAM = 0
+SNAP_MIX_EXT = 1
+SNAP_PLAY = 2
+
+def get_snap_cache_key(clip_name):
+    """ Returns the cache key of the snapshot stored in the X-Clip with the given name, made up of its snap id and the 
+    length and checksums of its snap data (which can be tens of KB for snapshots stored in the X-Clip name). """
+    clip_name = str(clip_name)
+    snap_id = ''
+    if '[' in clip_name and ']' in clip_name:
+        snap_id = clip_name[clip_name.index('['):clip_name.index(']')+1].strip().upper()
+    snap_data = clip_name
+    if ' || ' in clip_name:
+        snap_data = clip_name[clip_name.index(' || ') + 4:].strip()
+    return (snap_id, len(snap_data), zlib.crc32(snap_data), zlib.adler32(snap_data))
+
+
+class ResolvedSnapshot(object):
+    """ A snapshot resolved against the tracks, devices and params it applies to as a list of (kind, target, value) 
+    settings.  It's invalidated from the listeners of the LOM objects it was resolved through. """
+    
+    def __init__(self, snap_id):
+        self.snap_id = snap_id
+        self.settings = []
+        self._listeners = {}
+        self._is_valid = True
+        
+        
+    def disconnect(self):
+        self._remove_listeners()
+        self.settings = []
+        
+        
+    def is_valid(self):
+        return self._is_valid
+    
+    
+    def invalidate(self):
+        self._is_valid = False
+        
+        
+    def add_param(self, param, value):
+        self.settings.append((SNAP_PARAM, param, value))
+        
+        
+    def add_mix_ext_settings(self, track, values):
+        self.settings.append((SNAP_MIX_EXT, track, values))
+        
+        
+    def add_play_setting(self, track, slot_index):
+        self.settings.append((SNAP_PLAY, track, slot_index))
+        
+        
+    def watch(self, lom_object, property_name):
+        """ Invalidates this when the given property of the given object changes. """
+        key = (lom_object, property_name)
+        if not self._listeners.has_key(key):
+            self._listeners[key] = self.invalidate
+            getattr(lom_object, 'add_' + property_name + '_listener')(self.invalidate)
+            
+            
+    def _remove_listeners(self):
+        for lom_object, property_name in self._listeners.keys():
+            try:
+                if getattr(lom_object, property_name + '_has_listener')(self.invalidate):
+                    getattr(lom_object, 'remove_' + property_name + '_listener')(self.invalidate)
+            except: pass
+        self._listeners = {}
+        
+        
+class ClyphXSnapCache(object):
+    """ Bounded LRU cache of resolved snapshots keyed by get_snap_cache_key (and so by their snap data).  Counts hits and 
+    misses for the debug output. """
+    
+    def __init__(self):
+        self._entries = {}
+        self._order = []
+        self._num_hits = 0
+        self._num_misses = 0
+        
+        
+    def disconnect(self):
+        self.clear()
+        
+        
+    def clear(self):
+        """ Removes all resolved snapshots (and their listeners). """
+        for entry in self._entries.values():
+            entry.disconnect()
+        self._entries = {}
+        self._order = []
+        
+        
+    def get(self, key):
+        """ Returns the valid resolved snapshot for the given key or None.  Invalidated snapshots are removed. """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._order.remove(key)
+            if entry.is_valid():
+                self._order.append(key)
+                self._num_hits += 1
+                return entry
+            del self._entries[key]
+            entry.disconnect()
+        self._num_misses += 1
+        return None
+    
+    
+    def add(self, key, entry):
+        """ Adds the given resolved snapshot, removing the least recently used one if the cache is full. """
+        if self._entries.has_key(key):
+            self._order.remove(key)
+            self._entries[key].disconnect()
+        elif len(self._order) >= MAX_CACHED_SNAPSHOTS:
+            self._entries.pop(self._order.pop(0)).disconnect()
+        self._entries[key] = entry
+        self._order.append(key)
+        
+        
+    def remove(self, key):
+        """ Removes the resolved snapshot for the given key if there is one. """
+        if self._entries.has_key(key):
+            self._order.remove(key)
+            self._entries.pop(key).disconnect()
+            
+            
+    def get_stats(self):
+        """ Returns string of the number of cached snapshots, hits and misses for diagnostics. """
+        return 'size=' + str(len(self._entries)) + ' hits=' + str(self._num_hits) + ' misses=' + str(self._num_misses)
+    
+    
+# local variables:
+# tab-width: 4
@@ -0,0 +1,150 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import array
+import base64
+import struct
+import sys
+import zlib
+
+""" Prefix that identifies snapshot data in the compact format, the number is the format version. """
+SNAP_FORMAT_PREFIX = '(CXS1)'
+
+""" Type tags of encoded values. """
+TAG_NONE = 'N'
+TAG_INT = 'I'
+TAG_FLOAT = 'D'
+TAG_STRING = 'S'
+TAG_LIST = 'L'
+TAG_FLOAT_ARRAY = 'A'
+TAG_DOUBLE_ARRAY = 'B'
+TAG_DICT = 'M'
+
+IS_BIG_ENDIAN = sys.byteorder == 'big'
+
+def encode_snap_data(snap_data):
+    """ Encodes the given snapshot data (nested dicts and lists of parameter values) in the compact format.  Lists of 
+    floats are packed into float arrays, the result is compressed with zlib and base64-encoded so it can be stored in 
+    a clip name. """
+    return SNAP_FORMAT_PREFIX + base64.b64encode(zlib.compress(pack_snap_data(snap_data), 9))
+
+
+def decode_snap_data(data):
+    """ Decodes the given snapshot data string if it's in the compact format, otherwise returns None so the caller can 
+    fall back to the legacy format. """
+    data = data.strip()
+    if not data.startswith(SNAP_FORMAT_PREFIX):
+        return None
+    return unpack_snap_data(zlib.decompress(base64.b64decode(data[len(SNAP_FORMAT_PREFIX):])))
+
+
+def pack_snap_data(snap_data):
+    """ Packs the given snapshot data into the uncompressed binary form of the compact format. """
+    chunks = []
+    _encode_value(snap_data, chunks)
+    return ''.join(chunks)
+
+
+def unpack_snap_data(raw_data, pos=0):
+    """ Unpacks snapshot data from the given buffer (a string or an mmap) starting at the given position.  Values are 
+    read from the buffer in place, so no copy of the packed data is made. """
+    return _decode_value(raw_data, pos)[0]
+
+
+def _encode_value(value, chunks):
+    if value is None:
+        chunks.append(TAG_NONE)
+    elif isinstance(value, float):
+        chunks.append(TAG_FLOAT + struct.pack('<d', value))
+    elif isinstance(value, (int, long)):
+        chunks.append(TAG_INT + struct.pack('<i', value))
+    elif isinstance(value, basestring):
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        chunks.append(TAG_STRING + struct.pack('<I', len(value)) + value)
+    elif isinstance(value, dict):
+        chunks.append(TAG_DICT + struct.pack('<I', len(value)))
+        for k, v in value.items():
+            _encode_value(k, chunks)
+            _encode_value(v, chunks)
+    elif value and _is_float_list(value):
+        # Live's parameter values are single precision, so they can almost always be packed as such.  Doubles are 
+        # only used if that would change a value (which could then be out of its parameter's range).
+        packed = array.array('f', value)
+        tag = TAG_FLOAT_ARRAY
+        if packed.tolist() != list(value):
+            packed = array.array('d', value)
+            tag = TAG_DOUBLE_ARRAY
+        if IS_BIG_ENDIAN:
+            packed.byteswap()
+        chunks.append(tag + struct.pack('<I', len(value)) + packed.tostring())
+    else:
+        chunks.append(TAG_LIST + struct.pack('<I', len(value)))
+        for v in value:
+            _encode_value(v, chunks)
+            
+            
+def _is_float_list(value):
+    for v in value:
+        if not isinstance(v, float):
+            return False
+    return True
+
+
+def _decode_value(raw_data, pos):
+    """ Decodes the value at the given position of the raw data and returns the value and the position following it. """
+    tag = raw_data[pos]
+    pos += 1
+    if tag == TAG_NONE:
+        return (None, pos)
+    if tag == TAG_INT:
+        return (struct.unpack_from('<i', raw_data, pos)[0], pos + 4)
+    if tag == TAG_FLOAT:
+        return (struct.unpack_from('<d', raw_data, pos)[0], pos + 8)
+    length = struct.unpack_from('<I', raw_data, pos)[0]
+    pos += 4
+    if tag == TAG_STRING:
+        return (raw_data[pos:pos + length].decode('utf-8'), pos + length)
+    if tag == TAG_FLOAT_ARRAY:
+        return (list(struct.unpack_from('<%df' % length, raw_data, pos)), pos + (length * 4))
+    if tag == TAG_DOUBLE_ARRAY:
+        return (list(struct.unpack_from('<%dd' % length, raw_data, pos)), pos + (length * 8))
+    if tag == TAG_DICT:
+        result = {}
+        for i in range(length):
+            k, pos = _decode_value(raw_data, pos)
+            v, pos = _decode_value(raw_data, pos)
+            result[k] = v
+        return (result, pos)
+    if tag == TAG_LIST:
+        result = []
+        for i in range(length):
+            v, pos = _decode_value(raw_data, pos)
+            result.append(v)
+        return (result, pos)
+    raise ValueError('Invalid snapshot data tag: ' + repr(tag))
+
+
+# local variables:
+# tab-width: 4
@@ -0,0 +1,82 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+""" Keys of a param delta, which is stored in place of the list of a device's param values in delta snapshots. """
+DELTA_NUM_PARAMS_KEY = 'num_params'
+DELTA_INDEXES_KEY = 'delta_indexes'
+DELTA_VALUES_KEY = 'delta_values'
+
+def get_param_delta(params, reference_values=None):
+    """ Returns the delta of the given params' values as a dict holding the number of params along with the indexes and 
+    values of the params that differ from the given reference values (such as the values stored in a baseline snapshot). 
+    If there are no reference values or they don't match the params, the delta is relative to the params' default values. 
+    Quantized params have no default value, so they're always included in that case. """
+    if reference_values is None or len(reference_values) != len(params):
+        reference_values = [get_default_value(p) for p in params]
+    indexes = []
+    values = []
+    for index, param in enumerate(params):
+        if param.value != reference_values[index]:
+            indexes.append(index)
+            values.append(param.value)
+    return {DELTA_NUM_PARAMS_KEY : len(params), DELTA_INDEXES_KEY : indexes, DELTA_VALUES_KEY : values}
+
+
+def get_param_delta_items(param_delta, num_params):
+    """ Returns a list of the (index, value) pairs in the given param delta or an empty list if the delta was stored for 
+    a different number of params. """
+    if param_delta[DELTA_NUM_PARAMS_KEY] != num_params:
+        return []
+    return zip(param_delta[DELTA_INDEXES_KEY], param_delta[DELTA_VALUES_KEY])
+
+
+def is_param_delta(stored_params):
+    """ Returns whether the given stored params are a param delta rather than a list of param values. """
+    return isinstance(stored_params, dict)
+
+
+def get_reference_values(stored_params, params):
+    """ Returns the full list of values that the given stored params (a list of param values or a param delta) hold for 
+    the given params or None if they were stored for a different number of params. """
+    if is_param_delta(stored_params):
+        if stored_params[DELTA_NUM_PARAMS_KEY] != len(params):
+            return None
+        values = [get_default_value(p) for p in params]
+        for index, value in get_param_delta_items(stored_params, len(params)):
+            values[index] = value
+        return values
+    if len(stored_params) == len(params):
+        return stored_params
+    return None
+
+
+def get_default_value(param):
+    """ Returns the default value of the given param or None if it's quantized and so has no default value. """
+    if param.is_quantized:
+        return None
+    return param.default_value
+
+
+# local variables:
+# tab-width: 4
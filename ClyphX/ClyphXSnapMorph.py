@@ -0,0 +1,203 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+from ClyphXSnapCache import SNAP_PARAM
+
+MIN_MORPH_SNAPSHOTS = 2
+MAX_MORPH_SNAPSHOTS = 8
+
+""" The resolution of morph positions, which matches that of rack macros.  Weights are precomputed per step. """
+MORPH_STEPS = 127
+
+""" The points of snapshots on the XY plane when morphing with a pair of macros.  The first four are the corners and the 
+rest are the midpoints of the edges. """
+XY_POINTS = ((0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0), (0.5, 0.0), (1.0, 0.5), (0.5, 1.0), (0.0, 0.5))
+
+class ClyphXSnapMorph(object):
+    """ Morphs between 2 - 8 resolved snapshots.  The values of the params that differ between the snapshots are held in 
+    a dense matrix with a column per snapshot.  Positions are either along a line through the snapshots in order or on an 
+    XY plane with the snapshots at XY_POINTS.  Each position is blended in one pass per snapshot that has weight at it and 
+    only params whose value changed are written.  Position changes are only applied on update, so writes are limited to 
+    one pass per timer tick.  Params are written with the given function, which is called with the param and its value. """
+    
+    def __init__(self, write_param):
+        self._write_param = write_param
+        self.clear()
+        
+        
+    def clear(self):
+        """ Unloads the snapshots. """
+        self.is_xy = False
+        self._num_snapshots = 0
+        self._params = []
+        self._columns = []
+        self._written = []
+        self._quantized_params = []
+        self._quantized_columns = []
+        self._fixed_settings = []
+        self._weights = {}
+        self._position = None
+        
+        
+    def is_loaded(self):
+        return self._num_snapshots > 0
+    
+    
+    def load(self, resolved_snapshots, is_xy=False):
+        """ Loads the params of the given resolved snapshots into the matrix.  Params that aren't in all of the snapshots 
+        use their current value for the snapshots they're not in.  Params that have the same value in all snapshots are 
+        written on the first update only. """
+        self.clear()
+        if not MIN_MORPH_SNAPSHOTS <= len(resolved_snapshots) <= MAX_MORPH_SNAPSHOTS:
+            return
+        param_values = {}
+        param_order = []
+        for index, resolved in enumerate(resolved_snapshots):
+            for kind, param, value in resolved.settings:
+                if kind == SNAP_PARAM:
+                    values = param_values.get(param)
+                    if values is None:
+                        values = [None] * len(resolved_snapshots)
+                        param_values[param] = values
+                        param_order.append(param)
+                    values[index] = value
+        num_snapshots = len(resolved_snapshots)
+        columns = [[] for i in range(num_snapshots)]
+        quantized_columns = [[] for i in range(num_snapshots)]
+        for param in param_order:
+            values = param_values[param]
+            if None in values:
+                current = param.value
+                for index, value in enumerate(values):
+                    if value is None:
+                        values[index] = current
+            if values.count(values[0]) == num_snapshots:
+                self._fixed_settings.append((param, values[0]))
+            elif param.is_quantized:
+                self._quantized_params.append(param)
+                for index in range(num_snapshots):
+                    quantized_columns[index].append(values[index])
+            else:
+                self._params.append(param)
+                for index in range(num_snapshots):
+                    columns[index].append(values[index])
+        self._columns = columns
+        self._quantized_columns = quantized_columns
+        self._written = [None] * len(self._params)
+        self._num_snapshots = num_snapshots
+        self.is_xy = is_xy
+        if not is_xy:
+            for step in range(MORPH_STEPS + 1):
+                self._get_weights(step, None)
+                
+                
+    def set_position(self, x, y=None):
+        """ Sets the position (0.0 - 1.0 on each axis) to morph to on the next update. """
+        if self._num_snapshots:
+            x_step = int(round(x * MORPH_STEPS))
+            y_step = None
+            if self.is_xy and y is not None:
+                y_step = int(round(y * MORPH_STEPS))
+            self._position = (x_step, y_step)
+            
+            
+    def update(self):
+        """ Blends the snapshots at the position that was last set (if any) and writes the params that changed. """
+        if self._position is None:
+            return
+        weights = self._get_weights(self._position[0], self._position[1])
+        self._position = None
+        write_param = self._write_param
+        if self._fixed_settings:
+            for param, value in self._fixed_settings:
+                write_param(param, value)
+            self._fixed_settings = []
+        if self._params:
+            column_index, weight = weights[0]
+            values = [v * weight for v in self._columns[column_index]]
+            for column_index, weight in weights[1:]:
+                values = [a + (b * weight) for a, b in zip(values, self._columns[column_index])]
+            written = self._written
+            params = self._params
+            for index, value in enumerate(values):
+                if value != written[index]:
+                    written[index] = value
+                    write_param(params[index], value)
+        if self._quantized_params:
+            column = self._quantized_columns[max([(w, i) for i, w in weights])[1]]
+            for index, param in enumerate(self._quantized_params):
+                if param.value != column[index]:
+                    write_param(param, column[index])
+                    
+                    
+    def _get_weights(self, x_step, y_step):
+        """ Returns the list of (snapshot index, weight) of the snapshots that have weight at the given position, which is 
+        computed once per position. """
+        key = (x_step, y_step)
+        weights = self._weights.get(key)
+        if weights is None:
+            if y_step is None:
+                weights = self._get_line_weights(x_step)
+            else:
+                weights = self._get_xy_weights(self._get_xy_position(x_step), self._get_xy_position(y_step))
+            self._weights[key] = weights
+        return weights
+    
+    
+    def _get_line_weights(self, step):
+        """ Returns weights that blend the two adjacent snapshots the given step lies between.  Interior snapshots don't 
+        necessarily fall on a step, so steps within half a step of a snapshot are at the snapshot. """
+        num_segments = self._num_snapshots - 1
+        nearest = int(round(float(step * num_segments) / MORPH_STEPS))
+        if abs((step * num_segments) - (nearest * MORPH_STEPS)) * 2 <= num_segments:
+            return [(nearest, 1.0)]
+        segment_position = float(step * num_segments) / MORPH_STEPS
+        index = int(segment_position)
+        weight = segment_position - index
+        return [(index, 1.0 - weight), (index + 1, weight)]
+    
+    
+    def _get_xy_position(self, step):
+        """ Returns the position on an axis of the XY plane for the given step.  The midpoint doesn't fall on a step, so 
+        steps within half a step of it are at the midpoint. """
+        if abs((step * 2) - MORPH_STEPS) <= 1:
+            return 0.5
+        return float(step) / MORPH_STEPS
+    
+    
+    def _get_xy_weights(self, x, y):
+        """ Returns inverse distance weights of the snapshots for the given XY position. """
+        inverse_distances = []
+        for index in range(self._num_snapshots):
+            point = XY_POINTS[index]
+            distance = ((x - point[0]) ** 2) + ((y - point[1]) ** 2)
+            if distance == 0.0:
+                return [(index, 1.0)]
+            inverse_distances.append(1.0 / distance)
+        total = sum(inverse_distances)
+        return [(index, d / total) for index, d in enumerate(inverse_distances)]
+    
+    
+# local variables:
+# tab-width: 4
@@ -0,0 +1,167 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+from itertools import izip
+
+""" The curves that smoothing can follow. """
+CURVE_LINEAR = 'LINEAR'
+CURVE_EXPONENTIAL = 'EXPONENTIAL'
+CURVE_S_CURVE = 'S-CURVE'
+
+""" The shape of the exponential curve, higher values make the curve start slower and end faster. """
+EXPONENTIAL_CURVE_SHAPE = 6.0
+
+""" The number of steps of each param's range that values are quantized to when determining whether the displayed value 
+of a param has changed. """
+DISPLAY_RESOLUTION = 1000.0
+
+""" The position of the control rack's morph macro below which quantized params are at their start values and above 
+which they're at their target values. """
+MORPH_QUANTIZED_THRESHOLD = 63 / 127.0
+
+def _linear_curve(position):
+    return position
+
+
+def _exponential_curve(position):
+    return (2.0 ** (EXPONENTIAL_CURVE_SHAPE * position) - 1.0) / (2.0 ** EXPONENTIAL_CURVE_SHAPE - 1.0)
+
+
+def _s_curve(position):
+    return position * position * (3.0 - (2.0 * position))
+
+
+CURVES = {CURVE_LINEAR : _linear_curve, CURVE_EXPONENTIAL : _exponential_curve, CURVE_S_CURVE : _s_curve}
+
+class ClyphXSnapSmoothing(object):
+    """ Interpolates params from their start values to their target values over a number of steps along a selectable 
+    curve.  Non-quantized params are held in parallel lists of params, start values, deltas and target values along with 
+    the same values scaled to display levels.  Each step is computed in one pass over the levels and a param is only 
+    written when its display level changes.  Quantized params can't be interpolated, so they're set to their targets on 
+    the first step.  Params are written with the given function, which is called with the param and its new value. """
+    
+    def __init__(self, write_param):
+        self._write_param = write_param
+        self._curve = _linear_curve
+        self.clear()
+        
+        
+    def clear(self):
+        """ Removes all params to smooth. """
+        self._params = []
+        self._starts = []
+        self._deltas = []
+        self._targets = []
+        self._start_levels = []
+        self._delta_levels = []
+        self._levels = []
+        self._written = []
+        self._quantized = []
+        self._min_delta_level = None
+        
+        
+    def __len__(self):
+        return len(self._params) + len(self._quantized)
+    
+    
+    def set_curve(self, curve_name):
+        """ Sets the curve to smooth along, unknown curves are treated as linear. """
+        self._curve = CURVES.get(curve_name, _linear_curve)
+        
+        
+    def add(self, param, target):
+        """ Adds the given param to smooth from its current value to the given target value. """
+        start = param.value
+        if param.is_quantized:
+            self._quantized.append((param, start, target))
+            return
+        p_range = param.max - param.min
+        scale = 0.0
+        if p_range:
+            scale = DISPLAY_RESOLUTION / p_range
+        start_level = ((start - param.min) * scale) + 0.5
+        self._params.append(param)
+        self._starts.append(start)
+        self._deltas.append(target - start)
+        self._targets.append(target)
+        self._start_levels.append(start_level)
+        self._delta_levels.append((target - start) * scale)
+        self._levels.append(int(start_level))
+        self._written.append(start)
+        delta_level = abs((target - start) * scale)
+        if self._min_delta_level is None or delta_level < self._min_delta_level:
+            self._min_delta_level = delta_level
+        
+        
+    def apply_step(self, step, num_steps):
+        """ Applies the given step (1 - num_steps) of smoothing.  All params are set to their targets on the last step, 
+        after which the params to smooth are cleared. """
+        if self._quantized:
+            for param, start, target in self._quantized:
+                self._write_param(param, target)
+            self._quantized = []
+        if step >= num_steps:
+            for index, param in enumerate(self._params):
+                if self._written[index] != self._targets[index]:
+                    self._write_param(param, self._targets[index])
+            self.clear()
+            return
+        position = self._curve(float(step) / num_steps)
+        if self._curve is _linear_curve and self._min_delta_level >= num_steps:
+            # The display level of every param changes on each linear step (as when smoothing over the full range of 
+            # params), so levels don't need to be compared and all params are written.
+            values = [s + (d * position) for s, d in izip(self._starts, self._deltas)]
+            self._written = values
+            map(self._write_param, self._params, values)
+            return
+        start_levels = self._start_levels
+        delta_levels = self._delta_levels
+        levels = self._levels
+        write_param = self._write_param
+        for index in xrange(len(levels)):
+            level = int(start_levels[index] + (delta_levels[index] * position))
+            if level != levels[index]:
+                levels[index] = level
+                value = self._starts[index] + (self._deltas[index] * position)
+                self._written[index] = value
+                write_param(self._params[index], value)
+                
+                
+    def get_morph_values(self, position):
+        """ Returns dict of params and the values to set them to for the given position (0.0 - 1.0) between their start 
+        and target values.  Quantized params are only included if they're not already at the value for the position. """
+        values = {}
+        curve_position = self._curve(position)
+        for index, param in enumerate(self._params):
+            values[param] = self._starts[index] + (self._deltas[index] * curve_position)
+        for param, start, target in self._quantized:
+            if position < MORPH_QUANTIZED_THRESHOLD and param.value != start:
+                values[param] = start
+            elif position > MORPH_QUANTIZED_THRESHOLD and param.value != target:
+                values[param] = target
+        return values
+    
+    
+# local variables:
+# tab-width: 4
@@ -0,0 +1,275 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import mmap
+import os
+import struct
+import zlib
+from ClyphXSnapCodec import pack_snap_data, unpack_snap_data
+
+SNAP_STORE_FILE_NAME = 'ClyphXSnapshots.dat'
+
+""" Prefix of the reference to a stored snapshot in X-Clip names, followed by the snapshot's id. """
+SNAP_STORE_REF_PREFIX = '@snap:'
+
+""" The file starts with a header (magic, version) followed by records, each made up of a record header (magic, snapshot 
+id, payload length, payload CRC) and the payload (snapshot data in the packed compact format). """
+STORE_MAGIC = 'CXSS'
+STORE_VERSION = 1
+STORE_HEADER_FORMAT = '<4sI'
+STORE_HEADER_SIZE = struct.calcsize(STORE_HEADER_FORMAT)
+RECORD_MAGIC = 'SNAP'
+RECORD_HEADER_FORMAT = '<4sIIi'
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_HEADER_FORMAT)
+
+""" The store is compacted when at least this many bytes and at least half of the file are taken up by records that 
+were superseded or damaged. """
+MIN_COMPACTION_SIZE = 65536
+
+""" The store is compacted over several updates, each of which copies records until at least this many bytes have been 
+copied. """
+COMPACTION_BYTES_PER_UPDATE = 262144
+
+class ClyphXSnapStore(object):
+    """ Append-only file of snapshots indexed by snapshot id, which is memory-mapped for recalling.  Records are only 
+    added to the index once completely written and each has a CRC, so a partially written record (such as when Live 
+    crashes while storing) is ignored and overwritten by the next record.  Syncing stored records to disk and compacting 
+    the store are done on update (called on each timer tick), so storing doesn't wait for the disk and compaction is 
+    spread over several ticks. """
+    
+    def __init__(self, path):
+        self._path = path
+        self._index = {}
+        self._next_id = 1
+        self._end_pos = 0
+        self._garbage_size = 0
+        self._damaged_size = 0
+        self._map = None
+        self._map_file = None
+        self._is_loaded = False
+        self._needs_sync = False
+        self._compaction = None
+        
+        
+    def disconnect(self):
+        self._abort_compaction()
+        if self._needs_sync:
+            try: self._sync()
+            except: pass
+        self._close_map()
+        self._index = {}
+        
+        
+    def update(self):
+        """ Syncs the records stored since the last update to disk and starts or continues compaction if necessary. """
+        if self._needs_sync:
+            self._sync()
+        if self._compaction is None and self.needs_compaction():
+            self._start_compaction()
+        if self._compaction is not None:
+            try: self._continue_compaction(COMPACTION_BYTES_PER_UPDATE)
+            except:
+                self._abort_compaction()
+                raise
+        
+        
+    def store(self, snap_data, snap_id=None):
+        """ Appends the given snapshot data and returns its id (a new id unless one is given, in which case the record 
+        with that id is superseded).  The record is synced to disk on the next update. """
+        self._load()
+        if snap_id is None:
+            snap_id = self._next_id
+        payload = pack_snap_data(snap_data)
+        record = struct.pack(RECORD_HEADER_FORMAT, RECORD_MAGIC, snap_id, len(payload), zlib.crc32(payload)) + payload
+        self._close_map()
+        f = open(self._path, 'r+b')
+        try:
+            f.truncate(self._end_pos)
+            f.seek(self._end_pos)
+            f.write(record)
+            f.flush()
+        finally:
+            f.close()
+        self._needs_sync = True
+        self._garbage_size -= self._damaged_size
+        self._damaged_size = 0
+        if snap_id in self._index:
+            self._garbage_size += RECORD_HEADER_SIZE + self._index[snap_id][1]
+        self._index[snap_id] = (self._end_pos + RECORD_HEADER_SIZE, len(payload))
+        self._end_pos += len(record)
+        self._next_id = max(self._next_id, snap_id + 1)
+        if self._compaction is not None and snap_id not in self._compaction['ids']:
+            self._compaction['ids'].append(snap_id)
+        return snap_id
+    
+    
+    def recall(self, snap_id):
+        """ Returns the snapshot data with the given id or None if there is none.  The data is read directly from the 
+        mapped file. """
+        self._load()
+        record = self._index.get(snap_id)
+        if record is None:
+            return None
+        if self._map is None:
+            self._open_map()
+        return unpack_snap_data(self._map, record[0])
+    
+    
+    def needs_compaction(self):
+        return self._garbage_size >= MIN_COMPACTION_SIZE and self._garbage_size * 2 >= self._end_pos
+    
+    
+    def compact(self):
+        """ Rewrites the store without superseded and damaged records at once. """
+        if self._compaction is None:
+            self._start_compaction()
+        try: self._continue_compaction(None)
+        except:
+            self._abort_compaction()
+            raise
+        
+        
+    def _start_compaction(self):
+        """ Starts rewriting the store without superseded and damaged records.  The new file is written next to the store 
+        and then replaces it, so the store stays intact if this is interrupted.  Failed compactions aren't retried until 
+        enough further garbage accumulates. """
+        self._load()
+        self._garbage_size = 0
+        self._damaged_size = 0
+        f = open(self._path + '.tmp', 'wb')
+        f.write(struct.pack(STORE_HEADER_FORMAT, STORE_MAGIC, STORE_VERSION))
+        self._compaction = {'file' : f, 'ids' : sorted(self._index.keys()), 'index' : {}, 'pos' : STORE_HEADER_SIZE, 
+                            'garbage_size' : 0}
+        
+        
+    def _continue_compaction(self, max_bytes):
+        """ Copies the records that are still to be copied (including those stored since compaction started) until at least 
+        the given number of bytes have been copied (or all of them if None) and replaces the store once all are copied. """
+        compaction = self._compaction
+        f = compaction['file']
+        ids = compaction['ids']
+        new_index = compaction['index']
+        pos = compaction['pos']
+        num_bytes = 0
+        if self._map is None:
+            self._open_map()
+        while ids and (max_bytes is None or num_bytes < max_bytes):
+            snap_id = ids.pop(0)
+            payload_pos, length = self._index[snap_id]
+            f.write(self._map[payload_pos - RECORD_HEADER_SIZE:payload_pos + length])
+            if snap_id in new_index:
+                compaction['garbage_size'] += RECORD_HEADER_SIZE + new_index[snap_id][1]
+            new_index[snap_id] = (pos + RECORD_HEADER_SIZE, length)
+            pos += RECORD_HEADER_SIZE + length
+            num_bytes += RECORD_HEADER_SIZE + length
+        compaction['pos'] = pos
+        if ids:
+            return
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        self._compaction = None
+        self._close_map()
+        self._replace_file(self._path + '.tmp')
+        self._index = new_index
+        self._end_pos = pos
+        self._garbage_size = compaction['garbage_size']
+        self._damaged_size = 0
+        self._needs_sync = False
+        
+        
+    def _abort_compaction(self):
+        if self._compaction is not None:
+            self._compaction['file'].close()
+            self._compaction = None
+            try: os.remove(self._path + '.tmp')
+            except: pass
+            
+            
+    def _sync(self):
+        """ Syncs the records stored since the last sync to disk. """
+        self._needs_sync = False
+        f = open(self._path, 'r+b')
+        try: os.fsync(f.fileno())
+        finally: f.close()
+        
+        
+    def _replace_file(self, temp_path):
+        if os.name == 'nt' and os.path.exists(self._path):
+            # Windows can't rename over an existing file, _load recovers the temp file if this is interrupted here.
+            os.remove(self._path)
+        os.rename(temp_path, self._path)
+        
+        
+    def _load(self):
+        """ Creates the store if necessary and builds the index from the valid records in it. """
+        if self._is_loaded:
+            return
+        if not os.path.exists(self._path) and os.path.exists(self._path + '.tmp'):
+            os.rename(self._path + '.tmp', self._path)
+        if not os.path.exists(self._path) or os.path.getsize(self._path) < STORE_HEADER_SIZE:
+            f = open(self._path, 'wb')
+            try:
+                f.write(struct.pack(STORE_HEADER_FORMAT, STORE_MAGIC, STORE_VERSION))
+                f.flush()
+                os.fsync(f.fileno())
+            finally:
+                f.close()
+        self._is_loaded = True
+        self._open_map()
+        data = self._map
+        if struct.unpack_from(STORE_HEADER_FORMAT, data, 0) != (STORE_MAGIC, STORE_VERSION):
+            raise IOError('Invalid snapshot store: ' + self._path)
+        pos = STORE_HEADER_SIZE
+        size = len(data)
+        while pos + RECORD_HEADER_SIZE <= size:
+            magic, snap_id, length, crc = struct.unpack_from(RECORD_HEADER_FORMAT, data, pos)
+            payload_pos = pos + RECORD_HEADER_SIZE
+            if magic != RECORD_MAGIC or payload_pos + length > size or zlib.crc32(data[payload_pos:payload_pos + length]) != crc:
+                break
+            if snap_id in self._index:
+                self._garbage_size += RECORD_HEADER_SIZE + self._index[snap_id][1]
+            self._index[snap_id] = (payload_pos, length)
+            self._next_id = max(self._next_id, snap_id + 1)
+            pos = payload_pos + length
+        self._end_pos = pos
+        self._damaged_size = size - pos
+        self._garbage_size += self._damaged_size
+        
+        
+    def _open_map(self):
+        self._map_file = open(self._path, 'rb')
+        self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        
+    def _close_map(self):
+        if self._map is not None:
+            self._map.close()
+            self._map_file.close()
+        self._map = None
+        self._map_file = None
+        
+        
+# local variables:
+# tab-width: 4
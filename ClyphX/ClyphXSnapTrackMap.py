@@ -0,0 +1,157 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+""" Separates the name of a track from its occurrence number in the keys of tracks whose names are also used by earlier 
+tracks.  This can't be typed into track names, so these keys can't clash with other track names. """
+DUPLICATE_NAME_SEPARATOR = '\x1f'
+
+class ClyphXSnapTrackMap(object):
+    """ Map of exact track names to the tracks that snapshots store and recall settings of (all tracks other than ClyphX 
+    Snap control tracks).  Tracks with the same name are kept in track order and the first one is keyed by its name, 
+    later ones by their name and occurrence number.  The map is updated incrementally: renaming a track only moves that 
+    track and adding/removing tracks only adds/removes those tracks. """
+    __module__ = __name__
+    
+    def __init__(self, parent, on_changed):
+        self._parent = parent
+        self._on_changed = on_changed
+        self._positions = {}
+        self._names = {}
+        self._tracks_by_name = {}
+        self._name_listeners = {}
+        
+        
+    def disconnect(self):
+        for track in self._name_listeners.keys():
+            self._remove_name_listener(track)
+        self._positions = {}
+        self._names = {}
+        self._tracks_by_name = {}
+        self._on_changed = None
+        self._parent = None
+        
+        
+    def update(self, tracks):
+        """ Updates the map for the given tuple of all tracks in track order, only adding/removing name listeners for 
+        tracks that were added/removed. """
+        self._positions = dict([(track, index) for index, track in enumerate(tracks)])
+        is_changed = False
+        for track in self._names.keys():
+            if not track in self._positions:
+                self._remove_name_listener(track)
+                self._remove_track(track)
+                is_changed = True
+        for track in tracks:
+            if not track in self._names:
+                self._name_listeners[track] = self._get_name_listener(track)
+                track.add_name_listener(self._name_listeners[track])
+                self._add_track(track)
+                is_changed = True
+        for name_tracks in self._tracks_by_name.values():
+            if len(name_tracks) > 1 and self._sort_tracks(name_tracks):
+                is_changed = True
+        if is_changed:
+            self._on_changed()
+            
+            
+    def get_key(self, track):
+        """ Returns the key to store settings of the given track under. """
+        name = self._names.get(track)
+        if name is None:
+            return track.name
+        index = self._tracks_by_name[name].index(track)
+        if index:
+            return name + DUPLICATE_NAME_SEPARATOR + str(index + 1)
+        return name
+    
+    
+    def get_track(self, key):
+        """ Returns the track that settings stored under the given key apply to or None if there is no such track. """
+        name = key
+        index = 0
+        if DUPLICATE_NAME_SEPARATOR in key:
+            name, occurrence = key.rsplit(DUPLICATE_NAME_SEPARATOR, 1)
+            try: index = int(occurrence) - 1
+            except: return None
+        tracks = self._tracks_by_name.get(name)
+        if tracks and 0 <= index < len(tracks):
+            return tracks[index]
+        return None
+    
+    
+    def _on_track_name_changed(self, track):
+        """ Moves the renamed track from its old name to its new name. """
+        if track in self._names:
+            self._remove_track(track)
+            self._add_track(track)
+            self._on_changed()
+            
+            
+    def _add_track(self, track):
+        """ Adds the given track under its name unless it's a ClyphX Snap control track. """
+        name = None
+        if not self._parent.get_name(track.name).startswith('CLYPHX SNAP'):
+            name = track.name
+            name_tracks = self._tracks_by_name.setdefault(name, [])
+            name_tracks.append(track)
+            if len(name_tracks) > 1:
+                self._sort_tracks(name_tracks)
+        self._names[track] = name
+        
+        
+    def _remove_track(self, track):
+        name = self._names.pop(track)
+        if name is not None:
+            name_tracks = self._tracks_by_name[name]
+            name_tracks.remove(track)
+            if not name_tracks:
+                del self._tracks_by_name[name]
+                
+                
+    def _sort_tracks(self, name_tracks):
+        """ Sorts the given tracks with the same name into track order and returns whether their order changed. """
+        sorted_tracks = sorted(name_tracks, key=self._positions.get)
+        if sorted_tracks != name_tracks:
+            name_tracks[:] = sorted_tracks
+            return True
+        return False
+    
+    
+    def _get_name_listener(self, track):
+        """ Returns a listener that notifies of name changes of the given track. """
+        def on_name_changed():
+            self._on_track_name_changed(track)
+        return on_name_changed
+    
+    
+    def _remove_name_listener(self, track):
+        listener = self._name_listeners.pop(track)
+        try:
+            if track.name_has_listener(listener):
+                track.remove_name_listener(listener)
+        except: pass
+        
+        
+# local variables:
+# tab-width: 4
@@ -0,0 +1,233 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_left, bisect_right, insort
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from consts import *
+
+""" The events of the song clock, listeners of position events are called in this order. """
+CLOCK_BAR = 0
+CLOCK_BEAT = 1
+CLOCK_SIXTEENTH = 2
+CLOCK_PLAYING = 3
+NUM_CLOCK_EVENTS = 4
+
+""" The distance (in beats) from the loop start and loop end within which a jump back is treated as the loop wrapping 
+around. """
+LOOP_WRAP_TOLERANCE = 1.0
+
+""" The next position time when there are no positions after the current song time. """
+NO_NEXT_POSITION = 1.0e300
+
+class ClyphXSongClock(ControlSurfaceComponent):
+    __module__ = __name__
+    __doc__ = ' Single song time listener that calls its listeners upon bar, beat and sixteenth changes and positions '
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._listeners = [[] for i in range(NUM_CLOCK_EVENTS)]
+        self._position_times = []
+        self._position_listeners = {}
+        self._next_position_time = NO_NEXT_POSITION
+        self._is_playing = self.song().is_playing
+        self._last_time = self.song().current_song_time
+        self._bar = -1
+        self._beat = -1
+        self._sixteenth = -1
+        self.song().add_current_song_time_listener(self._on_song_time_changed)
+        self.song().add_is_playing_listener(self._on_is_playing_changed)
+        
+        
+    def disconnect(self):
+        self.song().remove_current_song_time_listener(self._on_song_time_changed)
+        self.song().remove_is_playing_listener(self._on_is_playing_changed)
+        self._listeners = [[] for i in range(NUM_CLOCK_EVENTS)]
+        self._position_times = []
+        self._position_listeners = {}
+        self._next_position_time = NO_NEXT_POSITION
+        self._parent = None
+        if IS_LIVE_9:
+            ControlSurfaceComponent.disconnect(self)
+            
+            
+    def on_enabled_changed(self):
+        pass
+    
+    
+    def update(self):
+        pass
+    
+    
+    def add_listener(self, event, listener):
+        """ Adds a listener (without args) to call upon the given event.  Bar, beat and sixteenth listeners are only called 
+        while playing, playing listeners are called when playback starts and stops. """
+        if listener not in self._listeners[event]:
+            self._listeners[event].append(listener)
+            
+            
+    def remove_listener(self, event, listener):
+        if listener in self._listeners[event]:
+            self._listeners[event].remove(listener)
+            
+            
+    def add_position_listener(self, time, listener):
+        """ Adds a listener to call with the given song time (in beats) when playback passes it. """
+        if time not in self._position_listeners:
+            insort(self._position_times, time)
+            self._position_listeners[time] = []
+            self._seek_next_position(self._last_time)
+        if listener not in self._position_listeners[time]:
+            self._position_listeners[time].append(listener)
+            
+            
+    def remove_position_listener(self, time, listener):
+        listeners = self._position_listeners.get(time)
+        if listeners and listener in listeners:
+            listeners.remove(listener)
+            if not listeners:
+                del self._position_listeners[time]
+                self._position_times.remove(time)
+                self._seek_next_position(self._last_time)
+                
+                
+    def is_playing(self):
+        return self._is_playing
+    
+    
+    def get_bar(self):
+        """ Returns the index of the current bar (starting from 0). """
+        return self._bar
+    
+    
+    def get_beat(self):
+        """ Returns the index of the current beat within the current bar (starting from 0). """
+        return self._beat % max(1, self.song().signature_numerator)
+    
+    
+    def get_sixteenth(self):
+        """ Returns the index of the current sixteenth since the start of the song. """
+        return self._sixteenth
+    
+    
+    def _on_song_time_changed(self):
+        """ Determines which events occurred since the last song time change.  Beats and bars can only change along with 
+        sixteenths, so most changes only need to compare the current sixteenth.  Likewise, most changes only need to 
+        compare the time of the next position, which is only sought again upon passing it or jumping back.  If several 
+        positions were passed (upon jumping ahead), only the first is reported like X-Cues always were, so that jumping 
+        ahead doesn't trigger the action lists of all the X-Cues in between. """
+        time = self.song().current_song_time
+        last_time = self._last_time
+        self._last_time = time
+        if self._is_playing:
+            if time < last_time:
+                if self._position_times:
+                    self._check_positions_after_jump_back(last_time, time)
+            elif time >= self._next_position_time:
+                position = self._next_position_time
+                self._seek_next_position(time)
+                self._call_position_listeners(position)
+            self._update_position(time)
+        
+        
+    def _on_is_playing_changed(self):
+        """ Resets the position so that all position events occur upon starting playback, including a position that 
+        playback starts on. """
+        self._is_playing = self.song().is_playing
+        self._last_time = self.song().current_song_time
+        self._bar = -1
+        self._beat = -1
+        self._sixteenth = -1
+        for listener in self._listeners[CLOCK_PLAYING][:]:
+            listener()
+        if self._is_playing:
+            self._seek_next_position(self._last_time)
+            if self._last_time in self._position_listeners:
+                self._call_position_listeners(self._last_time)
+            self._update_position(self._last_time)
+            
+            
+    def _update_position(self, time):
+        """ Calls the listeners of the bar, beat and sixteenth events that occurred at the given time.  Beat lengths are 
+        based on the denominator of the time signature, so beats are eighths in 6/8 for example. """
+        sixteenth = int(time * 4.0)
+        if sixteenth != self._sixteenth:
+            self._sixteenth = sixteenth
+            beat = sixteenth * self.song().signature_denominator // 16
+            if beat != self._beat:
+                self._beat = beat
+                bar = beat // max(1, self.song().signature_numerator)
+                if bar != self._bar:
+                    self._bar = bar
+                    self._call_listeners(CLOCK_BAR)
+                self._call_listeners(CLOCK_BEAT)
+            self._call_listeners(CLOCK_SIXTEENTH)
+            
+            
+    def _call_listeners(self, event):
+        listeners = self._listeners[event]
+        if listeners:
+            for listener in listeners[:]:
+                listener()
+                
+                
+    def _seek_next_position(self, time):
+        """ Sets the time of the first position after the given time. """
+        index = bisect_right(self._position_times, time)
+        if index < len(self._position_times):
+            self._next_position_time = self._position_times[index]
+        else:
+            self._next_position_time = NO_NEXT_POSITION
+            
+            
+    def _check_positions_after_jump_back(self, last_time, time):
+        """ Calls the listeners of the first position from where playback jumped back to and up to the current time.  If the 
+        loop wrapped around, playback jumped back to the loop start, so a position at the loop start (or between it and the 
+        current time) is reported on each pass.  The first position between the last time and the loop end that playback 
+        didn't reach before wrapping around is reported as well. """
+        start = time
+        positions = []
+        song = self.song()
+        if song.loop:
+            loop_end = song.loop_start + song.loop_length
+            if song.loop_start <= time < song.loop_start + LOOP_WRAP_TOLERANCE and loop_end - LOOP_WRAP_TOLERANCE <= last_time:
+                start = song.loop_start
+                if self._next_position_time < loop_end:
+                    positions.append(self._next_position_time)
+        index = bisect_left(self._position_times, start)
+        if index < len(self._position_times) and self._position_times[index] <= time:
+            positions.append(self._position_times[index])
+        self._seek_next_position(time)
+        for position in positions:
+            if position in self._position_listeners:
+                self._call_position_listeners(position)
+            
+            
+    def _call_position_listeners(self, position):
+        for listener in self._position_listeners[position][:]:
+            listener(position)
+                
+                
+# local variables:
+# tab-width: 4
@@ -74,7 +74,7 @@ class ClyphXTrackActions(ControlSurfaceComponent):
     def create_clip(self, track, xclip, ident, args): 
 	""" Creates a clip in the given slot index (or sel if specified) at the given length (in beats). If no args, creates a 4 beat clip in the selected slot. """
 	if IS_LIVE_9 and track.has_midi_input:
-	    slot = list(self.song().scenes).index(self.song().view.selected_scene)
+	    slot = self._parent._scene_index.get_selected_index()
 	    length = 4
 	    if args:
 		arg_array = args.split()
@@ -102,7 +102,7 @@ class ClyphXTrackActions(ControlSurfaceComponent):
 	""" Set track's color """
 	if track in tuple(self.song().tracks) + tuple(self.song().return_tracks):
 	    color = xclip.color
-	    slot = list(self.song().scenes).index(self.song().view.selected_scene)
+	    slot = self._parent._scene_index.get_selected_index()
 	    if track.clip_slots[slot].has_clip:
 		color = track.clip_slots[slot].clip.color
 	    args = args.strip()
@@ -190,11 +190,11 @@ class ClyphXTrackActions(ControlSurfaceComponent):
 	if track in self.song().tracks:
 	    if args:
 		try:
-		    self.song().view.selected_scene = list(self.song().scenes)[int(args.strip())-1]
+		    self.song().view.selected_scene = self._parent._scene_index.get_scenes()[int(args.strip())-1]
 		except: pass
 	    else:
 		if track.playing_slot_index >= 0:
-		    self.song().view.selected_scene = list(self.song().scenes)[track.playing_slot_index]
+		    self.song().view.selected_scene = self._parent._scene_index.get_scenes()[track.playing_slot_index]
     
     
     def set_jump(self, track, xclip, ident, args): 
@@ -259,7 +259,7 @@ class ClyphXTrackActions(ControlSurfaceComponent):
 	slot_to_play = -1
 	if track in self.song().tracks:
 	    play_slot = track.playing_slot_index
-	    select_slot = list(self.song().scenes).index(self.song().view.selected_scene)
+	    select_slot = self._parent._scene_index.get_selected_index()
 	    if args == '':
 		if type(xclip) is Live.Clip.Clip:
 		    slot_to_play = xclip.canonical_parent.canonical_parent.playing_slot_index
@@ -309,11 +309,7 @@ class ClyphXTrackActions(ControlSurfaceComponent):
 		    slot_to_play = play_slot
 	    elif args.startswith('"') and args.endswith('"'):
 		clip_name = args.strip('"')
-		for index in range(len(track.clip_slots)):
-		    slot = track.clip_slots[index]
-		    if slot.has_clip and slot.clip.name.upper() == clip_name:
-			slot_to_play = index
-			break
+		slot_to_play = self._parent.get_clip_slot_index_by_name(track, clip_name)
 	    else:
 		try:
 		    if int(args) in range(len(self.song().scenes)):
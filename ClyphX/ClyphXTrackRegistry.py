@@ -0,0 +1,167 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import Live
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from consts import *
+
+class ClyphXTrackRegistry(ControlSurfaceComponent):
+    """ Keeps the ordered list of tracks that track specs refer to (regular tracks, then return tracks, then the master 
+    track) along with maps of track to index and upper-case name to indices. The list is rebuilt lazily after the track 
+    list changes, while renaming a track only moves that track's entry in the name map. """
+    __module__ = __name__
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._tracks = ()
+        self._num_regular_tracks = 0
+        self._index_by_track = {}
+        self._indices_by_name = {}
+        self._names = []
+        self._name_listeners = {}
+        self._is_dirty = True
+        self.song().add_tracks_listener(self._on_track_list_changed)
+        self.song().add_return_tracks_listener(self._on_track_list_changed)
+        
+        
+    def disconnect(self):
+        self.song().remove_tracks_listener(self._on_track_list_changed)
+        self.song().remove_return_tracks_listener(self._on_track_list_changed)
+        self._remove_name_listeners(self._name_listeners.keys())
+        self._tracks = ()
+        self._index_by_track = {}
+        self._indices_by_name = {}
+        self._names = []
+        self._parent = None
+        if IS_LIVE_9:
+            ControlSurfaceComponent.disconnect(self)
+            
+            
+    def on_enabled_changed(self):
+        pass
+    
+    
+    def update(self):
+        pass
+    
+    
+    def get_tracks(self):
+        """ Returns tuple of all tracks in the order that track specs refer to them. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._tracks
+    
+    
+    def get_num_regular_tracks(self):
+        """ Returns the number of regular (non-return, non-master) tracks. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._num_regular_tracks
+    
+    
+    def get_index(self, track):
+        """ Returns the index of the given track or -1 if it's not in the registry. """
+        if self._is_dirty:
+            self._rebuild()
+        return self._index_by_track.get(track, -1)
+    
+    
+    def get_index_by_name(self, *names):
+        """ Returns the lowest index of the tracks with any of the given upper-case names or -1 if there are none. """
+        if self._is_dirty:
+            self._rebuild()
+        result = -1
+        for name in names:
+            indices = self._indices_by_name.get(name)
+            if indices and (result == -1 or indices[0] < result):
+                result = indices[0]
+        return result
+    
+    
+    def _on_track_list_changed(self):
+        self._is_dirty = True
+        
+        
+    def _on_track_name_changed(self, track):
+        """ Moves the renamed track's index from its old name to its new name. """
+        if not self._is_dirty:
+            index = self._index_by_track.get(track, -1)
+            if index != -1:
+                self._remove_name_index(self._names[index], index)
+                self._names[index] = self._parent.get_name(track.name)
+                self._add_name_index(self._names[index], index)
+                
+                
+    def _rebuild(self):
+        """ Rebuilds the track list and maps, only adding/removing name listeners for tracks that were added/removed. """
+        self._tracks = tuple(self.song().tracks) + tuple(self.song().return_tracks) + (self.song().master_track,)
+        self._num_regular_tracks = len(self.song().tracks)
+        self._index_by_track = {}
+        self._indices_by_name = {}
+        self._names = []
+        for index, track in enumerate(self._tracks):
+            self._index_by_track[track] = index
+            self._names.append(self._parent.get_name(track.name))
+            self._add_name_index(self._names[index], index)
+        self._remove_name_listeners([t for t in self._name_listeners.keys() if not t in self._index_by_track])
+        for track in self._tracks:
+            if not track in self._name_listeners:
+                self._name_listeners[track] = self._get_name_listener(track)
+                track.add_name_listener(self._name_listeners[track])
+        self._is_dirty = False
+        
+        
+    def _get_name_listener(self, track):
+        """ Returns a listener that notifies of name changes of the given track. """
+        def on_name_changed():
+            self._on_track_name_changed(track)
+        return on_name_changed
+    
+    
+    def _add_name_index(self, name, index):
+        indices = self._indices_by_name.setdefault(name, [])
+        indices.append(index)
+        indices.sort()
+        
+        
+    def _remove_name_index(self, name, index):
+        indices = self._indices_by_name.get(name)
+        if indices and index in indices:
+            indices.remove(index)
+            if not indices:
+                del self._indices_by_name[name]
+                
+                
+    def _remove_name_listeners(self, tracks):
+        for track in tracks:
+            listener = self._name_listeners.pop(track)
+            try:
+                if track.name_has_listener(listener):
+                    track.remove_name_listener(listener)
+            except: pass
+            
+            
+# local variables:
+# tab-width: 4
@@ -25,9 +25,13 @@
 import Live
 from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
 from ActionList import ActionList
+from ClyphXClipSlotIndex import ClyphXClipSlotIndex
+from ClyphXHighResControls import HighResDecoder, HighResTarget, NRPN_CC_NUMS
 from consts import *
 if IS_LIVE_9:
     from functools import partial
+    
+MIDI_LOOKUP_SIZE = 256 * 128
 
 class ClyphXControlComponent(ControlSurfaceComponent):
     __module__ = __name__
@@ -37,11 +41,28 @@ class ClyphXControlComponent(ControlSurfaceComponent):
         ControlSurfaceComponent.__init__(self)
         self._parent = parent
 	self._control_list = {}
+	self._on_lookup = [None] * MIDI_LOOKUP_SIZE
+	self._off_lookup = [None] * MIDI_LOOKUP_SIZE
+	self._high_res_controls = {}
+	self._high_res_decoders = [None] * 16
 	self._xt_scripts = []
+	self._cc_coalescing_limit = 0
+	self._cc_trigger_counts = {}
+	self._pending_cc = {}
+	self._pending_cc_order = []
+	self._num_merged_cc_messages = 0
+	self._num_deferred_cc_messages = 0
 	
 	
     def disconnect(self):
+	if self._cc_coalescing_limit:
+	    self._unregister_timer_callback(self.on_timer)
+	self._pending_cc = {}
+	self._pending_cc_order = []
 	self._control_list = {}
+	self._on_lookup = []
+	self._off_lookup = []
+	self.clear_high_res_controls()
 	self._xt_scripts = []
 	self._parent = None
 	if IS_LIVE_9:
@@ -89,9 +110,18 @@ class ClyphXControlComponent(ControlSurfaceComponent):
 	for c, v in self._control_list.items():
 	    if ident == v['ident']:
 		new_actions = actions.split(',')
-		on_action = '[' + ident + '] ' + new_actions[0]
+		zones = self.get_zones(ident, new_actions)
+		v['zones'] = None
+		v['zone_actions'] = None
+		v['zone'] = -1
+		if zones:
+		    v['zones'] = zones[0]
+		    v['zone_actions'] = zones[1]
+		    on_action = zones[1][0]
+		else:
+		    on_action = '[' + ident + '] ' + new_actions[0]
 		off_action = None
-		if on_action and len(new_actions) > 1:
+		if on_action and len(new_actions) > 1 and not zones:
 		    if new_actions[1].strip() == '*':
 			off_action = on_action
 		    else:
@@ -99,36 +129,167 @@ class ClyphXControlComponent(ControlSurfaceComponent):
 		if on_action:
 		    v['on_action'] = on_action    
 		    v['off_action'] = off_action
+		    self.update_lookup(c)
 		break
+	if ident in self._high_res_controls:
+	    for t in self._high_res_controls[ident]['targets']:
+		t.disconnect()
+	    self._high_res_controls[ident]['targets'] = self.get_high_res_targets(actions)
 		
 	    
     def receive_midi(self, bytes):
 	""" Receive user-defined midi messages """
+	if 176 <= bytes[0] < 192 and self._high_res_decoders[bytes[0] - 176]:
+	    decoder = self._high_res_decoders[bytes[0] - 176]
+	    if decoder.handled_ccs[bytes[1]]:
+		ctrl_data = decoder.decode(bytes[1], bytes[2])
+		if ctrl_data:
+		    self.trigger_high_res_control(ctrl_data)
+		return
 	if self._control_list:
-	    ctrl_data = None
 	    if bytes[2] == 0 or bytes[0] < 144:
-		if (bytes[0], bytes[1]) in self._control_list.keys() and self._control_list[(bytes[0], bytes[1])]['off_action']:
-		    ctrl_data = self._control_list[(bytes[0], bytes[1])]
-		elif (bytes[0] + 16, bytes[1]) in self._control_list.keys() and self._control_list[(bytes[0] + 16, bytes[1])]['off_action']:
-		    ctrl_data = self._control_list[(bytes[0] + 16, bytes[1])]
+		ctrl_data = self._off_lookup[(bytes[0] << 7) + bytes[1]]
+		if ctrl_data:
+		    if ctrl_data['zones']:
+			self.trigger_zone(ctrl_data, 0)
+		    elif self._cc_coalescing_limit and ctrl_data['is_cc']:
+			self.coalesce_control(ctrl_data, ctrl_data['off_action'])
+		    else:
+			self.trigger_control(ctrl_data, ctrl_data['off_action'])
+	    else:
+		ctrl_data = self._on_lookup[(bytes[0] << 7) + bytes[1]]
 		if ctrl_data:
-		    ctrl_data['name'].name = ctrl_data['off_action']	
-	    elif bytes[2] != 0 and (bytes[0], bytes[1]) in self._control_list.keys():
-		ctrl_data = self._control_list[(bytes[0], bytes[1])]
-		ctrl_data['name'].name = ctrl_data['on_action']
-	    if ctrl_data:
-		self._parent.handle_action_list_trigger(self.song().view.selected_track, ctrl_data['name'])
+		    if ctrl_data['zones']:
+			self.trigger_zone(ctrl_data, bytes[2])
+		    elif self._cc_coalescing_limit and ctrl_data['is_cc']:
+			self.coalesce_control(ctrl_data, ctrl_data['on_action'])
+		    else:
+			self.trigger_control(ctrl_data, ctrl_data['on_action'])
+		    
+		    
+    def trigger_control(self, ctrl_data, action):
+	""" Triggers the given on or off action of the given control. """
+	ctrl_data['name'].name = action
+	self._parent.handle_action_list_trigger(self.song().view.selected_track, ctrl_data['name'])
+	
+	
+    def trigger_high_res_control(self, ctrl_data):
+	""" Sets the params of the given high-resolution control's targets from its 14-bit value. """
+	for t in ctrl_data['targets']:
+	    t.set_value(ctrl_data['value'])
+	if self._parent._is_debugging:
+	    self._parent.log_message('trigger_high_res_control triggered, ident=' + str(ctrl_data['ident']) + ' and value=' + str(ctrl_data['value']))
+	    
+	    
+    def trigger_zone(self, ctrl_data, value):
+	""" Triggers the action of the zone the given value is in if that's not the zone of the control's previous value. """
+	zone = ctrl_data['zones'][value]
+	if zone != ctrl_data['zone']:
+	    ctrl_data['zone'] = zone
+	    if zone != -1:
+		self.trigger_control(ctrl_data, ctrl_data['zone_actions'][zone])
+		
+		
+    def get_zones(self, ctrl_name, zone_data):
+	""" Compiles zone specs (like 0-31: SCENE 1) into a 128-entry list of zone indexes by value (-1 for values that 
+	aren't in any zone) and a list of the zones' action lists.  Returns None if zone_data isn't in zone format. """
+	zones = [-1] * 128
+	zone_actions = []
+	for z in zone_data:
+	    if not ':' in z:
+		return None
+	    range_data = z[0:z.index(':')].split('-')
+	    try:
+		zone_min = int(range_data[0].strip())
+		zone_max = int(range_data[-1].strip())
+	    except: return None
+	    if len(range_data) > 2 or not (0 <= zone_min <= zone_max <= 127):
+		return None
+	    for value in range(zone_min, zone_max + 1):
+		zones[value] = len(zone_actions)
+	    zone_actions.append('[' + ctrl_name + '] ' + z[z.index(':')+1:])
+	return (zones, zone_actions)
+    
+    
+    def coalesce_control(self, ctrl_data, action):
+	""" Triggers the given action of the given CC control unless it has already been triggered as many times as allowed 
+	in this timer tick.  In that case, the action replaces any action of the control that's pending for the next tick. """
+	ident = ctrl_data['ident']
+	num_triggered = self._cc_trigger_counts.get(ident, 0)
+	if num_triggered < self._cc_coalescing_limit:
+	    self._cc_trigger_counts[ident] = num_triggered + 1
+	    self.trigger_control(ctrl_data, action)
+	else:
+	    if ident in self._pending_cc:
+		self._num_merged_cc_messages += 1
+	    else:
+		self._pending_cc_order.append(ident)
+	    self._pending_cc[ident] = (ctrl_data, action)
+	    self._num_deferred_cc_messages += 1
+	    
+	    
+    def on_timer(self):
+	""" Resets trigger counts and triggers the latest pending action of each coalesced CC control. """
+	if self._cc_trigger_counts:
+	    self._cc_trigger_counts = {}
+	if self._pending_cc_order:
+	    pending = self._pending_cc
+	    pending_order = self._pending_cc_order
+	    self._pending_cc = {}
+	    self._pending_cc_order = []
+	    for ident in pending_order:
+		self._cc_trigger_counts[ident] = 1
+		self.trigger_control(pending[ident][0], pending[ident][1])
+	    if self._parent._is_debugging:
+		self._parent.log_message('X-Control CC coalescing: ' + self.get_cc_coalescing_stats())
+		
+		
+    def set_cc_coalescing_limit(self, limit):
+	""" Sets the number of times per timer tick that the action of each CC control can be triggered, further messages 
+	are coalesced so that only the latest one is triggered on the next tick.  0 turns coalescing off. """
+	if limit and not self._cc_coalescing_limit:
+	    self._register_timer_callback(self.on_timer)
+	elif not limit and self._cc_coalescing_limit:
+	    self._unregister_timer_callback(self.on_timer)
+	    self.on_timer()
+	self._cc_coalescing_limit = limit
+	
+	
+    def get_cc_coalescing_stats(self):
+	""" Returns string of the coalescing limit and the number of CC messages that were deferred to the next tick and 
+	merged (replaced by a later message before being triggered) for diagnostics. """
+	return 'limit=' + str(self._cc_coalescing_limit) + ' deferred=' + str(self._num_deferred_cc_messages) + ' merged=' + str(self._num_merged_cc_messages)
+	
+	
+    def update_lookup(self, key):
+	""" Updates the lookup entries for the control with the given (status, number) key.  The on entry is the control 
+	itself.  The off entry of a message is the control with the same status that has an off action (or zones) or else the 
+	control with the status 16 higher that does (so note offs map to note on controls). """
+	status, num = key
+	self._on_lookup[(status << 7) + num] = self._control_list.get(key)
+	for s in (status, status - 16):
+	    if s >= 0:
+		ctrl_data = None
+		for k in ((s, num), (s + 16, num)):
+		    if k in self._control_list and (self._control_list[k]['off_action'] or self._control_list[k]['zones']):
+			ctrl_data = self._control_list[k]
+			break
+		self._off_lookup[(s << 7) + num] = ctrl_data
 	    
 		
     def get_user_control_settings(self, data, midi_map_handle):
-	""" Receives control data from user settings file and builds control dictionary """
+	""" Receives control data from user settings file and builds control dictionary and lookups """
 	self._control_list = {}
+	self._on_lookup = [None] * MIDI_LOOKUP_SIZE
+	self._off_lookup = [None] * MIDI_LOOKUP_SIZE
+	self.clear_high_res_controls()
 	for d in data:
 	    status_byte = None
 	    channel = None
 	    ctrl_num = None
 	    on_action = None
 	    off_action = None
+	    zones = None
 	    d = d.split('=')
 	    ctrl_name = d[0].strip()
 	    new_ctrl_data = d[1].split(',')
@@ -137,19 +298,29 @@ class ClyphXControlComponent(ControlSurfaceComponent):
 		    status_byte = 144
 		elif new_ctrl_data[0].strip() == 'CC':
 		    status_byte = 176
+		elif new_ctrl_data[0].strip() in ('CC14', 'NRPN'):
+		    self.add_high_res_control(ctrl_name, new_ctrl_data, midi_map_handle)
 		if int(new_ctrl_data[1].strip()) in range(1,17):
 		    channel = int(new_ctrl_data[1].strip()) - 1
 		if int(new_ctrl_data[2].strip()) in range(128):
 		    ctrl_num = int(new_ctrl_data[2].strip())
-		on_action = '[' + ctrl_name + '] ' + new_ctrl_data[3]
-		if on_action and len(new_ctrl_data) > 4:
+		zones = self.get_zones(ctrl_name, new_ctrl_data[3:])
+		if zones:
+		    on_action = zones[1][0]
+		else:
+		    on_action = '[' + ctrl_name + '] ' + new_ctrl_data[3]
+		if on_action and len(new_ctrl_data) > 4 and not zones:
 		    if new_ctrl_data[4].strip() == '*':
 			off_action = on_action
 		    else:
 			off_action = '[' + ctrl_name + '] ' + new_ctrl_data[4]
 	    except: pass
 	    if status_byte and channel != None and ctrl_num != None and on_action:
-		self._control_list[(status_byte + channel, ctrl_num)] = {'ident' : ctrl_name, 'on_action' : on_action, 'off_action' : off_action, 'name' : ActionList(on_action)}
+		self._control_list[(status_byte + channel, ctrl_num)] = {'ident' : ctrl_name, 'on_action' : on_action, 'off_action' : off_action, 'name' : ActionList(on_action), 'is_cc' : status_byte == 176, 'zones' : None, 'zone_actions' : None, 'zone' : -1}
+		if zones:
+		    self._control_list[(status_byte + channel, ctrl_num)]['zones'] = zones[0]
+		    self._control_list[(status_byte + channel, ctrl_num)]['zone_actions'] = zones[1]
+		self.update_lookup((status_byte + channel, ctrl_num))
 		if status_byte == 144:
 		    Live.MidiMap.forward_midi_note(self._parent._c_instance.handle(), midi_map_handle, channel, ctrl_num)
 		else:
@@ -163,7 +334,120 @@ class ClyphXControlComponent(ControlSurfaceComponent):
 		Live.MidiMap.forward_midi_cc(self._parent._c_instance.handle(), midi_map_handle, key[0] - 176, key[1])
 	    else:
 		Live.MidiMap.forward_midi_note(self._parent._c_instance.handle(), midi_map_handle, key[0] - 144, key[1])
+	for ctrl_data in self._high_res_controls.values():
+	    self.forward_high_res_control(ctrl_data, midi_map_handle)
+	    
+	    
+    def add_high_res_control(self, ctrl_name, ctrl_data, midi_map_handle):
+	""" Adds a 14-bit CC (CC14 with the MSB's CC number in the range of 0-31) or NRPN (with the parameter number in 
+	the range of 0-16383) control from the given user settings data and adds it to the decoder of its channel. """
+	kind = ctrl_data[0].strip()
+	channel = int(ctrl_data[1].strip()) - 1
+	num = int(ctrl_data[2].strip())
+	if channel in range(16) and ((kind == 'CC14' and num in range(32)) or (kind == 'NRPN' and num in range(16384))):
+	    new_ctrl = {'ident' : ctrl_name, 'kind' : kind, 'channel' : channel, 'num' : num, 'targets' : self.get_high_res_targets(ctrl_data[3]), 'value' : 0}
+	    self._high_res_controls[ctrl_name] = new_ctrl
+	    if not self._high_res_decoders[channel]:
+		self._high_res_decoders[channel] = HighResDecoder()
+	    if kind == 'CC14':
+		self._high_res_decoders[channel].add_cc14_control(num, new_ctrl)
+	    else:
+		self._high_res_decoders[channel].add_nrpn_control(num, new_ctrl)
+	    self.forward_high_res_control(new_ctrl, midi_map_handle)
+	    
+	    
+    def get_high_res_targets(self, actions):
+	""" Returns the list of valid param targets compiled from the given action list. """
+	targets = []
+	for a in actions.split(';'):
+	    target = HighResTarget(self._parent, a)
+	    if target.is_valid:
+		targets.append(target)
+	return targets
+    
     
+    def forward_high_res_control(self, ctrl_data, midi_map_handle):
+	""" Forwards the CCs the given high-resolution control is made up of. """
+	if ctrl_data['kind'] == 'CC14':
+	    nums = (ctrl_data['num'], ctrl_data['num'] + 32)
+	else:
+	    nums = NRPN_CC_NUMS
+	for num in nums:
+	    Live.MidiMap.forward_midi_cc(self._parent._c_instance.handle(), midi_map_handle, ctrl_data['channel'], num)
+	    
+	    
+    def clear_high_res_controls(self):
+	for ctrl_data in self._high_res_controls.values():
+	    for t in ctrl_data['targets']:
+		t.disconnect()
+	self._high_res_controls = {}
+	self._high_res_decoders = [None] * 16
+    
+	
+class ClyphXTriggerScheduler(ControlSurfaceComponent):
+    __module__ = __name__
+    __doc__ = ' Single timer that passes triggered clips of track components to the main script '
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+	self._orders = {}
+	self._pending = {}
+	self._register_timer_callback(self.on_timer)
+	
+	
+    def disconnect(self):
+	self._unregister_timer_callback(self.on_timer)
+	self._orders = {}
+	self._pending = {}
+	self._parent = None
+	if IS_LIVE_9:
+	    ControlSurfaceComponent.disconnect(self)
+	
+	
+    def on_enabled_changed(self):
+	pass
+        
+
+    def update(self):    
+        pass
+    
+    
+    def register(self, component):
+	""" Registers a track component.  Components are processed in the order they were registered in, which is the order 
+	their timers were previously called in. """
+	self._orders[component] = len(self._orders)
+	
+	
+    def unregister(self, component):
+	if component in self._pending:
+	    del self._pending[component]
+	if component in self._orders:
+	    del self._orders[component]
+	    
+	    
+    def add_pending(self, component):
+	""" Called by track components when they have triggered clips to process. """
+	if component in self._orders:
+	    self._pending[component] = self._orders[component]
+	    
+	    
+    def on_timer(self):
+	""" Processes pending track components in order.  Components that become pending during this while they have 
+	not been processed yet are processed too, whereas those that were processed or that are still waiting to be 
+	processed (on muted tracks) are processed on the next call. """
+	last_order = -1
+	while self._pending:
+	    component = None
+	    for c, order in self._pending.items():
+		if order > last_order and (component == None or order < self._pending[component]):
+		    component = c
+	    if component == None:
+		break
+	    last_order = self._pending.pop(component)
+	    if component.process_triggers():
+		self._pending[component] = last_order
+	
 	
 class ClyphXTrackComponent(ControlSurfaceComponent):
     __module__ = __name__
@@ -176,15 +460,20 @@ class ClyphXTrackComponent(ControlSurfaceComponent):
 	self._clip = None  
 	self._loop_count = 0  
 	self._track.add_playing_slot_index_listener(self.play_slot_index_changed)
-	self._register_timer_callback(self.on_timer)
+	self._scheduler = parent._trigger_scheduler
+	self._scheduler.register(self)
 	self._last_slot_index = -1
 	self._triggered_clips = []
 	self._triggered_lseq_clip = None
+	self._clip_slot_index = ClyphXClipSlotIndex(track)
 	
 	
     def disconnect(self):
 	self.remove_loop_jump_listener()
-	self._unregister_timer_callback(self.on_timer)
+	self._clip_slot_index.disconnect()
+	self._clip_slot_index = None
+	self._scheduler.unregister(self)
+	self._scheduler = None
 	if self._track and self._track.playing_slot_index_has_listener(self.play_slot_index_changed):
 	    self._track.remove_playing_slot_index_listener(self.play_slot_index_changed)
 	self._track = None
@@ -218,20 +507,26 @@ class ClyphXTrackComponent(ControlSurfaceComponent):
 	    self._triggered_clips.append(new_clip)
 	elif prev_clip:
 	    self._triggered_clips.append(prev_clip)
+	if self._triggered_clips:
+	    self._scheduler.add_pending(self)
 	self._clip = new_clip
 	if self._clip and '(LSEQ)' in self._clip.name.upper() and not self._clip.loop_jump_has_listener(self.on_loop_jump):
 	    self._clip.add_loop_jump_listener(self.on_loop_jump)
 	  	
 	
+    def get_clip_slot_index_by_name(self, name):
+	""" Returns the index of the first slot containing a clip with the given upper-case name or -1 if there is none. """
+	return self._clip_slot_index.get_slot_index_by_name(name)
+    
+    
     def get_xclip(self, slot_index):
-	""" Get the xclip associated with slot_index or None. """
+	""" Get the xclip associated with slot_index or None.  Slots that don't hold X-Clips are skipped via the clip slot 
+	index without accessing the slot. """
 	clip = None
-	if self._track and slot_index >= 0:
+	if self._track and slot_index >= 0 and self._clip_slot_index.is_xclip_slot(slot_index):
 	    slot = self._track.clip_slots[slot_index]
 	    if slot.has_clip and not slot.clip.is_recording and not slot.clip.is_triggered:
-		clip_name = slot.clip.name
-		if len(clip_name) > 2 and clip_name[0] == '[' and ']' in clip_name:
-		    clip = slot.clip
+		clip = slot.clip
 	return clip
 
     
@@ -240,10 +535,12 @@ class ClyphXTrackComponent(ControlSurfaceComponent):
 	self._loop_count += 1
 	if self._clip:
 	    self._triggered_lseq_clip = self._clip
+	    self._scheduler.add_pending(self)
     
     
-    def on_timer(self):
-	""" Continuous timer, calls main script if there are any triggered clips. """
+    def process_triggers(self):
+	""" Called by the trigger scheduler, calls main script if there are any triggered clips.  Returns whether there are 
+	triggered clips that should be kept until the track is unmuted. """
 	if self._track and (not self._track.mute or self._parent._process_xclips_if_track_muted):
 	    if self._triggered_clips:
 		for clip in self._triggered_clips:
@@ -252,6 +549,8 @@ class ClyphXTrackComponent(ControlSurfaceComponent):
 	    if self._triggered_lseq_clip:
 		self._parent.handle_loop_seq_action_list(self._triggered_lseq_clip, self._loop_count)
 		self._triggered_lseq_clip = None
+	    return False
+	return self._track != None and (len(self._triggered_clips) > 0 or self._triggered_lseq_clip != None)
 	    
 
     def remove_loop_jump_listener(self):
@@ -267,22 +566,19 @@ class ClyphXCueComponent(ControlSurfaceComponent):
     def __init__(self, parent):
         ControlSurfaceComponent.__init__(self)
         self._parent = parent
-	self.song().add_current_song_time_listener(self.arrange_time_changed)
-	self.song().add_is_playing_listener(self.arrange_time_changed)
+	self._clock = parent._song_clock
 	self.song().add_cue_points_listener(self.cue_points_changed)
 	self._x_points = {}
-	self._x_point_time_to_watch_for = -1
-	self._last_arrange_position = -1
-	self._sorted_times = []
+	self._x_point_times = {}
+	self._cue_point_listeners = {}
 	self.cue_points_changed()
 	
 	
     def disconnect(self):
 	self.remove_cue_point_listeners()
-	self.song().remove_current_song_time_listener(self.arrange_time_changed)
-	self.song().remove_is_playing_listener(self.arrange_time_changed)
 	self.song().remove_cue_points_listener(self.cue_points_changed)
 	self._x_points = {}
+	self._clock = None
 	self._parent = None
 	if IS_LIVE_9:
 	    ControlSurfaceComponent.disconnect(self)
@@ -297,61 +593,93 @@ class ClyphXCueComponent(ControlSurfaceComponent):
     	
 	    
     def cue_points_changed(self):
-	""" Called on cue point changes to set up points to watch, cue points can't be named via the API so cue points can't perform any actions requiring naming """
-	self.remove_cue_point_listeners()
-	self._sorted_times = []
+	""" Called on cue point list changes to set up points to watch, only cue points that were added or removed have their 
+	listeners added or removed.  Cue points can't be named via the API so cue points can't perform any actions requiring 
+	naming """
+	cue_points = {}
 	for cp in self.song().cue_points:
-	    if not cp.time_has_listener(self.cue_points_changed):
-		cp.add_time_listener(self.cue_points_changed)
-	    if not cp.name_has_listener(self.cue_points_changed):
-		cp.add_name_listener(self.cue_points_changed)
-	    name = self._parent.get_name(cp.name)
-	    if len(name) > 2 and name[0] == '[' and name.count('[') == 1 and name.count(']') == 1:
-		cue_name = name.replace(name[name.index('['):name.index(']')+1].strip(), '')
-		self._x_points[cp.time] = cp
-	self._sorted_times = sorted(self._x_points.keys())
-	self.set_x_point_time_to_watch()
-
+	    cue_points[cp] = True
+	for cp in self._cue_point_listeners.keys():
+	    if not cp in cue_points:
+		self.remove_cue_point_listener(cp)
+		self.remove_x_point(cp)
+	for cp in cue_points.keys():
+	    if not cp in self._cue_point_listeners:
+		listener = lambda cp = cp:self.cue_point_changed(cp)
+		self._cue_point_listeners[cp] = listener
+		cp.add_time_listener(listener)
+		cp.add_name_listener(listener)
+		self.add_x_point(cp)
 	
-    def arrange_time_changed(self):
-	""" Called on arrange time changed and schedules actions where necessary """
-	if self.song().is_playing:
-	    if self._x_point_time_to_watch_for != -1 and self._last_arrange_position < self.song().current_song_time:
-		if self.song().current_song_time >= self._x_point_time_to_watch_for and self._x_point_time_to_watch_for < self._last_arrange_position:
-		    if IS_LIVE_9:
-			self._parent.schedule_message(1, partial(self.schedule_x_point_action_list, self._x_point_time_to_watch_for))
-		    else:
-			self._parent.schedule_message(1, self.schedule_x_point_action_list, self._x_point_time_to_watch_for)
-		    self._x_point_time_to_watch_for = -1
+	
+    def cue_point_changed(self, cp):
+	""" Called on cue point time or name changes to update the points to watch """
+	self.remove_x_point(cp)
+	self.add_x_point(cp)
+	
+	
+    def add_x_point(self, cp):
+	""" Adds the given cue point to the song clock's positions to watch if it's an X-Cue """
+	name = self._parent.get_name(cp.name)
+	if len(name) > 2 and name[0] == '[' and name.count('[') == 1 and name.count(']') == 1:
+	    time = cp.time
+	    self._x_point_times[cp] = time
+	    if time in self._x_points:
+		self._x_points[time] = self.get_x_point_at(time)
 	    else:
-		self.set_x_point_time_to_watch()
-	self._last_arrange_position = self.song().current_song_time
+		self._x_points[time] = cp
+		self._clock.add_position_listener(time, self.x_point_reached)
 	    
 	    
-    def set_x_point_time_to_watch(self):
-	""" Determine which cue point time to watch for next """
-	if self._x_points:
-	    if self.song().is_playing:
-		for t in self._sorted_times:
-		    if t >= self.song().current_song_time:
-			self._x_point_time_to_watch_for = t
-			break
+    def remove_x_point(self, cp):
+	""" Removes the given cue point from the positions to watch, another X-Cue at the same time takes its place """
+	if cp in self._x_point_times:
+	    time = self._x_point_times.pop(cp)
+	    if time in self._x_point_times.values():
+		self._x_points[time] = self.get_x_point_at(time)
 	    else:
-		self._x_point_time_to_watch_for = -1
+		del self._x_points[time]
+		self._clock.remove_position_listener(time, self.x_point_reached)
 		
 		
+    def get_x_point_at(self, time):
+	""" Returns the X-Cue at the given time that comes last in the song's cue points (which takes precedence) """
+	x_point = None
+	for cp in self.song().cue_points:
+	    if self._x_point_times.get(cp) == time:
+		x_point = cp
+	return x_point
+		    
+		    
+    def x_point_reached(self, time):
+	""" Called by the song clock when playback passes the time of an X-Cue and schedules its actions """
+	if IS_LIVE_9:
+	    self._parent.schedule_message(1, partial(self.schedule_x_point_action_list, time))
+	else:
+	    self._parent.schedule_message(1, self.schedule_x_point_action_list, time)
+	    
+	    
     def schedule_x_point_action_list(self, point):
 	self._parent.handle_action_list_trigger(self.song().view.selected_track, self._x_points[point])
 	    
+	    
+    def remove_cue_point_listener(self, cp):
+	listener = self._cue_point_listeners.pop(cp)
+	try:
+	    if cp.time_has_listener(listener):
+		cp.remove_time_listener(listener)
+	    if cp.name_has_listener(listener):
+		cp.remove_name_listener(listener)
+	except: pass
+	    
     
     def remove_cue_point_listeners(self):
-	for cp in self.song().cue_points:
-	    if cp.time_has_listener(self.cue_points_changed):
-		cp.remove_time_listener(self.cue_points_changed)
-	    if cp.name_has_listener(self.cue_points_changed):
-		cp.remove_name_listener(self.cue_points_changed)
+	for cp in self._cue_point_listeners.keys():
+	    self.remove_cue_point_listener(cp)
+	for time in self._x_points.keys():
+	    self._clock.remove_position_listener(time, self.x_point_reached)
 	self._x_points = {}
-	self._x_point_time_to_watch_for = -1
+	self._x_point_times = {}
 	
     
 # local variables:
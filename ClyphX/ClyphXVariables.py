@@ -0,0 +1,125 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import re
+
+MAX_CACHED_TEMPLATES = 2048
+SLOT_MARKER = '\x01'
+SLOT_AFTER_OLD_STYLE_VAR = re.compile('\\$\\S*' + SLOT_MARKER)
+
+class ClyphXVariableTemplates(object):
+    """ Compiles strings containing user variables (%name% or old-style $name) into templates made up of literal and 
+    slot segments so that replacing variables is a single format operation against the variable dict. Templates are 
+    cached by the string they were compiled from. """
+    
+    def __init__(self):
+        self._templates = {}
+        
+        
+    def disconnect(self):
+        self._templates = {}
+        
+        
+    def render(self, string_with_vars, variables):
+        """ Returns the given string with any user variables replaced with their values (or 0 if not found). """
+        if not '%' in string_with_vars and not '$' in string_with_vars:
+            return string_with_vars
+        template = self.get_template(string_with_vars)
+        if template[2]:
+            return self._substitute(string_with_vars, lambda name: str(variables.get(name, '0')))
+        if not template[1]:
+            return template[0]
+        return template[0] % tuple([variables.get(name, '0') for name in template[1]])
+    
+    
+    def get_variable_names(self, string_with_vars):
+        """ Returns the names of the variables referenced in the given string. """
+        if not '%' in string_with_vars and not '$' in string_with_vars:
+            return ()
+        return self.get_template(string_with_vars)[1]
+    
+    
+    def is_dynamic(self, string_with_vars):
+        """ Returns whether the variables referenced in the given string depend on the values of other variables. """
+        if not '%' in string_with_vars and not '$' in string_with_vars:
+            return False
+        return self.get_template(string_with_vars)[2]
+    
+    
+    def get_template(self, string_with_vars):
+        """ Returns the (format string, variable names, is dynamic) template for the given string, compiling it if necessary. 
+        Dynamic templates are those whose old-style variables depend on the values of other variables, these are 
+        substituted each time they're rendered. """
+        template = self._templates.get(string_with_vars)
+        if template is None:
+            if len(self._templates) >= MAX_CACHED_TEMPLATES:
+                self._templates = {}
+            template = self._compile(string_with_vars)
+            self._templates[string_with_vars] = template
+        return template
+    
+    
+    def _compile(self, string_with_vars):
+        """ Substitutes a marker for each variable and then splits the result into literal and slot segments. """
+        if SLOT_MARKER in string_with_vars:
+            return (string_with_vars, (), True)
+        names = []
+        def get_slot(var_name):
+            names.append(var_name)
+            return SLOT_MARKER + str(len(names) - 1) + SLOT_MARKER
+        substituted = self._substitute(string_with_vars, get_slot, True)
+        if substituted is None:
+            return (string_with_vars, tuple(names), True)
+        segments = substituted.split(SLOT_MARKER)
+        slot_names = tuple([names[int(index)] for index in segments[1::2]])
+        if not slot_names:
+            return (substituted, slot_names, False)
+        return ('%s'.join([segment.replace('%', '%%') for segment in segments[0::2]]), slot_names, False)
+    
+    
+    def _substitute(self, string_with_vars, get_value, is_compiling=False):
+        """ Replaces variables in the given string with the results of get_value. Returns None if compiling and an old-style 
+        variable name would depend on the value of another variable. """
+        while '%' in string_with_vars:
+            var_name = string_with_vars[string_with_vars.index('%')+1:]
+            if '%' in var_name:
+                var_name = var_name[0:var_name.index('%')]
+                string_with_vars = string_with_vars.replace('%' + var_name + '%', get_value(var_name), 1)  
+            else:
+                string_with_vars = string_with_vars.replace('%', '', 1)
+        if '$' in string_with_vars: # For compat with old-style variables
+            for string in string_with_vars.split():
+                if is_compiling and '$' in string and SLOT_MARKER in string:
+                    return None
+                if '$' in string and not '=' in string:
+                    var_name = string.replace('$', '')
+                    if '$' + var_name in string_with_vars:
+                        string_with_vars = string_with_vars.replace('$' + var_name, get_value(var_name), 1)  
+                        if is_compiling and SLOT_AFTER_OLD_STYLE_VAR.search(string_with_vars):
+                            return None
+        return string_with_vars
+    
+    
+# local variables:
+# tab-width: 4
@@ -0,0 +1,169 @@
+"""
+# Copyright (C) 2013-2015 Stray <stray411@hotmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# For questions regarding this module contact
+# Stray <stray411@hotmail.com>
+"""
+
+# emacs-mode: -*- python-*-
+# -*- coding: utf-8 -*-
+
+import time
+from collections import deque
+from _Framework.ControlSurfaceComponent import ControlSurfaceComponent
+from consts import *
+
+""" Priorities of parameter writes, queued writes with a lower number are made first. """
+WRITE_PRIORITY_HIGH = 0
+WRITE_PRIORITY_NORMAL = 1
+NUM_WRITE_PRIORITIES = 2
+
+class ClyphXWriteScheduler(ControlSurfaceComponent):
+    __module__ = __name__
+    __doc__ = ' Limits the number of bulk parameter writes (and the time spent on them) per timer tick '
+    
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._max_writes = 0
+        self._max_time = 0.0
+        self._num_writes = 0
+        self._tick_start = 0.0
+        self._pending = {}
+        self._queues = [deque() for i in range(NUM_WRITE_PRIORITIES)]
+        self._max_queue_depth = 0
+        self._num_queued = 0
+        self._num_collapsed = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        
+        
+    def disconnect(self):
+        if self.is_budgeted():
+            self._unregister_timer_callback(self.on_timer)
+        self._pending = {}
+        self._queues = []
+        self._parent = None
+        if IS_LIVE_9:
+            ControlSurfaceComponent.disconnect(self)
+            
+            
+    def on_enabled_changed(self):
+        pass
+    
+    
+    def update(self):    
+        pass
+    
+    
+    def is_budgeted(self):
+        """ Returns whether writes are limited per timer tick. """
+        return bool(self._max_writes or self._max_time)
+    
+    
+    def set_budget(self, max_writes, max_time_ms):
+        """ Sets the number of writes and the number of milliseconds that can be spent on writes per timer tick.  Writes 
+        exceeding the budget are queued for the following ticks.  0 for both turns the budget off, so all writes are made 
+        immediately. """
+        was_budgeted = self.is_budgeted()
+        self._max_writes = max_writes
+        self._max_time = max_time_ms / 1000.0
+        self._num_writes = 0
+        if self.is_budgeted() and not was_budgeted:
+            self._register_timer_callback(self.on_timer)
+        elif was_budgeted and not self.is_budgeted():
+            self._unregister_timer_callback(self.on_timer)
+            self._drain()
+            
+            
+    def write(self, param, value, priority=WRITE_PRIORITY_NORMAL):
+        """ Writes the given value to the given param if the budget of the current tick allows for it, otherwise queues 
+        the write with the given priority.  If a write to the param is already queued, only its value (and priority if 
+        higher) is updated. """
+        entry = self._pending.get(param)
+        if entry:
+            entry[1] = value
+            self._num_collapsed += 1
+            if priority < entry[0]:
+                entry[0] = priority
+                self._queues[priority].append(param)
+        elif not self._pending and self._has_budget_left():
+            self._write(param, value)
+        else:
+            self._pending[param] = [priority, value, time.time()]
+            self._queues[priority].append(param)
+            self._num_queued += 1
+            if len(self._pending) > self._max_queue_depth:
+                self._max_queue_depth = len(self._pending)
+                
+                
+    def on_timer(self):
+        """ Resets the budget for the new tick and makes as many of the queued writes as it allows for. """
+        self._num_writes = 0
+        if self._pending:
+            self._drain()
+            if not self._pending and self._parent._is_debugging:
+                self._parent.log_message('Parameter write scheduler: ' + self.get_stats())
+                
+                
+    def get_stats(self):
+        """ Returns string of the budget, the current and max queue depth, the number of queued and collapsed writes and 
+        the average and max latency of queued writes for diagnostics. """
+        avg_latency = 0.0
+        num_drained = self._num_queued - len(self._pending)
+        if num_drained:
+            avg_latency = self._total_latency / num_drained
+        return ('budget=' + str(self._max_writes) + '/' + str(int(self._max_time * 1000)) + 'ms queue=' + str(len(self._pending)) 
+                + ' max_queue=' + str(self._max_queue_depth) + ' queued=' + str(self._num_queued) + ' collapsed=' 
+                + str(self._num_collapsed) + ' latency_avg=' + str(int(avg_latency * 1000)) + 'ms latency_max=' 
+                + str(int(self._max_latency * 1000)) + 'ms')
+    
+    
+    def _has_budget_left(self):
+        if self._max_writes and self._num_writes >= self._max_writes:
+            return False
+        if self._max_time and self._num_writes and time.time() - self._tick_start >= self._max_time:
+            return False
+        return True
+    
+    
+    def _write(self, param, value):
+        if self.is_budgeted():
+            if self._max_time and not self._num_writes:
+                self._tick_start = time.time()
+            self._num_writes += 1
+        param.value = value
+        
+        
+    def _drain(self):
+        """ Makes queued writes in order of priority while the budget allows for it.  Queue entries of params whose write 
+        was moved to a higher priority or was already made are skipped. """
+        for priority, queue in enumerate(self._queues):
+            while queue and self._has_budget_left():
+                param = queue.popleft()
+                entry = self._pending.get(param)
+                if entry and entry[0] == priority:
+                    del self._pending[param]
+                    latency = time.time() - entry[2]
+                    self._total_latency += latency
+                    self._max_latency = max(self._max_latency, latency)
+                    try: self._write(param, entry[1])
+                    except: pass
+                    
+                    
+# local variables:
+# tab-width: 4
@@ -94,7 +94,7 @@ class ExtraPrefs(ControlSurfaceComponent):
 	    tracks = list(tuple(self.song().visible_tracks) + tuple(self.song().return_tracks))
 	    tracks.append(self.song().master_track)
 	    if self.song().view.selected_track in tracks:
-		self._parent._set_session_highlight(tracks.index(self.song().view.selected_track), list(self.song().scenes).index(self.song().view.selected_scene), 1, 1, True)
+		self._parent._set_session_highlight(tracks.index(self.song().view.selected_track), self._parent._scene_index.get_selected_index(), 1, 1, True)
 	else:
 	    self._parent._set_session_highlight(-1, -1, -1, -1, False)
         if self._exclusive_arm and track != self._last_track:
@@ -112,7 +112,7 @@ class MacrobatRnRRack(ControlSurfaceComponent):
 		for d in self._devices_to_operate_on:
 		    for p in d.parameters:
 			if p.is_enabled and not p.is_quantized and p.name != 'Chain Selector':
-			    p.value = (((p.max - p.min) / 127) * Live.Application.get_random_int(0, 128)) + p.min
+			    self._parent.write_parameter(p, (((p.max - p.min) / 127) * Live.Application.get_random_int(0, 128)) + p.min)
 			    
 			    
     def do_device_reset(self, params):
@@ -124,7 +124,7 @@ class MacrobatRnRRack(ControlSurfaceComponent):
 		for d in self._devices_to_operate_on:
 		    for p in d.parameters:
 			if p and p.is_enabled and not p.is_quantized and p.name != 'Chain Selector':
-			    p.value = p.default_value
+			    self._parent.write_parameter(p, p.default_value)
 			    
 		
     def get_devices_to_operate_on(self, dev_list, devices_to_get):
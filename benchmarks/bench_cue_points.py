@@ -0,0 +1,192 @@
+"""
+Cost of X-Cue handling with 500 locators and continuous playback: the cue
+component before it seeked with bisect (linear scans and rebuilding all cue
+point listeners on every change) compared to ClyphXCueComponent on the song
+clock.  Measures the song time update that playback causes and a rename of a
+single locator.
+
+    python2 benchmarks/bench_cue_points.py
+"""
+
+from functools import partial
+import stubs
+from stubs import ControlSurfaceComponent, StubObject
+from ClyphXSongClock import ClyphXSongClock
+from ClyphXTriggers import ClyphXCueComponent
+
+NUM_LOCATORS = 500
+BEATS_BETWEEN_LOCATORS = 4.0
+""" Song time advanced per song time update, roughly a 60 ms update at 120 BPM. """
+TIME_STEP = 0.12
+RENAMES = 200
+RUNS = 3
+
+
+class OldCueComponent(ControlSurfaceComponent):
+    """ ClyphXCueComponent before it seeked with bisect. """
+
+    def __init__(self, parent):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self.song().add_current_song_time_listener(self.arrange_time_changed)
+        self.song().add_is_playing_listener(self.arrange_time_changed)
+        self.song().add_cue_points_listener(self.cue_points_changed)
+        self._x_points = {}
+        self._x_point_time_to_watch_for = -1
+        self._last_arrange_position = -1
+        self._sorted_times = []
+        self.cue_points_changed()
+
+    def cue_points_changed(self):
+        self.remove_cue_point_listeners()
+        self._sorted_times = []
+        for cp in self.song().cue_points:
+            if not cp.time_has_listener(self.cue_points_changed):
+                cp.add_time_listener(self.cue_points_changed)
+            if not cp.name_has_listener(self.cue_points_changed):
+                cp.add_name_listener(self.cue_points_changed)
+            name = self._parent.get_name(cp.name)
+            if len(name) > 2 and name[0] == '[' and name.count('[') == 1 and name.count(']') == 1:
+                self._x_points[cp.time] = cp
+        self._sorted_times = sorted(self._x_points.keys())
+        self.set_x_point_time_to_watch()
+
+    def arrange_time_changed(self):
+        if self.song().is_playing:
+            if self._x_point_time_to_watch_for != -1 and self._last_arrange_position < self.song().current_song_time:
+                if self.song().current_song_time >= self._x_point_time_to_watch_for and self._x_point_time_to_watch_for < self._last_arrange_position:
+                    self._parent.schedule_message(1, partial(self.schedule_x_point_action_list, self._x_point_time_to_watch_for))
+                    self._x_point_time_to_watch_for = -1
+            else:
+                self.set_x_point_time_to_watch()
+        self._last_arrange_position = self.song().current_song_time
+
+    def set_x_point_time_to_watch(self):
+        if self._x_points:
+            if self.song().is_playing:
+                for t in self._sorted_times:
+                    if t >= self.song().current_song_time:
+                        self._x_point_time_to_watch_for = t
+                        break
+            else:
+                self._x_point_time_to_watch_for = -1
+
+    def schedule_x_point_action_list(self, point):
+        self._parent.handle_action_list_trigger(self.song().view.selected_track, self._x_points[point])
+
+    def remove_cue_point_listeners(self):
+        for cp in self.song().cue_points:
+            if cp.time_has_listener(self.cue_points_changed):
+                cp.remove_time_listener(self.cue_points_changed)
+            if cp.name_has_listener(self.cue_points_changed):
+                cp.remove_name_listener(self.cue_points_changed)
+        self._x_points = {}
+        self._x_point_time_to_watch_for = -1
+
+
+class StubScript(object):
+
+    def __init__(self):
+        self.num_triggered = 0
+        self.triggered = []
+        self._song_clock = None
+
+    def get_name(self, name):
+        return str(name).upper()
+
+    def schedule_message(self, delay, callback, *args):
+        callback(*args)
+
+    def handle_action_list_trigger(self, track, xtrigger):
+        self.num_triggered += 1
+        self.triggered.append(xtrigger.name)
+
+
+def make_song_with_locators():
+    song = stubs.make_song(8)
+    song.cue_points = [StubObject(name='[X%d] METRO' % index, time=index * BEATS_BETWEEN_LOCATORS)
+                       for index in range(NUM_LOCATORS)]
+    return song
+
+
+def play(song):
+    """ Plays through all locators and returns the average time per song time update in microseconds. """
+    song.current_song_time = 0.0
+    song.is_playing = True
+    end_time = NUM_LOCATORS * BEATS_BETWEEN_LOCATORS
+    num_updates = int(end_time / TIME_STEP)
+    result = stubs.time_per_call(lambda index: setattr(song, 'current_song_time', index * TIME_STEP), num_updates)
+    song.is_playing = False
+    return result
+
+
+def rename(song):
+    """ Renames a locator in the middle of the song and returns the average time per rename in microseconds. """
+    cp = song.cue_points[NUM_LOCATORS / 2]
+    return stubs.time_per_call(lambda index: setattr(cp, 'name', '[R%d] METRO' % (index % 2)), RENAMES)
+
+
+def measure(create):
+    song = make_song_with_locators()
+    script = StubScript()
+    create(script)
+    play_time = stubs.best_of(RUNS, play, song)
+    num_triggered = script.num_triggered / RUNS
+    rename_time = stubs.best_of(RUNS, rename, song)
+    return play_time, rename_time, num_triggered
+
+
+def create_old(script):
+    OldCueComponent(script)
+
+
+def create_new(script):
+    script._song_clock = ClyphXSongClock(script)
+    ClyphXCueComponent(script)
+
+
+def start_new(song, time):
+    """ Returns the stub script of a new cue component on the given song, which starts playing at the given time. """
+    script = StubScript()
+    create_new(script)
+    song.current_song_time = time
+    song.is_playing = True
+    return script
+
+
+def check_jump_ahead():
+    """ Jumping ahead over several locators only triggers the first of them, like the old component did. """
+    song = make_song_with_locators()
+    script = start_new(song, 1.0)
+    song.current_song_time = 13.0
+    assert script.triggered == ['[X1] METRO'], script.triggered
+    song.current_song_time = 13.5
+    assert script.triggered == ['[X1] METRO'], script.triggered
+
+
+def check_loop_start():
+    """ A locator at the loop start triggers on each pass of the loop, although the first song time after the loop wraps 
+    around is past it. """
+    song = make_song_with_locators()
+    song.loop = True
+    song.loop_start = 8.0
+    song.loop_length = 8.0
+    script = start_new(song, 8.0)
+    for loop_pass in range(3):
+        for index in range(1, 27):
+            song.current_song_time = 8.0 + ((index * 0.3) % 8.0)
+    assert script.triggered == ['[X2] METRO', '[X3] METRO'] * 3, script.triggered
+
+
+def main():
+    check_jump_ahead()
+    check_loop_start()
+    old = measure(create_old)
+    new = measure(create_new)
+    print('%d locators, %.2f beats per song time update' % (NUM_LOCATORS, TIME_STEP))
+    print('%-10s %16s %16s %10s' % ('', 'update (us)', 'rename (us)', 'triggered'))
+    print('%-10s %16.3f %16.3f %10d' % ('old', old[0], old[1], old[2]))
+    print('%-10s %16.3f %16.3f %10d' % ('new', new[0], new[1], new[2]))
+
+if __name__ == '__main__':
+    main()
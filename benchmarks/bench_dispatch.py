@@ -0,0 +1,218 @@
+"""
+Per-action dispatch cost of the startswith chain that action_dispatch used
+before the dispatch table, compared to ClyphXDispatchTable, against a stub
+song.  Handlers are no-ops, so the results only show the cost of resolving
+action names to their handlers.
+
+    python2 benchmarks/bench_dispatch.py
+"""
+
+import stubs
+from consts import *
+from ClyphXDispatchTable import ClyphXDispatchTable, bind_handlers
+
+CALLS = 200000
+RUNS = 3
+
+""" Action names of the workloads, from global actions (early in the old chain) to user actions (last in it). """
+WORKLOADS = (
+    ('global', ['BPM', 'SCENE', 'METRO', 'SETSTOP', 'GQ']),
+    ('track', ['MUTE', 'SOLO', 'ARM', 'VOL', 'PAN', 'SEL']),
+    ('device', ['DEV', 'DEV2', 'DEVSEL']),
+    ('user', ['EX_ACTION_1', 'EX_ACTION_2']),
+    ('mixed', ['BPM', 'MUTE', 'DEV', 'SNAP', 'VOL', 'CLIP', 'EX_ACTION_1', 'LOOPER', 'SEL', 'DR']),
+)
+
+USER_ACTIONS = {'EX_ACTION_1': 'example_action_one', 'EX_ACTION_2': 'example_action_two'}
+
+
+def _no_op(self, *args):
+    pass
+
+
+def _make_component(class_name, *action_dicts):
+    """ Returns an instance of a class with a no-op method for each method named by the given action dicts. """
+    methods = {}
+    for action_dict in action_dicts:
+        for method_name in action_dict.values():
+            methods[method_name] = _no_op
+    for method_name in ('store_track_snapshot', 'morph_snapshots', 'dispatch_cs_action', 'dispatch_push_action',
+                        'dispatch_pxt_action', 'dispatch_mxt_action', 'dispatch_chain_action', 'set_device_on_off',
+                        'do_clip_note_action', 'set_clip_on_off', 'dispatch_pad_action'):
+        methods[method_name] = _no_op
+    return type(class_name, (object,), methods)()
+
+
+class StubScript(object):
+    """ The parts of the main script that action dispatch uses, with both the old chain and the dispatch table. """
+
+    def __init__(self):
+        self._snap_actions = _make_component('SnapActions')
+        self._control_surface_actions = _make_component('ControlSurfaceActions')
+        self._global_actions = _make_component('GlobalActions', GLOBAL_ACTIONS)
+        self._track_actions = _make_component('TrackActions', TRACK_ACTIONS)
+        self._device_actions = _make_component('DeviceActions', DEVICE_ACTIONS, LOOPER_ACTIONS)
+        self._clip_actions = _make_component('ClipActions', CLIP_ACTIONS)
+        self._dr_actions = _make_component('DRActions', DR_ACTIONS)
+        self._user_actions = _make_component('UserActions', USER_ACTIONS)
+        self._user_actions._action_dict = USER_ACTIONS
+        self._play_seq_clips = {}
+        self._dispatch_table = self.build_dispatch_table()
+
+    def song(self):
+        return stubs.ControlSurfaceComponent.song_instance
+
+    def get_device_to_operate_on(self, track, action_name, args):
+        return (None,)
+
+    def get_clip_to_operate_on(self, track, action_name, args):
+        return (None,)
+
+    def get_drum_rack_to_operate_on(self, track):
+        return None
+
+    def old_action_dispatch(self, tracks, xclip, action_name, args, ident):
+        """ The startswith chain of action_dispatch before the dispatch table (without debug logging). """
+        if tracks:
+            if action_name.startswith('SNAP'):
+                self._snap_actions.store_track_snapshot(tracks, xclip, ident, action_name, args)
+            elif action_name.startswith('SURFACE') or action_name.startswith('CS'):
+                self._control_surface_actions.dispatch_cs_action(tracks[0], xclip, ident, action_name, args)
+            elif action_name.startswith('PUSH'):
+                self._control_surface_actions.dispatch_push_action(tracks[0], xclip, ident, action_name, args)
+            elif action_name.startswith('PXT'):
+                self._control_surface_actions.dispatch_pxt_action(tracks[0], xclip, ident, action_name, args)
+            elif action_name.startswith('MXT'):
+                self._control_surface_actions.dispatch_mxt_action(tracks[0], xclip, ident, action_name, args)
+            elif action_name in GLOBAL_ACTIONS:
+                getattr(self._global_actions, GLOBAL_ACTIONS[action_name])(tracks[0], xclip, ident, args)
+            elif action_name == 'PSEQ' and args == 'RESET':
+                for key, value in self._play_seq_clips.items():
+                    value[1] = -1
+            elif action_name == 'DEBUG':
+                pass
+            else:
+                for t in tracks:
+                    if action_name in TRACK_ACTIONS:
+                        getattr(self._track_actions, TRACK_ACTIONS[action_name])(t, xclip, ident, args)
+                    elif action_name == 'LOOPER':
+                        if args and args.split()[0] in LOOPER_ACTIONS:
+                            getattr(self._device_actions, LOOPER_ACTIONS[args.split()[0]])(t, xclip, ident, args)
+                        elif action_name in LOOPER_ACTIONS:
+                            getattr(self._device_actions, LOOPER_ACTIONS[action_name])(t, xclip, ident, args)
+                    elif action_name.startswith('DEV'):
+                        device_action = self.get_device_to_operate_on(t, action_name, args)
+                        if device_action[0]:
+                            pass
+                    elif action_name.startswith('CLIP') and t in self.song().tracks:
+                        clip_action = self.get_clip_to_operate_on(t, action_name, args)
+                        if clip_action[0]:
+                            pass
+                    elif action_name.startswith('DR'):
+                        dr = self.get_drum_rack_to_operate_on(t)
+                        if dr and args:
+                            pass
+                    elif action_name in self._user_actions._action_dict:
+                        getattr(self._user_actions, self._user_actions._action_dict[action_name])(t, args)
+
+    def new_action_dispatch(self, tracks, xclip, action_name, args, ident):
+        """ action_dispatch with the dispatch table (without debug logging). """
+        if tracks:
+            route = self._dispatch_table.get_route(action_name)
+            if route:
+                route[0](route[1], tracks, xclip, action_name, args, ident)
+
+    def build_dispatch_table(self):
+        """ The same routes as the main scripts' build_dispatch_table. """
+        table = ClyphXDispatchTable()
+        table.add_prefix('SNAP', 0, self._dispatch_snap_action, self._snap_actions.store_track_snapshot)
+        table.add_exact('SNAPMORPH', 0, self._dispatch_snap_action, self._snap_actions.morph_snapshots)
+        table.add_prefix('SURFACE', 1, self._dispatch_cs_action, self._control_surface_actions.dispatch_cs_action)
+        table.add_prefix('CS', 1, self._dispatch_cs_action, self._control_surface_actions.dispatch_cs_action)
+        table.add_prefix('PUSH', 2, self._dispatch_cs_action, self._control_surface_actions.dispatch_push_action)
+        table.add_prefix('PXT', 3, self._dispatch_cs_action, self._control_surface_actions.dispatch_pxt_action)
+        table.add_prefix('MXT', 4, self._dispatch_cs_action, self._control_surface_actions.dispatch_mxt_action)
+        for name, handler in bind_handlers(GLOBAL_ACTIONS, self._global_actions).items():
+            table.add_exact(name, 5, self._dispatch_global_action, handler)
+        table.add_exact('PSEQ', 6, self._dispatch_pseq_action)
+        table.add_exact('DEBUG', 7, self._dispatch_debug_action)
+        for name, handler in bind_handlers(TRACK_ACTIONS, self._track_actions).items():
+            table.add_exact(name, 8, self._dispatch_track_action, handler)
+        table.add_exact('LOOPER', 9, self._dispatch_looper_action)
+        table.add_prefix('DEV', 10, self._dispatch_device_action)
+        table.add_prefix('CLIP', 11, self._dispatch_clip_action)
+        table.add_prefix('DR', 12, self._dispatch_dr_action)
+        for name, handler in bind_handlers(self._user_actions._action_dict, self._user_actions).items():
+            table.add_exact(name, 13, self._dispatch_user_action, handler)
+        self._looper_handlers = bind_handlers(LOOPER_ACTIONS, self._device_actions)
+        return table
+
+    def _dispatch_snap_action(self, handler, tracks, xclip, action_name, args, ident):
+        handler(tracks, xclip, ident, action_name, args)
+
+    def _dispatch_cs_action(self, handler, tracks, xclip, action_name, args, ident):
+        handler(tracks[0], xclip, ident, action_name, args)
+
+    def _dispatch_global_action(self, handler, tracks, xclip, action_name, args, ident):
+        handler(tracks[0], xclip, ident, args)
+
+    def _dispatch_pseq_action(self, handler, tracks, xclip, action_name, args, ident):
+        if args == 'RESET':
+            for key, value in self._play_seq_clips.items():
+                value[1] = -1
+
+    def _dispatch_debug_action(self, handler, tracks, xclip, action_name, args, ident):
+        pass
+
+    def _dispatch_track_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            handler(t, xclip, ident, args)
+
+    def _dispatch_looper_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            if args and args.split()[0] in self._looper_handlers:
+                self._looper_handlers[args.split()[0]](t, xclip, ident, args)
+            elif action_name in self._looper_handlers:
+                self._looper_handlers[action_name](t, xclip, ident, args)
+
+    def _dispatch_device_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            device_action = self.get_device_to_operate_on(t, action_name, args)
+            if device_action[0]:
+                pass
+
+    def _dispatch_clip_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            if t in self.song().tracks:
+                clip_action = self.get_clip_to_operate_on(t, action_name, args)
+                if clip_action[0]:
+                    pass
+
+    def _dispatch_dr_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            dr = self.get_drum_rack_to_operate_on(t)
+            if dr and args:
+                pass
+
+    def _dispatch_user_action(self, handler, tracks, xclip, action_name, args, ident):
+        for t in tracks:
+            handler(t, args)
+
+
+def run_workload(dispatch, tracks, names):
+    num_names = len(names)
+    return stubs.time_per_call(lambda index: dispatch(tracks, None, names[index % num_names], '', '[]'), CALLS)
+
+
+def main():
+    song = stubs.make_song(8)
+    script = StubScript()
+    tracks = [song.tracks[0]]
+    print('%-8s %12s %12s %8s' % ('workload', 'chain (us)', 'table (us)', 'speedup'))
+    for name, names in WORKLOADS:
+        old = stubs.best_of(RUNS, run_workload, script.old_action_dispatch, tracks, names)
+        new = stubs.best_of(RUNS, run_workload, script.new_action_dispatch, tracks, names)
+        print('%-8s %12.3f %12.3f %7.2fx' % (name, old, new, old / new))
+
+if __name__ == '__main__':
+    main()
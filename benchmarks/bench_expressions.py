@@ -0,0 +1,96 @@
+"""
+Cost of variable assignments with expressions, such as the counter increment
+COUNTER = (%COUNTER% + 1), through the eval() path that was used before the
+expression engine compared to the shipped ClyphX.handle_user_variable_assignment
+(of ClyphX9.py), which uses ClyphXExpressions.  Both paths include variable
+substitution and storing the result.
+
+    python2 benchmarks/bench_expressions.py
+"""
+
+import stubs
+from ClyphX9 import ClyphX
+from ClyphXActionCache import ClyphXActionCache
+from ClyphXExpressions import ClyphXExpressions
+from ClyphXVariables import ClyphXVariableTemplates
+
+CALLS = 50000
+RUNS = 3
+
+WORKLOADS = (
+    ('counter', 'COUNTER = (%COUNTER% + 1)'),
+    ('wrap', 'STEP = ((%STEP% + 1) % 16)'),
+    ('arith', 'LEVEL = (%COUNTER% * 2 + %STEP% - 3)'),
+)
+
+
+def old_get_user_variable_value(variables, var_name):
+    result = '0'
+    if variables.has_key(var_name):
+        result = variables[var_name]
+    return result
+
+
+def old_replace_user_variables(variables, string_with_vars):
+    """ replace_user_variables before variable templates. """
+    while '%' in string_with_vars:
+        var_name = string_with_vars[string_with_vars.index('%')+1:]
+        if '%' in var_name:
+            var_name = var_name[0:var_name.index('%')]
+            string_with_vars = string_with_vars.replace('%' + var_name + '%', old_get_user_variable_value(variables, var_name), 1)
+        else:
+            string_with_vars = string_with_vars.replace('%', '', 1)
+    return string_with_vars
+
+
+def old_assignment(variables, origin_name):
+    """ format_action_name and handle_user_variable_assignment before the expression engine. """
+    string_with_assign = old_replace_user_variables(variables, origin_name)
+    string_with_assign = string_with_assign.replace('$', '')
+    var_data = string_with_assign.split('=')
+    if len(var_data) >= 2 and not ';' in var_data[1] and not '%' in var_data[1] and not '=' in var_data[1]:
+        if '(' in var_data[1] and ')' in var_data[1]:
+            try: variables[var_data[0].strip()] = str(eval(var_data[1].strip()))
+            except: pass
+        else:
+            variables[var_data[0].strip()] = var_data[1].strip()
+
+
+class NewAssignment(object):
+    """ Calls the shipped handle_user_variable_assignment on a main script that only has the attributes it uses, which are 
+    set up as ClyphX.__init__ does. """
+
+    def __init__(self):
+        self._script = ClyphX.__new__(ClyphX)
+        self._script._is_debugging = False
+        self._script._user_variables = {}
+        self._script._variable_templates = ClyphXVariableTemplates()
+        self._script._expressions = ClyphXExpressions()
+        self._script._action_cache = ClyphXActionCache(self._script)
+
+    def __call__(self, variables, string_with_assign):
+        self._script._user_variables = variables
+        self._script.handle_user_variable_assignment(string_with_assign)
+
+
+def run_workload(assign, assignment):
+    variables = {'COUNTER': '0', 'STEP': '0', 'LEVEL': '0'}
+    return stubs.time_per_call(lambda index: assign(variables, assignment), CALLS)
+
+
+def main():
+    new_assignment = NewAssignment()
+    print('%-8s %12s %12s %8s' % ('workload', 'eval (us)', 'engine (us)', 'speedup'))
+    for name, assignment in WORKLOADS:
+        old = stubs.best_of(RUNS, run_workload, old_assignment, assignment)
+        new = stubs.best_of(RUNS, run_workload, new_assignment, assignment)
+        print('%-8s %12.3f %12.3f %7.2fx' % (name, old, new, old / new))
+    old_variables = {'COUNTER': '0'}
+    new_variables = {'COUNTER': '0'}
+    for index in range(100):
+        old_assignment(old_variables, WORKLOADS[0][1])
+        new_assignment(new_variables, WORKLOADS[0][1])
+    print('counter after 100 increments: eval %s, engine %s' % (old_variables['COUNTER'], new_variables['COUNTER']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Throughput of 14-bit CC and NRPN X-Controls against bursts of synthetic MIDI
+input: the messages are fed to ClyphXControlComponent.receive_midi, which
+decodes them with HighResDecoder and sets a stub track's volume or panning
+from each completed 14-bit value.
+
+    python2 benchmarks/bench_high_res.py
+"""
+
+import stubs
+from ClyphXTriggers import ClyphXControlComponent
+from ClyphXHighResControls import HighResDecoder
+
+""" Number of 14-bit values per burst. """
+BURST_VALUES = 20000
+RUNS = 3
+CHANNEL = 0
+CC14_MSB_NUM = 7
+NRPN_PARAM_NUM = 1000
+
+
+class StubScript(object):
+
+    def __init__(self):
+        self._is_debugging = False
+        self._c_instance = stubs._Anything()
+
+    def song(self):
+        return stubs.ControlSurfaceComponent.song_instance
+
+    def parse_action_name(self, action):
+        name = action.split()
+        return (None, name[0], ' '.join(name[1:]))
+
+
+def sweep(index):
+    """ Returns the index-th 14-bit value of a fader sweeping up and down. """
+    value = (index * 37) % 32766
+    if value > 16383:
+        value = 32766 - value
+    return value
+
+
+def cc14_burst():
+    """ MSB followed by LSB per value. """
+    messages = []
+    for index in range(BURST_VALUES):
+        value = sweep(index)
+        messages.append((176 + CHANNEL, CC14_MSB_NUM, value >> 7))
+        messages.append((176 + CHANNEL, CC14_MSB_NUM + 32, value & 127))
+    return messages
+
+
+def nrpn_burst():
+    """ Full NRPN sequence (parameter number followed by data entry) per value. """
+    messages = []
+    for index in range(BURST_VALUES):
+        value = sweep(index)
+        messages.extend([(176 + CHANNEL, 99, NRPN_PARAM_NUM >> 7), (176 + CHANNEL, 98, NRPN_PARAM_NUM & 127),
+                         (176 + CHANNEL, 6, value >> 7), (176 + CHANNEL, 38, value & 127)])
+    return messages
+
+
+def nrpn_running_burst():
+    """ Parameter number once, then only data entry per value as most hardware sends while a control moves. """
+    messages = [(176 + CHANNEL, 99, NRPN_PARAM_NUM >> 7), (176 + CHANNEL, 98, NRPN_PARAM_NUM & 127)]
+    for index in range(BURST_VALUES):
+        value = sweep(index)
+        messages.extend([(176 + CHANNEL, 6, value >> 7), (176 + CHANNEL, 38, value & 127)])
+    return messages
+
+
+def make_component():
+    stubs.make_song(8)
+    component = ClyphXControlComponent(StubScript())
+    component.add_high_res_control('FADER', ['CC14', str(CHANNEL + 1), str(CC14_MSB_NUM), 'VOL'], None)
+    component.add_high_res_control('ENC', ['NRPN', str(CHANNEL + 1), str(NRPN_PARAM_NUM), 'PAN'], None)
+    return component
+
+
+def run_component(component, messages):
+    receive_midi = component.receive_midi
+    return stubs.time_per_call(lambda index: receive_midi(messages[index]), len(messages))
+
+
+def run_decoder(messages):
+    decoder = HighResDecoder()
+    decoder.add_cc14_control(CC14_MSB_NUM, {'value' : 0})
+    decoder.add_nrpn_control(NRPN_PARAM_NUM, {'value' : 0})
+    decode = decoder.decode
+    return stubs.time_per_call(lambda index: decode(messages[index][1], messages[index][2]), len(messages))
+
+
+def main():
+    component = make_component()
+    print('%d values per burst' % BURST_VALUES)
+    print('%-14s %12s %16s %16s' % ('', 'decode (us)', 'receive (us)', 'messages/s'))
+    for name, make_messages in (('cc14', cc14_burst), ('nrpn', nrpn_burst), ('nrpn running', nrpn_running_burst)):
+        messages = make_messages()
+        decode_time = stubs.best_of(RUNS, run_decoder, messages)
+        receive_time = stubs.best_of(RUNS, run_component, component, messages)
+        print('%-14s %12.3f %16.3f %16d' % (name, decode_time, receive_time, 1000000.0 / receive_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Cost of the timer ticks that smooth the recall of a 2000-parameter snapshot
+over 32 steps: the dict-based smoothing that ClyphXSnapActions used before
+compared to ClyphXSnapSmoothing with each of its curves.  Measured against
+stand-in parameter objects that count their writes, for moves across the
+full range of the params and small moves (2% of their range).
+
+    python2 benchmarks/bench_smoothing.py
+"""
+
+import gc
+import random
+import time
+import stubs
+from ClyphXSnapSmoothing import ClyphXSnapSmoothing, CURVE_LINEAR, CURVE_EXPONENTIAL, CURVE_S_CURVE
+
+NUM_PARAMS = 2000
+NUM_STEPS = 32
+""" Every nth param is quantized. """
+QUANTIZED_INTERVAL = 20
+RUNS = 15
+
+
+class BenchParameter(object):
+    """ DeviceParameter stand-in whose value writes are counted. """
+
+    num_writes = 0
+
+    def __init__(self, value, is_quantized):
+        self._value = value
+        self.min = 0.0
+        self.max = is_quantized and 10.0 or 1.0
+        self.is_quantized = is_quantized
+
+    def _get_value(self):
+        return self._value
+
+    def _set_value(self, value):
+        BenchParameter.num_writes += 1
+        self._value = value
+
+    value = property(_get_value, _set_value)
+
+
+def make_moves(move_size):
+    """ Returns a list of (param, target) pairs for a snapshot recall with the given size of moves (0.0 - 1.0). """
+    random.seed(NUM_PARAMS)
+    moves = []
+    for index in range(NUM_PARAMS):
+        is_quantized = index % QUANTIZED_INTERVAL == 0
+        param = BenchParameter(0.0, is_quantized)
+        if is_quantized:
+            param.value = float(random.randint(0, 10))
+            target = float(random.randint(0, 10))
+        else:
+            param.value = random.uniform(0.0, 1.0 - move_size)
+            target = param.value + (move_size * random.choice((1.0, 0.99)))
+        moves.append((param, target))
+    return moves
+
+
+class OldSmoothing(object):
+    """ The smoothing of ClyphXSnapActions before ClyphXSnapSmoothing. """
+
+    def __init__(self, moves):
+        self._smoothing_speed = NUM_STEPS
+        self._smoothing_count = 0
+        self._parameters_to_smooth = {}
+        for parameter, new_value in moves:
+            factor = self._smoothing_speed
+            difference = new_value - parameter.value
+            if difference and abs(difference) > 0.01:
+                if parameter.is_quantized:
+                    factor = 1
+                param_data = [(new_value - parameter.value) / factor, new_value, parameter.value]
+                if difference < 0.0:
+                    param_data = [((parameter.value - new_value) / factor) * -1, new_value, parameter.value]
+                self._parameters_to_smooth[parameter] = param_data
+            else:
+                parameter.value = new_value
+
+    def tick(self):
+        self._smoothing_count += 1
+        for p, v in self._parameters_to_smooth.items():
+            param_value = v[2] + (self._smoothing_count * v[0])
+            if p.is_quantized:
+                p.value = v[1]
+                del self._parameters_to_smooth[p]
+            elif param_value == v[1] or self._smoothing_count >= self._smoothing_speed:
+                del self._parameters_to_smooth[p]
+                p.value = v[1]
+            else:
+                p.value = param_value
+
+
+def write_param(param, value):
+    param.value = value
+
+
+class NewSmoothing(object):
+
+    def __init__(self, moves, curve_name):
+        self._smoothing_count = 0
+        self._smoothing = ClyphXSnapSmoothing(write_param)
+        self._smoothing.set_curve(curve_name)
+        for parameter, new_value in moves:
+            if new_value - parameter.value:
+                self._smoothing.add(parameter, new_value)
+
+    def tick(self):
+        self._smoothing_count += 1
+        self._smoothing.apply_step(self._smoothing_count, NUM_STEPS)
+
+
+def measure(create, move_size):
+    """ Returns the longest and average tick in milliseconds and the number of param writes of smoothing a recall. """
+    moves = make_moves(move_size)
+    BenchParameter.num_writes = 0
+    smoothing = create(moves)
+    tick_times = []
+    # Garbage collection is disabled while timing like timeit does, so that it doesn't run in the ticks of some runs.
+    gc.disable()
+    for step in range(NUM_STEPS):
+        start = time.time()
+        smoothing.tick()
+        tick_times.append((time.time() - start) * 1000.0)
+    gc.enable()
+    return max(tick_times), sum(tick_times) / len(tick_times), BenchParameter.num_writes
+
+
+def main():
+    print('%d params, %d steps' % (NUM_PARAMS, NUM_STEPS))
+    print('%-8s %-12s %14s %14s %10s' % ('moves', 'smoothing', 'max tick (ms)', 'avg tick (ms)', 'writes'))
+    smoothings = (('old', OldSmoothing),
+                  ('linear', lambda moves: NewSmoothing(moves, CURVE_LINEAR)),
+                  ('exp', lambda moves: NewSmoothing(moves, CURVE_EXPONENTIAL)),
+                  ('s-curve', lambda moves: NewSmoothing(moves, CURVE_S_CURVE)))
+    for move_name, move_size in (('full', 1.0), ('small', 0.02)):
+        # The runs of the smoothings are interleaved, so they're affected by the load of the machine alike.
+        results = [[] for smoothing in smoothings]
+        for run in range(RUNS):
+            for index, (name, create) in enumerate(smoothings):
+                results[index].append(measure(create, move_size))
+        for index, (name, create) in enumerate(smoothings):
+            max_tick = min([result[0] for result in results[index]])
+            avg_tick = min([result[1] for result in results[index]])
+            print('%-8s %-12s %14.3f %14.3f %10d' % (move_name, name, max_tick, avg_tick, results[index][0][2]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Snapshot data size and encode/decode time of the compact format
+(ClyphXSnapCodec) compared to the legacy formats that were stored in X-Clip
+names: pickle (Live 9) and repr/eval (Live 8).  The snapshots hold the given
+number of parameters with random values that are exact in single precision,
+as Live's parameter values are.
+
+    python2 benchmarks/bench_snap_codec.py
+"""
+
+import array
+import pickle
+import random
+import stubs
+from ClyphXSnapCodec import encode_snap_data, decode_snap_data
+
+PARAMETER_COUNTS = (100, 1000, 5000)
+PARAMS_PER_DEVICE = 100
+DEVICES_PER_TRACK = 4
+RUNS = 5
+
+
+def make_snap_data(num_params):
+    """ Returns snapshot data laid out like store_track_snapshot's, with the given number of device params. """
+    random.seed(num_params)
+    snap_data = {}
+    device_index = 0
+    while num_params > 0:
+        track_key = '%d-Synth' % (device_index / DEVICES_PER_TRACK + 1)
+        if track_key not in snap_data:
+            mix_values = array.array('f', [random.random() for index in range(4)]).tolist()
+            snap_data[track_key] = [mix_values, [], None, {}]
+        num_values = min(PARAMS_PER_DEVICE, num_params)
+        values = array.array('f', [random.random() for index in range(num_values)]).tolist()
+        snap_data[track_key][3]['Device %d' % device_index] = {'params' : values}
+        num_params -= num_values
+        device_index += 1
+    return snap_data
+
+
+def time_ms(func, arg):
+    return stubs.time_per_call(lambda index: func(arg), 10) / 1000.0
+
+
+FORMATS = (('compact', encode_snap_data, decode_snap_data),
+           ('pickle', pickle.dumps, pickle.loads),
+           ('repr', repr, eval))
+
+
+def main():
+    print('%-8s %-8s %10s %14s %14s' % ('params', 'format', 'chars', 'encode (ms)', 'decode (ms)'))
+    for num_params in PARAMETER_COUNTS:
+        snap_data = make_snap_data(num_params)
+        for name, encode, decode in FORMATS:
+            data = encode(snap_data)
+            assert decode(data) == snap_data
+            encode_time = stubs.best_of(RUNS, time_ms, encode, snap_data)
+            decode_time = stubs.best_of(RUNS, time_ms, decode, data)
+            print('%-8d %-8s %10d %14.3f %14.3f' % (num_params, name, len(data), encode_time, decode_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Idle timer overhead against track count: the per-track timers that track
+components registered before the shared trigger scheduler compared to
+ClyphXTriggerScheduler, with no triggered X-Clips.  A tick calls every
+registered timer callback, as Live does roughly every 100 ms.
+
+    python2 benchmarks/bench_trigger_timer.py
+"""
+
+import stubs
+from stubs import ControlSurfaceComponent
+from ClyphXTriggers import ClyphXTrackComponent, ClyphXTriggerScheduler
+
+TRACK_COUNTS = (8, 32, 128, 512)
+TICKS = 2000
+RUNS = 3
+
+
+class OldTrackComponent(ControlSurfaceComponent):
+    """ The timer part of ClyphXTrackComponent before the trigger scheduler. """
+
+    def __init__(self, parent, track):
+        ControlSurfaceComponent.__init__(self)
+        self._parent = parent
+        self._track = track
+        self._loop_count = 0
+        self._triggered_clips = []
+        self._triggered_lseq_clip = None
+        self._register_timer_callback(self.on_timer)
+
+    def on_timer(self):
+        if self._track and (not self._track.mute or self._parent._process_xclips_if_track_muted):
+            if self._triggered_clips:
+                for clip in self._triggered_clips:
+                    self._parent.handle_action_list_trigger(self._track, clip)
+                self._triggered_clips = []
+            if self._triggered_lseq_clip:
+                self._parent.handle_loop_seq_action_list(self._triggered_lseq_clip, self._loop_count)
+                self._triggered_lseq_clip = None
+
+
+class StubScript(object):
+
+    def __init__(self):
+        self._process_xclips_if_track_muted = True
+        self._trigger_scheduler = None
+
+
+def run_ticks(timers):
+    def tick(index):
+        for callback in timers:
+            callback()
+    return stubs.time_per_call(tick, TICKS)
+
+
+def main():
+    print('%-8s %14s %14s %14s %8s' % ('tracks', 'old timers', 'old tick (us)', 'new tick (us)', 'speedup'))
+    for num_tracks in TRACK_COUNTS:
+        song = stubs.make_song(num_tracks)
+        script = StubScript()
+        ControlSurfaceComponent.timers = []
+        old_components = [OldTrackComponent(script, track) for track in song.tracks]
+        old_timers = list(ControlSurfaceComponent.timers)
+        ControlSurfaceComponent.timers = []
+        script._trigger_scheduler = ClyphXTriggerScheduler(script)
+        new_components = [ClyphXTrackComponent(script, track) for track in song.tracks]
+        new_timers = list(ControlSurfaceComponent.timers)
+        old = stubs.best_of(RUNS, run_ticks, old_timers)
+        new = stubs.best_of(RUNS, run_ticks, new_timers)
+        print('%-8d %14d %14.3f %14.3f %7.1fx' % (num_tracks, len(old_timers), old, new, old / new))
+
+if __name__ == '__main__':
+    main()
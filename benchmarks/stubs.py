@@ -0,0 +1,210 @@
+"""
+Stand-ins for the parts of Live's Python API and the _Framework package that
+the benchmarked ClyphX modules import, so that the benchmarks can run with a
+plain Python 2 interpreter outside of Live.
+
+Import this module before any ClyphX module:
+
+    import stubs
+    from ClyphXSongClock import ClyphXSongClock
+
+The benchmarks are run from the repository root, for example:
+
+    python2 benchmarks/bench_dispatch.py
+"""
+
+import os
+import sys
+import time
+import types
+
+CLYPHX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ClyphX')
+if CLYPHX_DIR not in sys.path:
+    sys.path.insert(0, CLYPHX_DIR)
+
+
+class _Anything(object):
+    """ Returns itself for any attribute, so nested enum lookups like Live.Song.RecordingQuantization.x work. """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self
+
+    def __call__(self, *a, **k):
+        return self
+
+
+class _Application(object):
+
+    def get_major_version(self):
+        return 9
+
+    def get_minor_version(self):
+        return 1
+
+    def get_bugfix_version(self):
+        return 0
+
+
+class StubObject(object):
+    """ LOM object stand-in with keyword attributes and add_x_listener/remove_x_listener/x_has_listener methods.
+    Setting an attribute calls its listeners like Live does. """
+
+    def __init__(self, **kw):
+        object.__setattr__(self, '_listeners', {})
+        for name, value in kw.items():
+            object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        if name.startswith('add_') and name.endswith('_listener'):
+            prop = name[4:-9]
+            return lambda listener: self._listeners.setdefault(prop, []).append(listener)
+        if name.startswith('remove_') and name.endswith('_listener'):
+            prop = name[7:-9]
+            return lambda listener: self._listeners[prop].remove(listener)
+        if name.endswith('_has_listener'):
+            prop = name[:-13]
+            return lambda listener: listener in self._listeners.get(prop, [])
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        listeners = self._listeners.get(name)
+        if listeners:
+            for listener in listeners[:]:
+                listener()
+
+
+class StubParameter(StubObject):
+    """ DeviceParameter stand-in. """
+
+    def __init__(self, name='Param', value=0.0, min=0.0, max=1.0, is_quantized=False):
+        StubObject.__init__(self, name=name, value=value, min=min, max=max, default_value=min, is_quantized=is_quantized,
+                            is_enabled=True, original_name=name)
+
+
+class StubClip(StubObject):
+    pass
+
+
+class ControlSurfaceComponent(object):
+    """ _Framework.ControlSurfaceComponent stand-in, song() returns the song set with set_song. """
+
+    song_instance = None
+    timers = []
+
+    def __init__(self, *a, **k):
+        pass
+
+    def song(self):
+        return ControlSurfaceComponent.song_instance
+
+    def application(self):
+        return _Application()
+
+    def _register_timer_callback(self, callback):
+        ControlSurfaceComponent.timers.append(callback)
+
+    def _unregister_timer_callback(self, callback):
+        ControlSurfaceComponent.timers.remove(callback)
+
+    def disconnect(self):
+        pass
+
+    def is_enabled(self):
+        return True
+
+
+class _StubModule(types.ModuleType):
+    """ Module of a package that's only available inside Live (see STUB_PACKAGES), each attribute of which is a class
+    that can be subclassed and returns itself for any attribute like _Anything. """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = type(name, (_Anything,), {})
+        setattr(self, name, value)
+        return value
+
+
+""" Packages whose modules are only available inside Live and are stubbed with _StubModule when imported. """
+STUB_PACKAGES = ('_Framework', '_Generic', '_NKFW', 'ClyphX_XTA', 'ClyphX_XTB', 'ClyphX_XTC', 'ClyphX_XTD',
+                 'ClyphX_XTE')
+
+
+class _StubFinder(object):
+
+    def find_module(self, fullname, path=None):
+        if fullname.split('.')[0] in STUB_PACKAGES and fullname not in sys.modules:
+            return self
+        return None
+
+    def load_module(self, fullname):
+        module = _StubModule(fullname)
+        module.__path__ = []
+        sys.modules[fullname] = module
+        return module
+
+
+def _install():
+    live = types.ModuleType('Live')
+    live.Application = types.ModuleType('Live.Application')
+    live.Application.get_application = _Application
+    live.Clip = _Anything()
+    live.Clip.Clip = StubClip
+    live.Song = _Anything()
+    live.Track = _Anything()
+    live.Device = _Anything()
+    live.DeviceParameter = _Anything()
+    live.MidiMap = _Anything()
+    sys.modules['Live'] = live
+    framework = types.ModuleType('_Framework')
+    framework.__path__ = []
+    component = types.ModuleType('_Framework.ControlSurfaceComponent')
+    component.ControlSurfaceComponent = ControlSurfaceComponent
+    framework.ControlSurfaceComponent = component
+    sys.modules['_Framework'] = framework
+    sys.modules['_Framework.ControlSurfaceComponent'] = component
+    sys.meta_path.append(_StubFinder())
+
+_install()
+
+
+def set_song(song):
+    ControlSurfaceComponent.song_instance = song
+
+
+def make_song(num_tracks=8, num_scenes=8):
+    """ Returns a song stand-in with the given number of tracks (with empty clip slots), a return and a master track. """
+    tracks = []
+    for index in range(num_tracks):
+        mixer = StubObject(volume=StubParameter('Track Volume', 0.85), panning=StubParameter('Track Panning', 0.5, -1.0),
+                           sends=[], crossfade_assign=1)
+        slots = [StubObject(has_clip=False, clip=None) for s in range(num_scenes)]
+        tracks.append(StubObject(name='%d-Audio' % (index + 1), clip_slots=slots, playing_slot_index=-1, fired_slot_index=-1,
+                                 mute=False, solo=False, arm=False, devices=[], mixer_device=mixer, is_foldable=False))
+    returns = [StubObject(name='A-Return', devices=[], mute=False, solo=False, mixer_device=StubObject(
+        volume=StubParameter(), panning=StubParameter(), sends=[]))]
+    master = StubObject(name='Master', devices=[], mixer_device=StubObject(volume=StubParameter(), panning=StubParameter(),
+                                                                           sends=[]))
+    scenes = [StubObject(name='', tempo=120.0) for s in range(num_scenes)]
+    view = StubObject(selected_track=tracks[0], selected_scene=scenes[0])
+    song = StubObject(tracks=tracks, return_tracks=returns, master_track=master, scenes=scenes, view=view, cue_points=[],
+                      current_song_time=0.0, is_playing=False, loop=False, loop_start=0.0, loop_length=16.0, tempo=120.0,
+                      signature_numerator=4, signature_denominator=4)
+    set_song(song)
+    return song
+
+
+def time_per_call(func, calls):
+    """ Calls func(index) for each index in range(calls) and returns the average time per call in microseconds. """
+    start = time.time()
+    for index in xrange(calls):
+        func(index)
+    return (time.time() - start) * 1000000.0 / calls
+
+
+def best_of(runs, func, *args):
+    """ Returns the lowest result of calling func with the given args the given number of times. """
+    return min([func(*args) for run in range(runs)])